@@ -0,0 +1,60 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+
+from .hashers import HashingBusy, password_executor
+
+logger = logging.getLogger(__name__)
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    `ModelBackend` que calcula los hashes de contraseña en `password_executor`.
+
+    La consulta del usuario (con su perfil y token, que el login necesita
+    justo después) se hace en el hilo de la petición; solo el hashing pasa
+    al pool acotado. Si el pool está saturado el login se rechaza (se
+    devuelve None, como con credenciales incorrectas) y se registra en el
+    log, para que el login del admin o cualquier otro llamador de
+    `authenticate` no acabe en un 500. La API de login pasa
+    `raise_busy=True` para recibir `HashingBusy` y responder 503.
+    """
+
+    def authenticate(self, request, username=None, password=None, raise_busy=False, **kwargs):
+        try:
+            return self._authenticate(username, password, **kwargs)
+        except HashingBusy:
+            if raise_busy:
+                raise
+            logger.warning('Pool de hashing saturado: se rechaza el login de %r', username)
+            return None
+
+    def _authenticate(self, username, password, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.select_related('profile', 'token').get(
+                **{UserModel.USERNAME_FIELD: username}
+            )
+        except UserModel.DoesNotExist:
+            # Igual que ModelBackend: se calcula un hash para que el tiempo de
+            # respuesta no revele si el usuario existe.
+            password_executor.run(make_password, password)
+            return None
+
+        rehash = []
+        valid = password_executor.run(check_password, password, user.password, rehash.append)
+        if rehash:
+            # Hash con otro número de iteraciones: se actualiza sin que el
+            # usuario lo note.
+            user.password = password_executor.run(make_password, password)
+            user.save(update_fields=['password'])
+        if valid and self.user_can_authenticate(user):
+            return user
+        return None
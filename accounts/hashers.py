@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 con el número de iteraciones tomado de los settings.
+
+    Mantiene el algoritmo `pbkdf2_sha256`, así que las contraseñas existentes
+    siguen siendo válidas. Cuando `PASSWORD_HASH_ITERATIONS` cambia (en
+    cualquier sentido), `must_update` devuelve True y Django vuelve a
+    calcular el hash la próxima vez que el usuario inicia sesión.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+
+class HashingBusy(Exception):
+    """El pool de hashing está saturado y la petición no ha conseguido turno."""
+
+
+class BoundedExecutor:
+    """
+    Pool de hilos acotado con control de admisión para el hashing de contraseñas.
+
+    Como mucho `max_workers` hashes se calculan a la vez y `max_pending`
+    esperan en cola; si no hay hueco tras `wait` segundos se lanza
+    `HashingBusy` en lugar de encolar sin límite. Así una avalancha de logins
+    recibe un 503 rápido y no acapara la CPU que necesita el resto de la
+    API. `hashlib.pbkdf2_hmac` libera el GIL, por lo que los hilos del pool
+    trabajan en paralelo.
+
+    Parameters
+    ----------
+    max_workers : int
+        Hilos del pool.
+    max_pending : int
+        Tareas que pueden esperar turno además de las que se ejecutan.
+    wait : float
+        Segundos que se espera por un hueco antes de rechazar la tarea.
+    """
+
+    def __init__(self, max_workers=4, max_pending=16, wait=0.5):
+        self.max_workers = max_workers
+        self.wait = wait
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        # El pool se crea bajo demanda para no arrancar hilos en procesos que
+        # nunca validan contraseñas (rqworker, comandos de gestión).
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix='password-hashing'
+                    )
+        return self._executor
+
+    def run(self, func, *args, **kwargs):
+        """
+        Ejecuta `func` en el pool y espera su resultado.
+
+        Raises
+        ------
+        HashingBusy
+            Si no hay hueco en el pool tras `wait` segundos.
+        """
+        if not self._slots.acquire(timeout=self.wait):
+            raise HashingBusy()
+        try:
+            return self.executor.submit(func, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+
+password_executor = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_QUEUE,
+    wait=settings.PASSWORD_HASH_WAIT,
+)
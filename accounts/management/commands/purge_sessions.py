@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.tasks import delete_expired_sessions, purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Borra las sesiones caducadas en bloques (o encola una purga en RQ con --enqueue)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.SESSION_PURGE_CHUNK,
+            help='Sesiones borradas por sentencia',
+        )
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Encola una ejecución de purge_expired_sessions en RQ en lugar de purgar ahora',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = purge_expired_sessions.delay()
+            self.stdout.write(self.style.SUCCESS(f'Tarea encolada: {job.id}'))
+            return
+        total = delete_expired_sessions(options['chunk_size'], settings.SESSION_PURGE_PAUSE)
+        self.stdout.write(self.style.SUCCESS(f'Sesiones borradas: {total}'))
@@ -0,0 +1,9 @@
+from shared.schemas import Schema, String
+
+SignupSchema = Schema(
+    username=String(),
+    password=String(),
+    first_name=String(),
+    last_name=String(),
+    email=String(),
+)
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from shared.jobs import delete_in_chunks, periodic
+
+
+def delete_expired_sessions(chunk_size=1000, pause=0.0):
+    """
+    Borra las sesiones caducadas en bloques de tamaño acotado.
+
+    Cada bloque es una sentencia DELETE independiente (autocommit), de modo
+    que el bloqueo de escritura de SQLite se libera entre bloques y los
+    logins concurrentes no esperan a que termine toda la purga. SQLite
+    reutiliza las páginas liberadas, así que el fichero deja de crecer sin
+    necesidad de un VACUUM.
+
+    Parameters
+    ----------
+    chunk_size : int
+        Número máximo de sesiones borradas por sentencia.
+    pause : float
+        Segundos de espera entre bloques.
+
+    Returns
+    -------
+    int
+        Número total de sesiones borradas.
+    """
+    return delete_in_chunks(
+        Session.objects.filter(expire_date__lt=timezone.now()), chunk_size, pause
+    )
+
+
+@periodic('SESSION_PURGE_INTERVAL')
+def purge_expired_sessions():
+    """
+    Tarea periódica que purga las sesiones caducadas.
+
+    Se ejecuta cada `settings.SESSION_PURGE_INTERVAL` segundos (ver
+    `shared.jobs.periodic`).
+
+    Returns
+    -------
+    int
+        Número de sesiones borradas.
+    """
+    return delete_expired_sessions(settings.SESSION_PURGE_CHUNK, settings.SESSION_PURGE_PAUSE)
@@ -1,3 +1,34 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from .hashers import HashingBusy, password_executor
+
+User = get_user_model()
+
+
+@mock.patch.object(password_executor, 'run', side_effect=HashingBusy)
+class HashingBusyTests(TestCase):
+    """Login con el pool de hashing saturado (ver `accounts.backends.PooledModelBackend`)."""
+
+    def setUp(self):
+        User.objects.create_superuser('admin', password='secret')
+
+    def test_api_login_responds_503(self, run):
+        response = self.client.post(
+            '/login/',
+            json.dumps({'username': 'admin', 'password': 'secret'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_admin_login_is_rejected(self, run):
+        with self.assertLogs('accounts.backends', 'WARNING'):
+            response = self.client.post(
+                '/admin/login/', {'username': 'admin', 'password': 'secret'}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('_auth_user_id', self.client.session)
@@ -1,23 +1,18 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.contrib.auth.views import redirect_to_login
 from django.views.decorators.csrf import csrf_exempt
 
-from shared.decorators import (
-    load_json_body,
-    required_method,
-)
+from shared.endpoints import endpoint
+from shared.responses import JsonResponse
+from users.tokens import SIGNED_TOKEN_PATTERN, issue_signed_token, revoke_signed_token
 
+from .hashers import HashingBusy
+from .schemas import SignupSchema
 
-from django.http import JsonResponse
-from django.contrib.auth import authenticate, login
-from django.views.decorators.csrf import csrf_exempt
-from django.contrib.auth.models import User
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
+@endpoint('POST', body=True)
 def user_login(request):
     """
     Inicia sesión de un usuario.
@@ -25,6 +20,19 @@ def user_login(request):
     Este endpoint permite a un usuario autenticarse proporcionando su nombre de usuario
     y contraseña. Si las credenciales son correctas, se inicia la sesión y se devuelve
     un token de autenticación.
+
+    Por defecto se devuelve el token UUID del usuario. Si se envía
+    `"token_type": "signed"` (o `settings.AUTH_SIGNED_TOKENS` está activo) se
+    emite un token firmado con caducidad que no requiere consultar la base de
+    datos en cada petición.
+
+    Con `"session": false` (o siempre, si `settings.API_ONLY_LOGIN` está
+    activo) no se crea la sesión de Django: el cliente solo usará el token y
+    se evita escribir una fila en `django_session` por cada login.
+
+    El hash de la contraseña se calcula en un pool acotado
+    (`accounts.hashers.password_executor`); si está saturado se responde 503
+    con la cabecera `Retry-After`.
     
     Parameters
     ----------
@@ -49,15 +57,30 @@ def user_login(request):
             )
         
         # Intentar autenticar al usuario
-        user = authenticate(request, username=username, password=password)
+        try:
+            user = authenticate(request, username=username, password=password, raise_busy=True)
+        except HashingBusy:
+            response = JsonResponse(
+                {'error': 'Demasiados inicios de sesión simultáneos, inténtalo de nuevo'},
+                status=503,
+            )
+            response['Retry-After'] = '1'
+            return response
         
         if user is not None:
             # Usuario autenticado correctamente
-            login(request, user)
+            if not settings.API_ONLY_LOGIN and request.json_body.get('session', True):
+                login(request, user)
+            role = user.profile.role
+            default_token_type = 'signed' if settings.AUTH_SIGNED_TOKENS else 'uuid'
+            if request.json_body.get('token_type', default_token_type) == 'signed':
+                token = issue_signed_token(user, role)
+            else:
+                token = user.token.key
             return JsonResponse({
                 'msg': 'Usuario logeado',
-                'token': user.token.key,
-                'role': user.profile.role
+                'token': token,
+                'role': role
             })
         else:
             # Credenciales incorrectas
@@ -80,13 +103,15 @@ def user_login(request):
         )
 
 
-@login_required
+@csrf_exempt
 def user_logout(request):
     """
     Cierra la sesión de un usuario.
 
     Este endpoint permite a un usuario autenticado cerrar su sesión.
-    Se elimina la sesión activa y se devuelve un mensaje de éxito.
+    Se elimina la sesión activa y se devuelve un mensaje de éxito. Si la
+    petición incluye un token firmado en la cabecera 'Authorization', el
+    token queda revocado hasta su expiración.
 
     Parameters
     ----------
@@ -98,13 +123,17 @@ def user_logout(request):
     JsonResponse
         Respuesta con un mensaje de éxito.
     """
+    bearer_auth = request.headers.get('Authorization', '')
+    if m := SIGNED_TOKEN_PATTERN.fullmatch(bearer_auth):
+        if not revoke_signed_token(m['token']):
+            return JsonResponse({'error': 'Token de autenticación inválido'}, status=400)
+    elif not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
     logout(request)
     return JsonResponse({'msg': 'Sesion Cerrada'})
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
+@endpoint('POST', body=SignupSchema)
 def user_signup(request):
     """
     Registra un nuevo usuario.
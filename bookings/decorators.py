@@ -1,10 +1,52 @@
-from django.http import JsonResponse
-
+from shared.decorators import as_decorator
+from shared.loaders import load_object
+from shared.responses import JsonResponse
 from users.models import Profile
 
 from .models import Booking, TimeSlot
 
 
+def check_booking(request, kwargs):
+    """Comprobación de `verify_booking`."""
+    try:
+        request.booking = load_object(
+            request,
+            Booking.objects.select_related('service', 'time_slot', 'barber'),
+            pk=kwargs['booking_pk'],
+        )
+    except Booking.DoesNotExist:
+        return JsonResponse({'error': 'Booking not found'}, status=404)
+
+
+def check_barber_and_timeslot(request, kwargs):
+    """Comprobación de `validate_barber_and_timeslot_existence`."""
+    data = request.json_body
+
+    try:
+        request.barber_profile = load_object(
+            request, Profile.objects.select_related('user'), user_id=data['barber']
+        )
+        if request.barber_profile.role != Profile.Role.WORKER:
+            return JsonResponse({'error': 'The user is not a Barber'}, status=400)
+    except Profile.DoesNotExist:
+        return JsonResponse({'error': 'Barber not found'}, status=404)
+
+    try:
+        request.time_slot = load_object(request, TimeSlot.objects.all(), pk=data['time_slot'])
+    except TimeSlot.DoesNotExist:
+        return JsonResponse({'error': 'Invalid time slot'}, status=404)
+
+
+def check_barber_availability(request, kwargs):
+    """Comprobación de `validate_barber_availability`."""
+    date = request.json_body['date']
+    barber_user = request.barber_profile.user
+    time_slot = request.time_slot
+
+    if Booking.objects.filter(barber=barber_user, date=date, time_slot=time_slot).exists():
+        return JsonResponse({'error': 'El barbero no está disponible en ese horario.'}, status=400)
+
+
 def verify_booking(func):
     """
     Decorador que intenta recuperar una reserva (booking) a partir de 'booking_pk' en los parámetros de la URL.
@@ -23,16 +65,7 @@ def verify_booking(func):
         Vista decorada con la verificación de existencia de la reserva.
     """
 
-    def wrapper(request, *args, **kwargs):
-        try:
-            booking = Booking.objects.get(id=kwargs['booking_pk'])
-            request.booking = booking
-        except Booking.DoesNotExist:
-            return JsonResponse({'error': 'Booking not found'}, status=404)
-
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_booking)(func)
 
 
 def validate_barber_and_timeslot_existence(view_func):
@@ -54,24 +87,7 @@ def validate_barber_and_timeslot_existence(view_func):
         Vista decorada con validación de barbero e intervalo de tiempo.
     """
 
-    def wrapper(request, *args, **kwargs):
-        data = request.json_body
-
-        try:
-            request.barber_profile = Profile.objects.get(user_id=data['barber'])
-            if request.barber_profile.role != Profile.Role.WORKER:
-                return JsonResponse({'error': 'The user is not a Barber'}, status=400)
-        except Profile.DoesNotExist:
-            return JsonResponse({'error': 'Barber not found'}, status=404)
-
-        try:
-            request.time_slot = TimeSlot.objects.get(pk=data['time_slot'])
-        except TimeSlot.DoesNotExist:
-            return JsonResponse({'error': 'Invalid time slot'}, status=404)
-
-        return view_func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_barber_and_timeslot)(view_func)
 
 
 def validate_barber_availability(view_func):
@@ -93,16 +109,4 @@ def validate_barber_availability(view_func):
         Vista decorada que valida la disponibilidad del barbero.
     """
 
-    def wrapper(request, *args, **kwargs):
-        date = request.json_body['date']
-        barber_user = request.barber_profile.user
-        time_slot = request.time_slot
-
-        if Booking.objects.filter(barber=barber_user, date=date, time_slot=time_slot).exists():
-            return JsonResponse(
-                {'error': 'El barbero no está disponible en ese horario.'}, status=400
-            )
-
-        return view_func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_barber_availability)(view_func)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'id'], name='booking_user_id_idx'),
+        ),
+    ]
@@ -63,6 +63,8 @@ class Booking(models.Model):
 
     class Meta:
         unique_together = ['barber', 'date', 'time_slot']
+        # Listado del usuario paginado por cursor (ver `user_booking_list`)
+        indexes = [models.Index(fields=['user', 'id'], name='booking_user_id_idx')]
 
     class Status(models.IntegerChoices):
         """
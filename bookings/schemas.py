@@ -0,0 +1,8 @@
+from shared.schemas import Date, Integer, Schema
+
+BookingSchema = Schema(
+    service=Integer(),
+    time_slot=Integer(),
+    date=Date(),
+    barber=Integer(),
+)
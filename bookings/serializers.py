@@ -13,6 +13,24 @@ class BookingSerializer(BaseSerializer):
     None
     """
 
+    select_related = {
+        'service': ('service',),
+        'time_slot': ('time_slot',),
+        'barber': ('barber',),
+    }
+    columns = {'barber_id': ('barber',)}
+    output_fields = (
+        'id',
+        'user',
+        'service',
+        'date',
+        'time_slot',
+        'barber',
+        'barber_id',
+        'status',
+        'created_at',
+    )
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia de reserva.
@@ -39,16 +57,22 @@ class BookingSerializer(BaseSerializer):
         """
         return {
             'id': instance.id,
-            'user': instance.user.id,
-            'service': ServiceSerializer(instance.service).serialize_instance(instance.service),
-            'date': instance.date,
-            'time_slot': TimeSlotSerializer(instance.time_slot).serialize_instance(
-                instance.time_slot
+            'user': instance.user_id if self.wants('user') else None,
+            'service': (
+                ServiceSerializer(instance.service).serialize_instance(instance.service)
+                if self.wants('service')
+                else None
+            ),
+            'date': instance.date if self.wants('date') else None,
+            'time_slot': (
+                TimeSlotSerializer(instance.time_slot).serialize_instance(instance.time_slot)
+                if self.wants('time_slot')
+                else None
             ),
-            'barber': instance.barber.get_full_name(),
-            'barber_id': instance.barber.id,
-            'status': instance.get_status_display(),
-            'created_at': instance.created_at,
+            'barber': instance.barber.get_full_name() if self.wants('barber') else None,
+            'barber_id': instance.barber_id if self.wants('barber_id') else None,
+            'status': instance.get_status_display() if self.wants('status') else None,
+            'created_at': instance.created_at if self.wants('created_at') else None,
         }
 
 
@@ -61,6 +85,8 @@ class TimeSlotSerializer(BaseSerializer):
     None
     """
 
+    values_plan = (('id', 'id'), ('start_time', 'start_time'), ('end_time', 'end_time'))
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia de bloque horario.
@@ -95,6 +121,8 @@ class BookingEarningsSerializer(BaseSerializer):
     None
     """
 
+    output_fields = ('daily_earnings', 'weekly_earnings', 'monthly_earnings')
+
     def serialize_instance(self, instance=None) -> dict:
         """
         Serializa el resumen de ganancias de las reservas.
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Booking
+from shared.models import TableVersion
+
+from .models import Booking, TimeSlot
 from .tasks import send_booking_confirmation
 
 
@@ -33,3 +35,25 @@ def notify_booking_creation(sender, instance, created, **kwargs):
             date=str(instance.date),
             time_slot=str(instance.time_slot),
         )
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+def bump_availability_version(sender, instance, **kwargs):
+    """
+    Incrementa la versión de la tabla de reservas o de horarios modificada.
+
+    Las fechas disponibles dependen de ambas (ver `availability_state`).
+
+    Parameters
+    ----------
+    sender : type
+        `Booking` o `TimeSlot`.
+    instance : Booking or TimeSlot
+        La instancia guardada o eliminada.
+    **kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    TableVersion.bump(sender)
@@ -1,3 +1,135 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from services.models import Service
+from shared.cache import representation_cache
+from shared.tests import ConstantQueriesMixin
+from users.auth import token_cache
+from users.models import Profile
+
+from .models import Booking, TimeSlot
+
+User = get_user_model()
+
+
+class BookingQueryCountTests(TestCase):
+    """
+    Número de consultas del detalle de una reserva.
+
+    La reserva se carga con `shared.loaders` junto con su servicio, franja
+    horaria y barbero en una sola consulta.
+    """
+
+    def setUp(self):
+        representation_cache.clear()
+        self.user = User.objects.create(username='client')
+        barber = User.objects.create(username='barber', first_name='Barber')
+        Profile.objects.filter(user=barber).update(role=Profile.Role.WORKER)
+        service = Service.objects.create(
+            name='Corte', price=Decimal('15'), duration=datetime.timedelta(minutes=30)
+        )
+        slot = TimeSlot.objects.create(start_time=datetime.time(10), end_time=datetime.time(11))
+        # Sin señales: la confirmación se envía por RQ
+        (self.booking,) = Booking.objects.bulk_create([
+            Booking(
+                user=self.user,
+                barber=barber,
+                service=service,
+                time_slot=slot,
+                date=datetime.date(2026, 12, 1),
+            )
+        ])
+
+    def test_booking_detail(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/bookings/{self.booking.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['barber'], 'Barber')
+        self.assertEqual(response.json()['service']['name'], 'Corte')
+
+
+class BookingListQueryCountTests(ConstantQueriesMixin, TestCase):
+    """El listado de reservas del usuario no hace una consulta por fila."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='client')
+        self.slot = TimeSlot.objects.create(
+            start_time=datetime.time(10), end_time=datetime.time(11)
+        )
+        self.added = 0
+
+    def add_rows(self, count):
+        barbers = [
+            User.objects.create(username=f'barber{self.added + i}', first_name='B')
+            for i in range(count)
+        ]
+        self.added += count
+        Profile.objects.filter(user__in=barbers).update(role=Profile.Role.WORKER)
+        services = Service.objects.bulk_create(
+            Service(name=f'S{i}', price=Decimal('15'), duration=datetime.timedelta(minutes=30))
+            for i in range(count)
+        )
+        Booking.objects.bulk_create(
+            Booking(
+                user=self.user,
+                barber=barber,
+                service=service,
+                time_slot=self.slot,
+                date=datetime.date(2026, 12, 1),
+            )
+            for barber, service in zip(barbers, services)
+        )
+
+    def test_booking_list(self):
+        self.assertConstantQueries('/api/bookings/', self.user.token.key)
+
+
+class BookingFieldsTests(TestCase):
+    """Listado de reservas restringido con `?fields=`."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='client')
+        barber = User.objects.create(username='barber', first_name='Barber')
+        service = Service.objects.create(
+            name='Corte', price=Decimal('15'), duration=datetime.timedelta(minutes=30)
+        )
+        slot = TimeSlot.objects.create(start_time=datetime.time(10), end_time=datetime.time(11))
+        (self.booking,) = Booking.objects.bulk_create([
+            Booking(
+                user=self.user,
+                barber=barber,
+                service=service,
+                time_slot=slot,
+                date=datetime.date(2026, 12, 1),
+            )
+        ])
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {self.user.token.key}'}
+        token_cache.get(str(self.user.token.key))
+
+    def get(self, fields):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/bookings/?fields={fields}', **self.headers)
+            content = response.getvalue()  # El listado consulta al leerse
+        return response.status_code, json.loads(content), len(queries)
+
+    def test_unknown_field_is_rejected(self):
+        status, content, _ = self.get('id,nope')
+        self.assertEqual(status, 400)
+        self.assertIn('nope', content['error'])
 
-# Create your tests here.
+    def test_deferred_columns_are_not_read(self):
+        *_, unrestricted = self.get('')
+        status, content, queries = self.get('id,status')
+        self.assertEqual(status, 200)
+        expected = [{'id': self.booking.pk, 'status': Booking.Status.CONFIRMED.label}]
+        self.assertEqual(content, expected)
+        self.assertEqual(queries, unrestricted)
@@ -1,3 +1,8 @@
+import datetime
+
+from django.db.models import Max
+from django.utils import timezone
+
 from .models import Booking, TimeSlot
 
 
@@ -57,3 +62,35 @@ def is_working_day(date):
         True si es día laboral, False en caso contrario.
     """
     return date.weekday() != 6  # Excluye domingos.
+
+
+def availability_state(request, kwargs):
+    """
+    Parte de los validadores de las fechas disponibles que no depende de las tablas.
+
+    Se usa con `shared.conditional.conditional_get`. Las fechas se cuentan
+    desde hoy y los horarios de hoy que ya han empezado no se ofrecen, así que
+    la respuesta cambia con el día y al pasar la hora de inicio de cada
+    horario, aunque no cambien las reservas.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Petición en curso.
+    kwargs : dict
+        Argumentos de la vista.
+
+    Returns
+    -------
+    tuple
+        Partes del ETag (el día y la hora de inicio del último horario ya
+        empezado) y el momento en que esas partes tomaron su valor.
+    """
+    now = timezone.now()
+    last_start = TimeSlot.objects.filter(start_time__lt=now.time()).aggregate(
+        last=Max('start_time')
+    )['last']
+    changed_at = datetime.datetime.combine(
+        now.date(), last_start or datetime.time.min, tzinfo=now.tzinfo
+    )
+    return (now.date().isoformat(), last_start), changed_at
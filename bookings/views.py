@@ -2,42 +2,38 @@ from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
 from django.utils import timezone
-from django.views.decorators.csrf import csrf_exempt
 
 from services.models import Service
-from shared.decorators import (
-    load_json_body,
-    required_fields,
-    required_method,
-    verify_admin,
-    verify_token,
-)
+from shared.conditional import conditional_get, set_validators
+from shared.endpoints import endpoint
+from shared.loaders import load_object
+from shared.pagination import cursor_pagination, paginate
+from shared.responses import JsonResponse
+from shared.serializers import check_fields, requested_fields
 from users.models import Profile
 
-from .decorators import (
-    validate_barber_and_timeslot_existence,
-    validate_barber_availability,
-    verify_booking,
-)
-from .models import Booking
+from .decorators import check_barber_and_timeslot, check_barber_availability, check_booking
+from .models import Booking, TimeSlot
+from .schemas import BookingSchema
 from .serializers import BookingSerializer
-from .utils import get_available_time_slots, is_working_day
+from .utils import availability_state, get_available_time_slots, is_working_day
 
 User = get_user_model()
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
+@endpoint(
+    'GET',
+    auth='token',
+    checks=(check_fields(BookingSerializer), cursor_pagination(Booking, 'id')),
+)
 def user_booking_list(request):
     """
     Devuelve una lista de todas las reservas de usuario en formato JSON.
 
     Este endpoint requiere que el usuario esté autenticado.
     Realiza una consulta a la base de datos para obtener todas las reservas de un usuario
-    y las serializa antes de devolverlas en una respuesta JSON.
+    y las envía serializadas en streaming, por bloques.
 
     Parameters
     ----------
@@ -46,21 +42,22 @@ def user_booking_list(request):
 
     Returns
     -------
-    JsonResponse
+    StreamingHttpResponse
         Respuesta JSON con la lista de reservas.
     """
     bookings = Booking.objects.filter(user=request.user)
-    bookings_serializer = [BookingSerializer(booking).serialize() for booking in bookings]
-    return JsonResponse(bookings_serializer, safe=False, status=200)
+    page = paginate(request, bookings)
+    bookings_serializer = BookingSerializer(page.items, fields=requested_fields(request))
+    return page.link(bookings_serializer.stream_response())
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('service', 'time_slot', 'date', 'barber', model=Booking)
-@verify_token
-@validate_barber_and_timeslot_existence
-@validate_barber_availability
+@endpoint(
+    'POST',
+    auth='token',
+    body=BookingSchema,
+    checks=(check_barber_and_timeslot, check_barber_availability),
+    idempotent=True,
+)
 def create_booking(request):
     """
     Crea una nueva reserva.
@@ -69,6 +66,9 @@ def create_booking(request):
     proporcionando el servicio, el horario, la fecha y el barbero.
     Si el servicio no existe, devuelve un error.
 
+    Admite la cabecera `Idempotency-Key`: un reintento recibe la respuesta
+    de la primera petición en lugar de un error de disponibilidad.
+
     Parameters
     ----------
     request : HttpRequest
@@ -80,23 +80,17 @@ def create_booking(request):
         Respuesta JSON con el ID de la nueva reserva o un error si el servicio no se encuentra.
     """
     service_pk = request.json_body['service']
-    barber_id = request.json_body['barber']
     date = request.json_body['date']
 
     try:
-        service = Service.objects.get(pk=service_pk)
+        service = load_object(request, Service.objects.all(), pk=service_pk)
     except Service.DoesNotExist:
         return JsonResponse({'error': 'Servicio no encontrado.'}, status=400)
 
-    try:
-        # Buscar al barbero con su perfil y rol de WORKER
-        barber_profile = Profile.objects.get(user_id=barber_id, role=Profile.Role.WORKER)
-    except Profile.DoesNotExist:
-        return JsonResponse({'error': 'Barbero no encontrado o no válido.'}, status=404)
-
+    # validate_barber_and_timeslot_existence ya ha comprobado que es un WORKER
     booking = Booking.objects.create(
         user=request.user,
-        barber=barber_profile.user,
+        barber=request.barber_profile.user,
         service=service,
         date=date,
         time_slot=request.time_slot,
@@ -106,14 +100,13 @@ def create_booking(request):
 
 
 @login_required
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('service', 'time_slot', 'date', 'barber', model=Booking)
-@verify_token
-@verify_booking
-@validate_barber_and_timeslot_existence
-@validate_barber_availability
+@endpoint(
+    'POST',
+    auth='token',
+    body=BookingSchema,
+    load=(check_booking,),
+    checks=(check_barber_and_timeslot, check_barber_availability),
+)
 def edit_booking(request, booking_pk):
     """
     Edita una reserva existente.
@@ -136,7 +129,7 @@ def edit_booking(request, booking_pk):
     service_pk = request.json_body['service']
     date = request.json_body['date']
 
-    service = Service.objects.get(pk=service_pk)
+    service = load_object(request, Service.objects.all(), pk=service_pk)
     booking = request.booking
 
     booking.service = service
@@ -149,9 +142,7 @@ def edit_booking(request, booking_pk):
 
 
 @login_required
-@csrf_exempt
-@required_method('GET')
-@verify_booking
+@endpoint('GET', load=(check_booking,), checks=(check_fields(BookingSerializer),))
 def booking_detail(request, booking_pk):
     """
     Devuelve los detalles de una reserva específica.
@@ -172,14 +163,11 @@ def booking_detail(request, booking_pk):
         Respuesta JSON con los detalles de la reserva.
     """
     booking = request.booking
-    serializer = BookingSerializer(booking, request=request)
+    serializer = BookingSerializer(booking, request=request, fields=requested_fields(request))
     return serializer.json_response()
 
 
-@csrf_exempt
-@required_method('POST')
-@verify_token
-@verify_booking
+@endpoint('POST', auth='token', load=(check_booking,))
 def cancel_booking(request, booking_pk):
     """
     Cancela una reserva existente.
@@ -204,9 +192,11 @@ def cancel_booking(request, booking_pk):
     return JsonResponse({'msg': 'La reserva ha sido cancelada'})
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
+@endpoint(
+    'GET',
+    auth='token',
+    checks=(conditional_get(Booking, TimeSlot, User, Profile, state=availability_state),),
+)
 def get_available_dates(request):
     """
     Devuelve las fechas disponibles para reservas de un barbero específico.
@@ -214,6 +204,9 @@ def get_available_dates(request):
     Parámetros GET:
     - barber_id: ID del barbero para filtrar (requerido)
 
+    Admite peticiones condicionales: si `If-None-Match` o `If-Modified-Since`
+    siguen vigentes responde 304 sin generar el cuerpo (ver `conditional_get`).
+
     Parameters
     ----------
     request : HttpRequest
@@ -250,19 +243,17 @@ def get_available_dates(request):
             )
         current_date += timedelta(days=1)
 
-    return JsonResponse(
+    response = JsonResponse(
         {
             'barber_id': barber.id,
             'barber_name': barber.get_full_name() or barber.username,
             'available_dates': available_slots,
         }
     )
+    return set_validators(request, response)
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
-@verify_admin
+@endpoint('GET', auth='admin')
 def get_earnings(request):
     """
     Obtiene las ganancias diarias del mes actual basadas en reservas confirmadas.
@@ -1,8 +1,18 @@
-from django.http import JsonResponse
+from shared.decorators import as_decorator
+from shared.loaders import load_object
+from shared.responses import JsonResponse
 
 from .models import Event
 
 
+def check_event(request, kwargs):
+    """Comprobación de `verify_event`."""
+    try:
+        request.event = load_object(request, Event.objects.all(), pk=kwargs['event_pk'])
+    except Event.DoesNotExist:
+        return JsonResponse({'error': 'Evento no encontrado'}, status=404)
+
+
 def verify_event(func):
     """
     Decorador que intenta recuperar un evento usando 'event_pk' desde los parámetros de la URL.
@@ -21,13 +31,4 @@ def verify_event(func):
         Vista decorada que incluye la verificación de existencia del evento.
     """
 
-    def wrapper(request, *args, **kwargs):
-        try:
-            event = Event.objects.get(id=kwargs['event_pk'])
-            request.event = event
-        except Event.DoesNotExist:
-            return JsonResponse({'error': 'Evento no encontrado'}, status=404)
-
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_event)(func)
@@ -21,6 +21,8 @@ class Event(models.Model):
         Dirección o lugar donde se realiza el evento.
     created_at : DateTimeField
         Fecha y hora en la que se creó el evento (automáticamente asignada).
+    updated_at : DateTimeField
+        Fecha y hora de la última modificación.
 
     Métodos
     -------
@@ -40,6 +42,7 @@ class Event(models.Model):
     )
     location = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """
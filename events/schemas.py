@@ -0,0 +1,10 @@
+from shared.schemas import Date, Schema, String, Time
+
+EventSchema = Schema(
+    name=String(),
+    description=String(null=True),
+    date=Date(),
+    time=Time(),
+    location=String(),
+    image=String(required=False, null=True),
+)
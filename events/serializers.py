@@ -1,5 +1,8 @@
+from shared.cache import representation_cache
 from shared.serializers import BaseSerializer
 
+from .models import Event
+
 
 class EventSerializer(BaseSerializer):
     """
@@ -9,6 +12,24 @@ class EventSerializer(BaseSerializer):
     con los campos relevantes para su representación en una API.
     """
 
+    cache = representation_cache
+    model = Event
+
+    values_plan = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('description', 'description'),
+        ('date', 'date'),
+        ('time', 'time'),
+        ('location', 'location'),
+        ('image', 'image', 'image_url'),
+    )
+
+    def image_url(self, name: str) -> str:
+        """URL de la imagen a partir del nombre guardado en la columna `image`."""
+        field = Event._meta.get_field('image')
+        return self.build_url(field.attr_class(None, field, name).url)
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia del modelo Event a un diccionario.
@@ -37,5 +58,5 @@ class EventSerializer(BaseSerializer):
             'date': instance.date,
             'time': instance.time,
             'location': instance.location,
-            'image': f'{self.build_url(instance.image.url)}',
+            'image': f'{self.build_url(instance.image.url)}' if self.wants('image') else None,
         }
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.cache import representation_cache
+from shared.models import TableVersion
+
+from .models import Event
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_representation(sender, instance, **kwargs):
+    """
+    Invalida la representación cacheada de un evento modificado o eliminado.
+
+    También incrementa la versión de la tabla, que usan los validadores del
+    listado (ver `shared.conditional`).
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo Event.
+    instance : Event
+        El evento guardado o eliminado.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    representation_cache.invalidate(sender, instance.pk)
+    TableVersion.bump(sender)
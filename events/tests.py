@@ -1,3 +1,45 @@
+import datetime
+
 from django.test import TestCase
 
-# Create your tests here.
+from shared.cache import representation_cache
+from shared.tests import ConstantQueriesMixin
+
+from .models import Event
+
+
+class EventQueryCountTests(TestCase):
+    """Número de consultas del detalle de un evento."""
+
+    def setUp(self):
+        representation_cache.clear()
+        self.event = Event.objects.create(
+            name='Jornada', date=datetime.date(2026, 1, 1), time=datetime.time(10), location='Local'
+        )
+
+    def test_event_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/events/{self.event.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Jornada')
+
+    def test_event_detail_cached(self):
+        self.client.get(f'/api/events/{self.event.pk}/')
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/events/{self.event.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+
+class EventListQueryCountTests(ConstantQueriesMixin, TestCase):
+    """El listado de eventos no hace una consulta por fila."""
+
+    def add_rows(self, count):
+        Event.objects.bulk_create(
+            Event(
+                name=f'E{i}', date=datetime.date(2026, 1, 1), time=datetime.time(10), location='L'
+            )
+            for i in range(count)
+        )
+
+    def test_event_list(self):
+        self.assertConstantQueries('/api/events/')
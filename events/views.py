@@ -2,29 +2,34 @@ import base64
 import uuid
 
 from django.core.files.base import ContentFile
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-
-from shared.decorators import (
-    load_json_body,
-    required_fields,
-    required_method,
-    verify_admin,
-    verify_token,
-)
 
-from .decorators import verify_event
+from shared.conditional import conditional_get, set_validators
+from shared.endpoints import endpoint
+from shared.pagination import cursor_pagination, paginate
+from shared.responses import JsonResponse
+from shared.serializers import check_fields, requested_fields
+
+from .decorators import check_event
 from .models import Event
+from .schemas import EventSchema
 from .serializers import EventSerializer
 
 
-@csrf_exempt
-@required_method('GET')
+@endpoint(
+    'GET',
+    checks=(
+        check_fields(EventSerializer),
+        cursor_pagination(Event, 'id'),
+        conditional_get(Event),
+    ),
+)
 def event_list(request):
     """
     Devuelve una lista de todos los eventos en formato JSON.
 
     Este endpoint permite obtener todos los eventos registrados en la base de datos.
+    Admite peticiones condicionales: si `If-None-Match` o `If-Modified-Since`
+    siguen vigentes responde 304 sin generar el cuerpo (ver `conditional_get`).
 
     Parameters
     ----------
@@ -36,13 +41,12 @@ def event_list(request):
     JsonResponse
         Respuesta JSON con la lista de eventos serializados.
     """
-    events = Event.objects.all()
-    serializer = EventSerializer(events, request=request)
-    return serializer.json_response()
+    page = paginate(request, Event.objects.all())
+    serializer = EventSerializer(page.items, request=request, fields=requested_fields(request))
+    return set_validators(request, page.link(serializer.json_response()))
 
 
-@required_method('GET')
-@verify_event
+@endpoint('GET', csrf_exempt=False, checks=(check_fields(EventSerializer),))
 def event_detail(request, event_pk):
     """
     Devuelve los detalles de un evento específico.
@@ -59,17 +63,14 @@ def event_detail(request, event_pk):
     JsonResponse
         Respuesta JSON con los detalles del evento.
     """
-    event = request.event
-    serializer = EventSerializer(event, request=request)
-    return serializer.json_response()
+    serializer = EventSerializer(request=request, fields=requested_fields(request))
+    try:
+        return JsonResponse(serializer.serialize_pk(event_pk))
+    except Event.DoesNotExist:
+        return JsonResponse({'error': 'Evento no encontrado'}, status=404)
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('name', 'description', 'date', 'time', 'location', model=Event)
-@verify_token
-@verify_admin
+@endpoint('POST', auth='admin', body=EventSchema)
 def add_event(request):
     """
     Agrega un nuevo evento.
@@ -119,13 +120,7 @@ def add_event(request):
     return JsonResponse({'id': event.pk, 'msg': 'Servicio creado exitosamente'})
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('name', 'description', 'date', 'time', 'location', model=Event)
-@verify_token
-@verify_admin
-@verify_event
+@endpoint('POST', auth='admin', body=EventSchema, load=(check_event,))
 def edit_event(request, event_pk: int):
     """
     Edita un evento existente.
@@ -168,11 +163,7 @@ def edit_event(request, event_pk: int):
     return JsonResponse({'msg': 'Event has been edited'})
 
 
-@csrf_exempt
-@required_method('POST')
-@verify_token
-@verify_admin
-@verify_event
+@endpoint('POST', auth='admin', load=(check_event,))
 def delete_event(request, event_pk: int):
     """
     Elimina un evento existente.
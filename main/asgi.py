@@ -3,6 +3,10 @@ ASGI config for main project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run it with an ASGI server, e.g.:
+    uvicorn main.asgi:application
+    gunicorn main.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,14 @@
+"""
+Tareas periódicas del proyecto, para el planificador de RQ.
+
+    python manage.py rqcron main.cron
+
+Cada tarea se declara junto a su código con `shared.jobs.periodic` y se
+encola cada `settings.<APP>_INTERVAL` segundos; las de intervalo se
+encolan también nada más arrancar. Debe haber un único proceso `rqcron`
+y al menos un worker (`rqworker default`) que las ejecute.
+"""
+
+from shared.jobs import register_periodic_jobs
+
+register_periodic_jobs()
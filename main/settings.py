@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'shared.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -73,6 +74,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'main.wsgi.application'
+ASGI_APPLICATION = 'main.asgi.application'
 
 
 # Database
@@ -151,3 +153,87 @@ TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 ADMIN_CHAT_ID = int(os.getenv('ADMIN_CHAT_ID', 0))
 
 LOGIN_URL = 'login/'
+
+# --- CACHÉ DE TOKENS ---
+
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_CACHE_REDIS_URL = os.getenv('AUTH_TOKEN_CACHE_REDIS_URL')  # p.ej. redis://redis:6379/1
+AUTH_TOKEN_CACHE_SHARED_TTL = int(os.getenv('AUTH_TOKEN_CACHE_SHARED_TTL', 5))  # En memoria, con Redis
+
+# --- CACHÉ DE REPRESENTACIONES (productos, servicios, eventos) ---
+
+REPRESENTATION_CACHE_SIZE = int(os.getenv('REPRESENTATION_CACHE_SIZE', 10000))
+REPRESENTATION_CACHE_TTL = int(os.getenv('REPRESENTATION_CACHE_TTL', 60))
+REPRESENTATION_CACHE_REDIS_URL = os.getenv('REPRESENTATION_CACHE_REDIS_URL')  # p.ej. redis://redis:6379/2
+REPRESENTATION_CACHE_SHARED_TTL = int(os.getenv('REPRESENTATION_CACHE_SHARED_TTL', 5))  # Con Redis
+
+# --- TOKENS FIRMADOS ---
+
+AUTH_SIGNED_TOKENS = os.getenv('AUTH_SIGNED_TOKENS', 'False') == 'True'
+AUTH_SIGNED_TOKEN_TTL = int(os.getenv('AUTH_SIGNED_TOKEN_TTL', 60 * 60 * 24))
+AUTH_REVOCATION_REFRESH = int(os.getenv('AUTH_REVOCATION_REFRESH', 30))
+
+# --- ENDPOINTS ---
+
+ENDPOINT_TIMINGS = os.getenv('ENDPOINT_TIMINGS', 'False') == 'True'  # Cabecera Server-Timing
+JSON_ENCODER = os.getenv('JSON_ENCODER', 'shared.encoders.FastJSONEncoder')  # Clase de JsonResponse
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 500))  # Filas por bloque en listados en streaming
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', 20))  # Filas por página si se pide `cursor` sin `limit`
+PAGE_MAX_SIZE = int(os.getenv('PAGE_MAX_SIZE', 100))  # Tope de `limit`
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))  # Subpeticiones por `/api/batch/`
+
+# --- COMPRESIÓN ---
+
+# Por orden de preferencia; 'br' y 'zstd' solo si están instalados brotli / zstandard
+COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 512))  # Bytes
+COMPRESSION_CACHE_BYTES = int(os.getenv('COMPRESSION_CACHE_BYTES', 32 * 1024 * 1024))
+# Bytes comprimidos a partir de los que un listado en streaming no se guarda en la caché
+COMPRESSION_CACHE_MAX_STREAM = int(os.getenv('COMPRESSION_CACHE_MAX_STREAM', 1024 * 1024))
+
+# --- LOGIN ---
+
+AUTHENTICATION_BACKENDS = ['accounts.backends.PooledModelBackend']
+PASSWORD_HASHERS = [
+    'accounts.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 600000))  # PBKDF2
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 16))
+PASSWORD_HASH_WAIT = float(os.getenv('PASSWORD_HASH_WAIT', 0.5))  # Segundos antes de devolver 503
+
+# --- SESIONES ---
+
+API_ONLY_LOGIN = os.getenv('API_ONLY_LOGIN', 'False') == 'True'  # Login sin sesión, solo token
+SESSION_PURGE_CHUNK = int(os.getenv('SESSION_PURGE_CHUNK', 1000))
+SESSION_PURGE_PAUSE = float(os.getenv('SESSION_PURGE_PAUSE', 0.05))  # Segundos entre bloques
+SESSION_PURGE_INTERVAL = int(os.getenv('SESSION_PURGE_INTERVAL', 60 * 60))  # 0 = no se programa
+
+# --- RESERVAS DE STOCK DE LAS ÓRDENES PENDIENTES ---
+
+ORDER_RESERVATION_TTL = int(os.getenv('ORDER_RESERVATION_TTL', 30 * 60))  # Segundos
+ORDER_EXPIRY_CHUNK = int(os.getenv('ORDER_EXPIRY_CHUNK', 500))  # Órdenes caducadas por transacción
+ORDER_EXPIRY_PAUSE = float(os.getenv('ORDER_EXPIRY_PAUSE', 0.05))  # Segundos entre bloques
+ORDER_EXPIRY_INTERVAL = int(os.getenv('ORDER_EXPIRY_INTERVAL', 60))  # 0 = no se programa
+
+# --- LIBRO DE MOVIMIENTOS DE STOCK ---
+
+STOCK_SNAPSHOT_CHUNK = int(os.getenv('STOCK_SNAPSHOT_CHUNK', 1000))  # Productos por bloque
+STOCK_SNAPSHOT_LAG = int(os.getenv('STOCK_SNAPSHOT_LAG', 60))  # Segundos: apuntes aún no incluidos
+STOCK_SNAPSHOT_INTERVAL = int(os.getenv('STOCK_SNAPSHOT_INTERVAL', 60 * 60))  # 0 = no se programa
+
+# --- IDEMPOTENCIA (cabecera Idempotency-Key) ---
+
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 60 * 60 * 24))  # Segundos
+IDEMPOTENCY_WAIT = float(os.getenv('IDEMPOTENCY_WAIT', 10))  # Espera máxima a la petición en curso
+IDEMPOTENCY_POLL = float(os.getenv('IDEMPOTENCY_POLL', 0.05))  # Primera espera; se duplica hasta 1 s
+# Segundos tras los que una petición en curso que no ha terminado (proceso caído) libera su clave
+IDEMPOTENCY_LEASE = float(os.getenv('IDEMPOTENCY_LEASE', 60))
+IDEMPOTENCY_PURGE_CHUNK = int(os.getenv('IDEMPOTENCY_PURGE_CHUNK', 1000))
+IDEMPOTENCY_PURGE_PAUSE = float(os.getenv('IDEMPOTENCY_PURGE_PAUSE', 0.05))  # Segundos entre bloques
+IDEMPOTENCY_PURGE_INTERVAL = int(os.getenv('IDEMPOTENCY_PURGE_INTERVAL', 60 * 60))  # 0 = no se programa
@@ -21,6 +21,7 @@ from django.contrib import admin
 from django.urls import include, path
 
 import accounts.views
+import shared.views
 import users.views
 
 urlpatterns = [
@@ -29,8 +30,10 @@ urlpatterns = [
     path('logout/', accounts.views.user_logout, name='logout'),
     path('signup/', accounts.views.user_signup, name='signup'),
     path('api/user/', users.views.get_user_profile, name='user'),
+    path('api/users/import/', users.views.import_users, name='import-users'),
     path('api/users-per-mounth/', users.views.users_per_mounth, name='users-per-mounth'),
     path('api/barbers/', users.views.get_barbers, name='barber'),
+    path('api/batch/', shared.views.batch, name='batch'),
     path('api/bookings/', include('bookings.urls')),
     path('api/products/', include('products.urls')),
     path('api/services/', include('services.urls')),
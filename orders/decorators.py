@@ -1,10 +1,83 @@
 import re
 from datetime import datetime
 
-from django.http import JsonResponse
+
+from shared.decorators import as_decorator
+from shared.loaders import load_object
+from shared.responses import JsonResponse
 
 from .models import Order
 
+CARD_NUMBER_PATTERN = re.compile(r'^\d{4}-\d{4}-\d{4}-\d{4}$')
+EXP_DATE_PATTERN = re.compile(r'^(0[1-9]|1[0-2])\/\d{4}$')
+CVC_PATTERN = re.compile(r'^\d{3}$')
+
+
+def load_order(request, order_pk):
+    """
+    Carga una orden (con sus items y productos) una sola vez por petición.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Petición en curso.
+    order_pk : int
+        ID de la orden.
+
+    Returns
+    -------
+    Order
+        Orden solicitada.
+
+    Raises
+    ------
+    Order.DoesNotExist
+        Si la orden no existe.
+    """
+    return load_object(request, Order.objects.prefetch_related('items__product'), pk=order_pk)
+
+
+def check_order(request, kwargs):
+    """Comprobación de `verify_order`."""
+    try:
+        request.order = load_order(request, kwargs['order_pk'])
+    except Order.DoesNotExist:
+        return JsonResponse({'error': 'Order not found'}, status=404)
+
+
+def check_order_owner(request, kwargs):
+    """Comprobación de `verify_user`."""
+    order = load_order(request, kwargs['order_pk'])
+    if order.user_id != request.user.pk:
+        return JsonResponse({'error': 'User is not the owner of requested order'}, status=403)
+
+
+def check_credit_card(request, kwargs):
+    """Comprobación de `validate_credit_card`."""
+    card_number = request.json_body['card-number']
+    exp_date = request.json_body['exp-date']
+    cvc = request.json_body['cvc']
+    if not CARD_NUMBER_PATTERN.match(card_number):
+        return JsonResponse({'error': 'Invalid card number'}, status=400)
+    if not EXP_DATE_PATTERN.match(exp_date):
+        return JsonResponse({'error': 'Invalid expiration date'}, status=400)
+    if not CVC_PATTERN.match(cvc):
+        return JsonResponse({'error': 'Invalid CVC'}, status=400)
+    card_exp_date = datetime.strptime(exp_date, '%m/%Y')
+    current_date = datetime.now()
+    if card_exp_date < current_date:
+        return JsonResponse({'error': 'Card expired'}, status=400)
+
+
+def check_status(request, kwargs):
+    """Comprobación de `validate_status`."""
+    if request.order.status == Order.Status.CANCELLED:
+        return JsonResponse({'error': 'You cannot modify a canceled order.'}, status=400)
+    if request.order.status == Order.Status.COMPLETED:
+        return JsonResponse({'error': 'You cannot modify a completed order.'}, status=400)
+    if request.order.status == Order.Status.EXPIRED or request.order.reservation_expired:
+        return JsonResponse({'error': 'This order has expired.'}, status=400)
+
 
 def verify_user(func):
     """
@@ -24,13 +97,7 @@ def verify_user(func):
         Vista decorada que incluye la verificación de propiedad del usuario.
     """
 
-    def wrapper(request, *args, **kwargs):
-        order = Order.objects.get(pk=kwargs['order_pk'])
-        if order.user != request.user:
-            return JsonResponse({'error': 'User is not the owner of requested order'}, status=403)
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_order_owner)(func)
 
 
 def verify_order(func):
@@ -50,15 +117,7 @@ def verify_order(func):
         Vista decorada con la validación de existencia de la orden.
     """
 
-    def wrapper(request, *args, **kwargs):
-        try:
-            order = Order.objects.get(pk=kwargs['order_pk'])
-            request.order = order
-        except Order.DoesNotExist:
-            return JsonResponse({'error': 'Order not found'}, status=404)
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_order)(func)
 
 
 def validate_credit_card(func):
@@ -79,26 +138,7 @@ def validate_credit_card(func):
         Vista decorada que incluye la validación de los datos de la tarjeta.
     """
 
-    def wrapper(request, *args, **kwargs):
-        CARD_NUMBER_PATTERN = re.compile(r'^\d{4}-\d{4}-\d{4}-\d{4}$')
-        EXP_DATE_PATTERN = re.compile(r'^(0[1-9]|1[0-2])\/\d{4}$')
-        CVC_PATTERN = re.compile(r'^\d{3}$')
-        card_number = request.json_body['card-number']
-        exp_date = request.json_body['exp-date']
-        cvc = request.json_body['cvc']
-        if not CARD_NUMBER_PATTERN.match(card_number):
-            return JsonResponse({'error': 'Invalid card number'}, status=400)
-        if not EXP_DATE_PATTERN.match(exp_date):
-            return JsonResponse({'error': 'Invalid expiration date'}, status=400)
-        if not CVC_PATTERN.match(cvc):
-            return JsonResponse({'error': 'Invalid CVC'}, status=400)
-        card_exp_date = datetime.strptime(exp_date, '%m/%Y')
-        current_date = datetime.now()
-        if card_exp_date < current_date:
-            return JsonResponse({'error': 'Card expired'}, status=400)
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_credit_card)(func)
 
 
 def validate_status(func):
@@ -120,11 +160,4 @@ def validate_status(func):
         Vista decorada que incluye la validación del estado de la orden.
     """
 
-    def wrapper(request, *args, **kwargs):
-        if request.order.status == Order.Status.CANCELLED:
-            return JsonResponse({'error': 'You cannot modify a canceled order.'}, status=400)
-        if request.order.status == Order.Status.COMPLETED:
-            return JsonResponse({'error': 'You cannot modify a completed order.'}, status=400)
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_status)(func)
@@ -0,0 +1,114 @@
+import datetime
+import json
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from orders.models import Order
+from users.models import Profile
+
+User = get_user_model()
+
+
+def legacy_earnings():
+    """Serie diaria tal y como la calculaba `get_earnings`: una consulta por día."""
+    now = timezone.now()
+    first_day_of_month = now.replace(day=1)
+    last_day_of_month = (first_day_of_month + timezone.timedelta(days=31)).replace(
+        day=1
+    ) - timezone.timedelta(days=1)
+    total_earnings = []
+    labels = []
+    for day in range(1, last_day_of_month.day + 1):
+        date = first_day_of_month.replace(day=day)
+        orders = Order.objects.filter(created_at__date=date, status=Order.Status.COMPLETED)
+        total_earnings.append(sum(float(order.price) for order in orders if order.price))
+        labels.append(date.strftime('%Y-%m-%d'))
+    return {'labels': labels, 'values': total_earnings}
+
+
+def seed(user, total, days):
+    """Crea `total` órdenes repartidas en los últimos `days` días (el 80% completadas)."""
+    rng = random.Random(0)
+    now = timezone.now()
+    statuses = [Order.Status.COMPLETED] * 8 + [Order.Status.CANCELLED, Order.Status.EXPIRED]
+    created_at = Order._meta.get_field('created_at')
+    created_at.auto_now_add = False  # Para fijar la fecha de cada orden
+    try:
+        for offset in range(0, total, 10000):
+            Order.objects.bulk_create(
+                Order(
+                    user=user,
+                    status=rng.choice(statuses),
+                    price=Decimal(rng.randrange(500, 10000)) / 100,
+                    created_at=now - datetime.timedelta(seconds=rng.randrange(days * 86400)),
+                )
+                for _ in range(min(10000, total - offset))
+            )
+    finally:
+        created_at.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la serie diaria de /api/orders/get-earnings/ con el cálculo anterior (una '
+        'consulta por día). Trabaja sobre una base de datos de pruebas temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000, help='Órdenes a crear')
+        parser.add_argument('--days', type=int, default=365, help='Días de historial')
+        parser.add_argument('-n', '--number', type=int, default=3, help='Repeticiones')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.compare(options['orders'], options['days'], options['number'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def compare(self, total, days, number):
+        admin = User.objects.create(username='admin')
+        Profile.objects.filter(user=admin).update(role=Profile.Role.ADMIN)
+        start = time.perf_counter()
+        seed(admin, total, days)
+        self.stdout.write(f'{total} órdenes creadas en {time.perf_counter() - start:.1f} s')
+
+        http = Client()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {admin.token.key}'}
+
+        def current():
+            return json.loads(http.get('/api/orders/get-earnings/', **headers).content)
+
+        # Se compara el JSON serializado, así que `0` y `0.0` no son lo mismo. Del
+        # cálculo anterior solo se quita el error de ir sumando floats (p.ej.
+        # 21768.390000000003); `round(0, 2)` sigue siendo el entero 0.
+        legacy = legacy_earnings()
+        legacy['values'] = [round(total, 2) for total in legacy['values']]
+        expected, result = json.dumps(legacy), json.dumps(current())
+        if result != expected:
+            raise CommandError(
+                f'La serie no coincide con la del cálculo anterior:\n{expected}\n{result}'
+            )
+
+        for name, run in (('Una consulta por día', legacy_earnings), ('GROUP BY día', current)):
+            best = float('inf')
+            for _ in range(number):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    run()
+                    best = min(best, time.perf_counter() - start)
+            self.stdout.write(f'{name}: {len(queries)} consultas, {best * 1e3:.1f} ms')
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.tasks import expire_orders, expire_pending_orders
+
+
+class Command(BaseCommand):
+    help = (
+        'Caduca las órdenes pendientes cuya reserva de stock ha vencido y repone el stock '
+        '(o encola una pasada en RQ con --enqueue)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.ORDER_EXPIRY_CHUNK,
+            help='Órdenes caducadas por transacción',
+        )
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Encola una ejecución de expire_orders en RQ en lugar de caducarlas ahora',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = expire_orders.delay()
+            self.stdout.write(self.style.SUCCESS(f'Tarea encolada: {job.id}'))
+            return
+        total = expire_pending_orders(options['chunk_size'], settings.ORDER_EXPIRY_PAUSE)
+        self.stdout.write(self.style.SUCCESS(f'Órdenes caducadas: {total}'))
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from orders.models import Order, OrderItem
+from products.models import Product, StockMovement
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Lanza compras simultáneas contra /api/orders/add/ y comprueba que no se vende más '
+        'stock del que hay y que cada pedido hace las mismas consultas sea cual sea el tamaño '
+        'de la cesta. Trabaja sobre una base de datos de pruebas temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stock', type=int, default=50, help='Stock inicial del producto')
+        parser.add_argument('--orders', type=int, default=200, help='Pedidos simultáneos')
+        parser.add_argument('-c', '--concurrency', type=int, default=16, help='Hilos')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Los hilos necesitan su propia conexión a la misma base de datos: en
+        # SQLite, un fichero en lugar de la base de datos en memoria.
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        old_test_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = os.path.join(tempfile.mkdtemp(), 'stress_checkout.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stress(options['stock'], options['orders'], options['concurrency'])
+            self.count_queries()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = old_test_name
+            teardown_test_environment()
+
+    def stress(self, stock, total, concurrency):
+        product = Product.objects.create(name='Cera mate', price=Decimal('12.50'), stock=stock)
+        users = [User.objects.create(username=f'client{i}') for i in range(concurrency)]
+        tokens = [user.token.key for user in users]
+        body = json.dumps({'products': [{'id': product.pk, 'quantity': 1}]})
+        local = threading.local()
+        start = threading.Barrier(concurrency)
+
+        def checkout(i):
+            if not hasattr(local, 'client'):
+                local.client = Client(raise_request_exception=False)
+                start.wait()
+            response = local.client.post(
+                '/api/orders/add/',
+                body,
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {tokens[i % concurrency]}',
+            )
+            return response.status_code
+
+        def close_connections(_):
+            connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            statuses = list(executor.map(checkout, range(total)))
+            list(executor.map(close_connections, range(concurrency)))
+
+        product.refresh_from_db()
+        sold = OrderItem.objects.filter(product=product).count()
+        accepted = statuses.count(200)
+        rejected = statuses.count(400)
+        self.stdout.write(
+            f'{total} pedidos de 1 unidad sobre {stock} en stock: {accepted} aceptados, '
+            f'{rejected} sin stock, {total - accepted - rejected} errores; '
+            f'{sold} vendidas, stock final {product.stock}'
+        )
+        if sold != accepted or sold + product.stock != stock or accepted > stock:
+            raise CommandError('Se ha vendido más stock del disponible')
+        if StockMovement.levels([product.pk])[product.pk] != product.stock:
+            raise CommandError('El libro de movimientos no cuadra con el stock')
+
+    def count_queries(self):
+        user = User.objects.create(username='basket')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {user.token.key}'}
+        client = Client()
+        client.get('/api/orders/', **headers)  # Token ya en caché, como en un cliente real
+        counts = {}
+        for size in (1, 5, 25):
+            products = Product.objects.bulk_create(
+                Product(name=f'P{size}-{i}', price=Decimal('9.95'), stock=10) for i in range(size)
+            )
+            body = json.dumps({'products': [{'id': p.pk, 'quantity': 2} for p in products]})
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(
+                    '/api/orders/add/', body, content_type='application/json', **headers
+                )
+            if response.status_code != 200:
+                raise CommandError(f'Cesta de {size} productos: {response.content.decode()}')
+            counts[size] = len(queries)
+            order = Order.objects.get(pk=response.json()['id'])
+            if order.items.count() != size or order.price != Decimal('19.90') * size:
+                raise CommandError(f'Cesta de {size} productos: pedido incorrecto')
+        self.stdout.write(
+            'Consultas por pedido: '
+            + ', '.join(f'{size} productos: {count}' for size, count in counts.items())
+        )
+        if len(set(counts.values())) != 1:
+            raise CommandError('El número de consultas depende del tamaño de la cesta')
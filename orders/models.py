@@ -1,10 +1,16 @@
+import datetime
 from datetime import timedelta
+from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
 from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
 from django.utils.timezone import now
 
+from products.models import Product, StockMovement
+
 
 class Order(models.Model):
     """
@@ -29,8 +35,22 @@ class Order(models.Model):
         - 'P': Pending
         - 'C': Completed
         - 'X': Cancelled
+        - 'E': Expired
+
+    Una orden pendiente retiene el stock de sus productos durante
+    `settings.ORDER_RESERVATION_TTL` segundos. Pasado ese tiempo ya no se
+    puede pagar ni modificar, y `orders.tasks.expire_orders` la marca como
+    caducada y repone el stock.
     """
 
+    class Meta:
+        indexes = [
+            # Listado del usuario paginado por cursor (ver `user_order_list`)
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            # Búsqueda de las reservas caducadas (ver `orders.tasks.expire_pending_orders`)
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ]
+
     class Status(models.TextChoices):
         """
         Enumeración de los estados posibles de una orden.
@@ -43,11 +63,14 @@ class Order(models.Model):
             Orden completada ('C').
         CANCELLED : str
             Orden cancelada ('X').
+        EXPIRED : str
+            Orden pendiente cuya reserva de stock ha caducado ('E').
         """
 
         PENDING = 'P', 'Pending'
         COMPLETED = 'C', 'Completed'
         CANCELLED = 'X', 'Cancelled'
+        EXPIRED = 'E', 'Expired'
 
     status = models.CharField(max_length=1, choices=Status.choices, default=Status.PENDING)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
@@ -81,6 +104,118 @@ class Order(models.Model):
         self.price = total
         return total
 
+    @property
+    def reservation_expired(self) -> bool:
+        """Si la orden sigue pendiente pero su reserva de stock ya ha caducado."""
+        return self.status == self.Status.PENDING and self.created_at < self.reservation_cutoff()
+
+    def close(self, status) -> bool:
+        """
+        Saca la orden del estado pendiente con un UPDATE condicional.
+
+        Solo una de las operaciones que compiten por una orden pendiente
+        (pago, cancelación, caducidad) puede cerrarla, así que el stock nunca
+        se repone dos veces ni se paga una orden ya caducada.
+
+        Parameters
+        ----------
+        status : Order.Status
+            Nuevo estado.
+
+        Returns
+        -------
+        bool
+            True si la orden estaba pendiente y con la reserva vigente.
+        """
+        updated_at = now()
+        closed = Order.objects.filter(
+            pk=self.pk, status=self.Status.PENDING, created_at__gte=self.reservation_cutoff()
+        ).update(status=status, updated_at=updated_at)
+        if closed:
+            self.status = status
+            self.updated_at = updated_at
+        return bool(closed)
+
+    @staticmethod
+    def reservation_cutoff():
+        """
+        Fecha de creación a partir de la cual una orden pendiente sigue reservando stock.
+
+        Returns
+        -------
+        datetime
+            Ahora menos `settings.ORDER_RESERVATION_TTL`.
+        """
+        return now() - timedelta(seconds=settings.ORDER_RESERVATION_TTL)
+
+    @classmethod
+    def restock(cls, order_pks, reason) -> None:
+        """
+        Devuelve al inventario el stock de las órdenes indicadas.
+
+        Las cantidades se suman por orden y producto en la base de datos y se
+        reponen con un único UPDATE (ver `Product.apply_movements`), sea cual
+        sea el número de órdenes y de líneas. Cada orden deja sus apuntes en
+        el libro de movimientos.
+
+        Parameters
+        ----------
+        order_pks : iterable
+            IDs de las órdenes, que el llamante ya ha sacado del estado pendiente
+            en la misma transacción.
+        reason : StockMovement.Reason
+            Motivo de la reposición (cancelación o caducidad).
+        """
+        quantities = (
+            OrderItem.objects.filter(order__in=order_pks)
+            .values_list('order_id', 'product_id')
+            .annotate(total=Sum('quantity'))
+            .order_by()
+        )
+        Product.apply_movements(
+            StockMovement(product_id=product_pk, change=total, reason=reason, order_id=order_pk)
+            for order_pk, product_pk, total in quantities
+        )
+
+    @classmethod
+    def daily_earnings(cls, first_day, last_day) -> dict:
+        """
+        Calcula los ingresos por órdenes completadas de cada día de un intervalo.
+
+        Una sola consulta agrupa por el día de `created_at` en la zona horaria
+        del negocio (`settings.TIME_ZONE`, Atlantic/Canary), filtrando por un
+        rango de fechas y horas que resuelve el índice `(status, created_at)`.
+        Los días sin órdenes se rellenan con cero.
+
+        Parameters
+        ----------
+        first_day : date
+            Primer día, incluido.
+        last_day : date
+            Último día, incluido.
+
+        Returns
+        -------
+        dict
+            `{fecha: total}` con un Decimal por cada día del intervalo, en orden.
+        """
+        tz = timezone.get_default_timezone()
+        start = datetime.datetime.combine(first_day, datetime.time.min, tzinfo=tz)
+        end = datetime.datetime.combine(
+            last_day + timedelta(days=1), datetime.time.min, tzinfo=tz
+        )
+        totals = dict(
+            cls.objects.filter(
+                status=cls.Status.COMPLETED, created_at__gte=start, created_at__lt=end
+            )
+            .annotate(day=TruncDate('created_at', tzinfo=tz))
+            .values_list('day')
+            .annotate(total=Sum('price'))
+            .order_by()
+        )
+        days = (first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1))
+        return {day: totals.get(day) or Decimal('0.00') for day in days}
+
     @classmethod
     def earnings_summary(cls):
         """
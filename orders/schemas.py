@@ -0,0 +1,23 @@
+from shared.schemas import Integer, List, Schema, String
+
+OrderItemSchema = Schema(
+    id=Integer(),
+    quantity=Integer(min_value=1),
+)
+
+OrderSchema = Schema(
+    products=List(OrderItemSchema),
+)
+
+AddProductSchema = Schema(
+    product_id=Integer(),
+    quantity=Integer(min_value=1),
+)
+
+PaymentSchema = Schema(
+    **{
+        'card-number': String(),
+        'exp-date': String(),
+        'cvc': String(),
+    }
+)
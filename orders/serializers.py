@@ -9,7 +9,15 @@ class OrderItemSerializer(BaseSerializer):
     Convierte instancias de OrderItem en diccionarios con información
     detallada del producto, cantidad y precios.
     """
-    
+
+    columns = {'subtotal': ('quantity', 'unit_price')}
+    output_fields = ('id', 'product', 'quantity', 'unit_price', 'subtotal')
+
+    def prepare(self, items):
+        """Carga en la caché de representaciones los productos de las líneas."""
+        if self.wants('product'):
+            ProductSerializer(request=self.request).serialize_pks(i.product_id for i in items)
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia del modelo OrderItem a un diccionario.
@@ -26,10 +34,14 @@ class OrderItemSerializer(BaseSerializer):
         """
         return {
             'id': instance.id,
-            'product': ProductSerializer(instance.product, request=self.request).serialize(),
-            'quantity': instance.quantity,
-            'unit_price': instance.unit_price,
-            'subtotal': instance.subtotal,
+            'product': (
+                ProductSerializer(request=self.request).serialize_pk(instance.product_id)
+                if self.wants('product')
+                else None
+            ),
+            'quantity': instance.quantity if self.wants('quantity') else None,
+            'unit_price': instance.unit_price if self.wants('unit_price') else None,
+            'subtotal': instance.subtotal if self.wants('subtotal') else None,
         }
 
 
@@ -56,6 +68,22 @@ class OrderSerializer(BaseSerializer):
         Serializa una instancia de Order a un diccionario.
     """
 
+    # Los productos de las líneas no se precargan: salen de la caché de
+    # representaciones (ver `prepare`).
+    prefetch_related = {'items': ('items',)}
+    output_fields = ('id', 'items', 'price', 'created_at', 'status')
+
+    def prepare(self, orders):
+        """
+        Carga en la caché de representaciones los productos de todo el bloque.
+
+        Así los que falten se leen con una sola consulta por bloque en lugar
+        de una por pedido.
+        """
+        if self.wants('items'):
+            product_ids = (item.product_id for order in orders for item in order.items.all())
+            ProductSerializer(request=self.request).serialize_pks(product_ids)
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia del modelo Order a un diccionario.
@@ -72,10 +100,12 @@ class OrderSerializer(BaseSerializer):
         """
         return {
             'id': instance.id,
-            'items': OrderItemSerializer(
-                instance.items.all(), request=self.request
-            ).serialize(),
-            'price': instance.price,
-            'created_at': instance.created_at,
-            'status': instance.get_status_display(),
+            'items': (
+                OrderItemSerializer(instance.items.all(), request=self.request).serialize()
+                if self.wants('items')
+                else None
+            ),
+            'price': instance.price if self.wants('price') else None,
+            'created_at': instance.created_at if self.wants('created_at') else None,
+            'status': instance.get_status_display() if self.wants('status') else None,
         }
\ No newline at end of file
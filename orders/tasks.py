@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.utils import timezone
+
+from products.models import StockMovement
+from shared.jobs import periodic, process_in_chunks
+
+from .models import Order
+
+
+def expire_pending_orders(chunk_size=500, pause=0.0):
+    """
+    Caduca en bloques las órdenes pendientes cuya reserva de stock ha vencido.
+
+    Cada bloque es una transacción con un número fijo de consultas: se
+    seleccionan las órdenes más antiguas con el índice `(status, created_at)`
+    (bloqueándolas y saltando las que otra petición tiene bloqueadas, en los
+    motores que lo admiten), se marcan como caducadas con un UPDATE que solo
+    toca las que siguen pendientes y su stock se repone con otro (ver
+    `Order.restock`). Entre bloques se libera el bloqueo de escritura, así
+    que las compras concurrentes no esperan a que termine toda la pasada.
+
+    Parameters
+    ----------
+    chunk_size : int
+        Número máximo de órdenes caducadas por transacción.
+    pause : float
+        Segundos de espera entre bloques.
+
+    Returns
+    -------
+    int
+        Número total de órdenes caducadas.
+    """
+    overdue = (
+        Order.objects.select_for_update(skip_locked=True)
+        .filter(status=Order.Status.PENDING, created_at__lt=Order.reservation_cutoff())
+        .order_by('created_at')
+    )
+
+    def expire(pks):
+        # El filtro por estado repite la condición de la lectura: `select_for_update`
+        # no bloquea nada en SQLite, y un pago o cancelación confirmado entre la
+        # lectura y el UPDATE no se debe pisar.
+        updated_at = timezone.now()
+        expired = Order.objects.filter(pk__in=pks, status=Order.Status.PENDING).update(
+            status=Order.Status.EXPIRED, updated_at=updated_at
+        )
+        if expired < len(pks):
+            pks = list(
+                Order.objects.filter(
+                    pk__in=pks, status=Order.Status.EXPIRED, updated_at=updated_at
+                ).values_list('pk', flat=True)
+            )
+        Order.restock(pks, StockMovement.Reason.EXPIRY)
+        return expired
+
+    return process_in_chunks(overdue, expire, chunk_size, pause, atomic=True)
+
+
+@periodic('ORDER_EXPIRY_INTERVAL')
+def expire_orders():
+    """
+    Tarea periódica que caduca las órdenes pendientes y repone su stock.
+
+    Se ejecuta cada `settings.ORDER_EXPIRY_INTERVAL` segundos (ver
+    `shared.jobs.periodic`).
+
+    Returns
+    -------
+    int
+        Número de órdenes caducadas.
+    """
+    return expire_pending_orders(settings.ORDER_EXPIRY_CHUNK, settings.ORDER_EXPIRY_PAUSE)
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from products.models import Product
+from shared import idempotency
+from shared.cache import representation_cache
+from shared.models import IdempotencyKey
+from shared.tests import ConstantQueriesMixin
+from users.auth import token_cache
+
+from .models import Order, OrderItem
+
+User = get_user_model()
+
+CARD = {'card-number': '1234-1234-1234-1234', 'exp-date': '12/2030', 'cvc': '123'}
+
+
+class OrderQueryCountTests(TestCase):
+    """
+    Número de consultas de los endpoints que cargan la orden con `shared.loaders`.
+
+    La orden se lee una sola vez (con sus líneas y productos) y la comparten
+    el cargador, las comprobaciones y la vista. El token ya está en caché,
+    como en un cliente que hace varias peticiones.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        representation_cache.clear()
+        self.user = User.objects.create(username='client')
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {self.user.token.key}'}
+        token_cache.get(str(self.user.token.key))
+        self.order = Order.objects.create(user=self.user, price=Decimal('29.85'))
+        for i in range(3):
+            product = Product.objects.create(name=f'P{i}', price=Decimal('9.95'), stock=10)
+            OrderItem.objects.create(
+                order=self.order, product=product, quantity=1, unit_price=product.price
+            )
+
+    def test_pay_order(self):
+        # Orden, líneas y productos, el UPDATE condicional de `Order.close` y los
+        # productos de la respuesta (caché de representaciones vacía)
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                f'/api/orders/{self.order.pk}/pay-order/',
+                json.dumps(CARD),
+                content_type='application/json',
+                **self.headers,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['order']['items']), 3)
+
+    def test_pay_order_of_another_user(self):
+        other = User.objects.create(username='other')
+        token_cache.get(str(other.token.key))
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                f'/api/orders/{self.order.pk}/pay-order/',
+                json.dumps(CARD),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {other.token.key}',
+            )
+        self.assertEqual(response.status_code, 403)
+
+    def test_cancel_order(self):
+        with self.assertNumQueries(13):
+            response = self.client.post(
+                f'/api/orders/{self.order.pk}/cancel-order/', **self.headers
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.get(name='P0').stock, 11)
+
+    def test_add_product_to_order(self):
+        product = Product.objects.get(name='P0')
+        # El total se calcula con las líneas que ya cargó `check_order`: tras
+        # escribir la línea no se vuelven a leer
+        with self.assertNumQueries(13):
+            response = self.client.post(
+                f'/api/orders/{self.order.pk}/add-product/',
+                json.dumps({'product_id': product.pk, 'quantity': 2}),
+                content_type='application/json',
+                **self.headers,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['new_total'], 49.75)
+
+    def test_order_detail(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/api/orders/{self.order.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['items']), 3)
+
+
+class OrderListQueryCountTests(ConstantQueriesMixin, TestCase):
+    """El listado de órdenes del usuario no hace una consulta por fila."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='client')
+
+    def add_rows(self, count):
+        products = Product.objects.bulk_create(
+            Product(name=f'P{i}', price=Decimal('9.95'), stock=10) for i in range(count)
+        )
+        orders = Order.objects.bulk_create(Order(user=self.user) for _ in range(count))
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=2, unit_price=product.price)
+            for order, product in zip(orders, products)
+        )
+
+    def test_order_list(self):
+        self.assertConstantQueries('/api/orders/', self.user.token.key)
+
+
+class IdempotencyLeaseTests(TestCase):
+    """Reintentos de `add_order` con una `Idempotency-Key` que sigue en curso."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='client')
+        self.product = Product.objects.create(name='P', price=Decimal('9.95'), stock=10)
+
+    def add_order(self):
+        return self.client.post(
+            '/api/orders/add/',
+            json.dumps({'products': [{'id': self.product.pk, 'quantity': 1}]}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.user.token.key}',
+            HTTP_IDEMPOTENCY_KEY='k1',
+        )
+
+    def in_progress(self, age):
+        # Deja la clave como la reserva de una petición que no ha terminado
+        IdempotencyKey.objects.filter(key='k1').update(
+            status_code=None, created_at=timezone.now() - timedelta(seconds=age)
+        )
+
+    def test_abandoned_key_is_reclaimed(self):
+        first = self.add_order()
+        self.in_progress(age=120)
+        response = self.add_order()
+        self.assertEqual(response.status_code, first.status_code)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.get(key='k1').status_code, first.status_code)
+
+    @override_settings(IDEMPOTENCY_WAIT=10)
+    def test_waits_with_backoff(self):
+        self.add_order()
+        self.in_progress(age=0)
+        clock = mock.Mock(now=0.0, sleeps=[])
+        clock.monotonic = lambda: clock.now
+
+        def sleep(seconds):
+            clock.sleeps.append(seconds)
+            clock.now += seconds
+
+        clock.sleep = sleep
+        with mock.patch.object(idempotency, 'time', clock):
+            response = self.add_order()
+        self.assertEqual(response.status_code, 409)
+        # 10 s de espera en unas pocas comprobaciones, no una cada 50 ms
+        self.assertAlmostEqual(sum(clock.sleeps), 10)
+        self.assertLess(len(clock.sleeps), 20)
+        self.assertEqual(max(clock.sleeps), idempotency.MAX_POLL)
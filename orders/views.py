@@ -1,28 +1,28 @@
+import calendar
+from collections import Counter
 from decimal import Decimal
 
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
-from django.http import JsonResponse
 from django.utils import timezone
-from django.views.decorators.csrf import csrf_exempt
-
-from products.models import Product
-from shared.decorators import (
-    load_json_body,
-    required_fields,
-    required_method,
-    verify_admin,
-    verify_token,
-)
 
-from .decorators import validate_credit_card, validate_status, verify_order, verify_user
+from products.models import Product, StockMovement
+from shared.endpoints import endpoint
+from shared.pagination import cursor_pagination, paginate
+from shared.responses import JsonResponse
+from shared.serializers import check_fields, requested_fields
+
+from .decorators import check_credit_card, check_order, check_order_owner, check_status
 from .models import Order, OrderItem
+from .schemas import AddProductSchema, OrderSchema, PaymentSchema
 from .serializers import OrderSerializer
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
+@endpoint(
+    'GET',
+    auth='token',
+    checks=(check_fields(OrderSerializer), cursor_pagination(Order, '-created_at', '-id')),
+)
 def user_order_list(request):
     """
     Recupera todas las órdenes del usuario autenticado.
@@ -31,23 +31,24 @@ def user_order_list(request):
     con información detallada de los productos y cantidades.
 
     Decoradores aplicados:
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('GET'): Restringe el método HTTP a GET.
-        - verify_token: Verifica que el token de autenticación sea válido.
+        - endpoint('GET', auth='token'): Restringe el método a GET y verifica el token.
+
+    La lista se envía en streaming (ver `BaseSerializer.stream`), así que la
+    memoria no crece con el historial del usuario.
 
     :param request: Objeto de solicitud HTTP.
-    :return: JsonResponse con la lista de órdenes serializadas.
+    :return: StreamingHttpResponse con la lista de órdenes serializadas.
     """
     orders = Order.objects.filter(user=request.user).order_by('-created_at')
-    orders_serializer = OrderSerializer(orders, request=request)
-    return JsonResponse(orders_serializer.serialize(), safe=False, status=200)
+    page = paginate(request, orders)
+    orders_serializer = OrderSerializer(
+        page.items, request=request, fields=requested_fields(request)
+    )
+    return page.link(orders_serializer.stream_response())
 
 
 @login_required
-@csrf_exempt
-@required_method('GET')
-@verify_order
-@verify_user
+@endpoint('GET', load=(check_order,), checks=(check_order_owner, check_fields(OrderSerializer)))
 def order_detail(request, order_pk: int):
     """
     Recupera los detalles de un pedido específico.
@@ -57,23 +58,19 @@ def order_detail(request, order_pk: int):
 
     Decoradores aplicados:
         - login_required: Verifica que el usuario esté autenticado.
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('GET'): Restringe el método HTTP a GET.
-        - verify_order: Carga la orden en request.order si existe.
-        - verify_user: Verifica que el usuario autenticado sea el propietario de la orden.
+        - endpoint('GET'): Restringe el método a GET.
+        - check_order: Carga la orden en request.order si existe.
+        - check_order_owner: Verifica que el usuario autenticado sea el propietario de la orden.
 
     :param request: Objeto de solicitud HTTP.
     :param order_pk: ID de la orden a recuperar.
     :return: JsonResponse con los datos serializados de la orden.
     """
-    serializer = OrderSerializer(request.order, request=request)
+    serializer = OrderSerializer(request.order, request=request, fields=requested_fields(request))
     return serializer.json_response()
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@verify_token
+@endpoint('POST', auth='token', body=OrderSchema, idempotent=True)
 def add_order(request):
     """
     Crea una nueva orden de pedido con items detallados.
@@ -83,127 +80,73 @@ def add_order(request):
     Calcula el precio total y actualiza el stock de los productos.
     Crea OrderItems individuales para mantener el historial de precios.
 
-    Decoradores aplicados:
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('POST'): Restringe el método HTTP a POST.
-        - load_json_body: Carga el cuerpo de la solicitud como JSON.
-        - verify_token: Verifica que el token de autenticación sea válido.
-
-    :param request: Objeto de solicitud HTTP con los datos de productos.
-    :return: JsonResponse con el ID de la orden creada o un mensaje de error.
-    """
-    from .models import OrderItem  # Import local para evitar circular imports
-    
-    order_data = request.json_body
-    order = Order(user=request.user)
-    order.save()
-    
-    total_price = Decimal('0.00')
-    
-    for item in order_data['products']:
-        product_pk = item['id']
-        quantity = item['quantity']
-        
-        try:
-            product = Product.objects.get(pk=product_pk)
-        except Product.DoesNotExist:
-            # Si hay error, eliminar la orden creada para mantener consistencia
-            order.delete()
-            return JsonResponse({'error': f'Product with id {product_pk} not found'}, status=404)
-        
-        if product.stock < quantity:
-            # Si hay error, eliminar la orden creada para mantener consistencia
-            order.delete()
-            return JsonResponse({'error': f'Insufficient stock for {product.name}'}, status=400)
-        
-        # Actualizar stock
-        product.stock -= quantity
-        product.save()
-        
-        # Crear OrderItem - el unit_price se asigna automáticamente
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=quantity
-        )
-        
-        # Calcular total
-        total_price += product.price * Decimal(quantity)
-    
-    order.price = total_price
-    order.save()
-
-    return JsonResponse({'id': order.pk})
-    """
-    Crea una nueva orden de pedido con items detallados.
+    Todo el pedido es una transacción con un número fijo de consultas sea
+    cual sea el tamaño de la cesta: los productos se leen juntos, el stock
+    se descuenta con un único UPDATE condicional (ver
+    `Product.adjust_stock`), que impide vender dos veces las mismas unidades
+    en compras simultáneas y deja los apuntes en el libro de movimientos, y
+    los items se insertan con `bulk_create`. Si falla cualquier producto no
+    se guarda nada.
 
-    Este endpoint permite a un usuario autenticado generar una orden,
-    siempre que exista suficiente stock para los productos solicitados.
-    Calcula el precio total y actualiza el stock de los productos.
-    Crea OrderItems individuales para mantener el historial de precios.
+    Admite la cabecera `Idempotency-Key`: un reintento recibe la respuesta
+    de la primera petición sin crear otro pedido ni volver a descontar stock.
 
     Decoradores aplicados:
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('POST'): Restringe el método HTTP a POST.
-        - load_json_body: Carga el cuerpo de la solicitud como JSON.
-        - verify_token: Verifica que el token de autenticación sea válido.
+        - endpoint('POST', auth='token', body=OrderSchema): Restringe el método a POST,
+          valida el cuerpo JSON y verifica el token.
 
     :param request: Objeto de solicitud HTTP con los datos de productos.
     :return: JsonResponse con el ID de la orden creada o un mensaje de error.
     """
-    from .models import OrderItem  # Import local para evitar circular imports
-    
-    order_data = request.json_body
-    order = Order(user=request.user)
-    order.save()
-    
-    total_price = Decimal('0.00')
-    
-    for item in order_data['products']:
-        product_pk = item['id']
-        quantity = item['quantity']
-        
-        try:
-            product = Product.objects.get(pk=product_pk)
-        except Product.DoesNotExist:
-            # Si hay error, eliminar la orden creada para mantener consistencia
-            order.delete()
-            return JsonResponse({'error': f'Product with id {product_pk} not found'}, status=404)
-        
-        if product.stock < quantity:
-            # Si hay error, eliminar la orden creada para mantener consistencia
-            order.delete()
-            return JsonResponse({'error': f'Insufficient stock for {product.name}'}, status=400)
-        
-        # Actualizar stock
-        product.stock -= quantity
-        product.save()
-        
-        # Crear OrderItem con el precio actual del producto
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=quantity,
-            unit_price=product.price  # Capturar precio al momento de la compra
-        )
-        
-        # Calcular total
-        total_price += product.price * Decimal(quantity)
-    
-    order.price = total_price
-    order.save()
+    # Un mismo producto repetido en la cesta es una sola línea (order, product es único)
+    quantities = Counter()
+    for item in request.json_body['products']:
+        quantities[item['id']] += item['quantity']
+
+    with transaction.atomic():
+        # Se escribe antes de leer: el INSERT toma el bloqueo de escritura de
+        # entrada y el stock y los precios se leen ya dentro de él.
+        order = Order.objects.create(user=request.user)
+        changes = {pk: -quantity for pk, quantity in quantities.items()}
+        if not Product.adjust_stock(changes, StockMovement.Reason.SALE, order.pk):
+            stock = Product.objects.only('name', 'stock').in_bulk(list(quantities))
+            transaction.set_rollback(True)  # Descarta la orden
+            for product_pk, quantity in quantities.items():
+                if product_pk not in stock:
+                    return JsonResponse(
+                        {'error': f'Product with id {product_pk} not found'}, status=404
+                    )
+                if stock[product_pk].stock < quantity:
+                    return JsonResponse(
+                        {'error': f'Insufficient stock for {stock[product_pk].name}'},
+                        status=400,
+                    )
+            # El stock ha cambiado entre el UPDATE y la lectura
+            return JsonResponse({'error': 'Stock changed, please retry'}, status=409)
+        products = Product.objects.only('price').in_bulk(list(quantities))
+
+        # El precio unitario se fija al momento de la compra
+        items = [
+            OrderItem(
+                order=order, product=products[pk], quantity=quantity, unit_price=products[pk].price
+            )
+            for pk, quantity in quantities.items()
+        ]
+        OrderItem.objects.bulk_create(items)
+        order.price = sum((item.subtotal for item in items), Decimal('0.00'))
+        order.save(update_fields=['price'])
 
     return JsonResponse({'id': order.pk})
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('card-number', 'exp-date', 'cvc', model=Order)
-@verify_token
-@verify_order
-@validate_credit_card
-@verify_user
-@validate_status
+
+@endpoint(
+    'POST',
+    auth='token',
+    body=PaymentSchema,
+    load=(check_order,),
+    checks=(check_credit_card, check_order_owner, check_status),
+    idempotent=True,
+)
 def pay_order(request, order_pk: int):
     """
     Procesa el pago simulado de una orden.
@@ -213,25 +156,25 @@ def pay_order(request, order_pk: int):
     
     NOTA: Este es un pago simulado, no se procesa ningún cobro real.
 
+    Admite la cabecera `Idempotency-Key`: un reintento recibe la respuesta
+    del primer pago aunque la orden ya no esté pendiente.
+
     Decoradores aplicados:
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('POST'): Restringe el método HTTP a POST.
-        - load_json_body: Carga el cuerpo de la solicitud como JSON.
-        - required_fields: Verifica la presencia de campos de pago.
-        - verify_token: Verifica el token JWT del usuario.
-        - verify_order: Carga la orden si existe.
-        - validate_credit_card: Valida los campos de la tarjeta.
-        - verify_user: Verifica que el usuario sea el dueño de la orden.
-        - validate_status: Verifica que la orden esté en estado 'PENDING'.
+        - endpoint('POST', auth='token', body=PaymentSchema): Restringe el método a POST,
+          valida los campos de pago y verifica el token.
+        - check_order: Carga la orden si existe.
+        - check_credit_card: Valida los campos de la tarjeta.
+        - check_order_owner: Verifica que el usuario sea el dueño de la orden.
+        - check_status: Verifica que la orden esté en estado 'PENDING'.
 
     :param request: Objeto de solicitud HTTP con los datos de pago.
     :param order_pk: ID de la orden a pagar.
     :return: JsonResponse con un mensaje de confirmación y datos de la orden.
     """
     # Simular procesamiento de pago (sin transacción real)
-    request.order.status = Order.Status.COMPLETED
-    request.order.save()
-    
+    if not request.order.close(Order.Status.COMPLETED):
+        return JsonResponse({'error': 'This order is no longer pending.'}, status=400)
+
     serializer = OrderSerializer(request.order, request=request)
     return JsonResponse({
         'message': 'Your order has been paid and completed successfully',
@@ -239,12 +182,7 @@ def pay_order(request, order_pk: int):
     })
 
 
-@csrf_exempt
-@required_method('POST')
-@verify_token
-@verify_order
-@verify_user
-@validate_status
+@endpoint('POST', auth='token', load=(check_order,), checks=(check_order_owner, check_status))
 def cancel_order(request, order_pk: int):
     """
     Cancela una orden de pedido.
@@ -253,12 +191,10 @@ def cancel_order(request, order_pk: int):
     Solo se puede cancelar una orden válida, pendiente y propiedad del usuario.
 
     Decoradores aplicados:
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('POST'): Restringe el método HTTP a POST.
-        - verify_token: Verifica el token JWT del usuario.
-        - verify_order: Carga la orden si existe.
-        - verify_user: Verifica que el usuario sea el dueño de la orden.
-        - validate_status: Verifica que la orden no esté ya cancelada o completada.
+        - endpoint('POST', auth='token'): Restringe el método a POST y verifica el token.
+        - check_order: Carga la orden si existe.
+        - check_order_owner: Verifica que el usuario sea el dueño de la orden.
+        - check_status: Verifica que la orden no esté ya cancelada, completada o caducada.
 
     :param request: Objeto de solicitud HTTP.
     :param order_pk: ID de la orden a cancelar.
@@ -266,16 +202,13 @@ def cancel_order(request, order_pk: int):
     """
     try:
         with transaction.atomic():
+            # Cambiar estado de la orden (si el pago o la caducidad no se han adelantado)
+            if not request.order.close(Order.Status.CANCELLED):
+                return JsonResponse({'error': 'This order is no longer pending.'}, status=400)
+
             # Restaurar stock de todos los items de la orden
-            for item in request.order.items.all():
-                product = Product.objects.select_for_update().get(pk=item.product.pk)
-                product.stock += item.quantity
-                product.save()
-            
-            # Cambiar estado de la orden
-            request.order.status = Order.Status.CANCELLED
-            request.order.save()
-            
+            Order.restock([request.order.pk], StockMovement.Reason.CANCELLATION)
+
             serializer = OrderSerializer(request.order, request=request)
             return JsonResponse({
                 'message': f'Order {order_pk} has been cancelled successfully',
@@ -286,10 +219,7 @@ def cancel_order(request, order_pk: int):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
-@verify_admin
+@endpoint('GET', auth='admin')
 def get_earnings(request):
     """
     Obtiene las ganancias diarias del mes actual para todas las órdenes completadas.
@@ -298,6 +228,9 @@ def get_earnings(request):
     del mes actual, considerando únicamente las órdenes con estado 'COMPLETED'. Retorna
     una respuesta JSON con dos listas: fechas y valores correspondientes a las ganancias de cada día.
 
+    Los días y el mes son los de Canarias y toda la serie sale de una sola
+    consulta agrupada por día (ver `Order.daily_earnings`).
+
     Parámetros
     ----------
     request : HttpRequest
@@ -318,36 +251,19 @@ def get_earnings(request):
         "values": [150.0, 200.0, ..., 175.5]
     }
     """
-    now = timezone.now()
-    first_day_of_month = now.replace(day=1)
-    last_day_of_month = (first_day_of_month + timezone.timedelta(days=31)).replace(
-        day=1
-    ) - timezone.timedelta(days=1)
-
-    total_earnings = []
-    labels = []
-
-    for day in range(1, last_day_of_month.day + 1):
-        date = first_day_of_month.replace(day=day)
-        orders = Order.objects.filter(
-            created_at__date=date, 
-            status=Order.Status.COMPLETED
-        )
-        earnings = sum(float(order.price) for order in orders if order.price)
-
-        total_earnings.append(earnings)
-        labels.append(date.strftime('%Y-%m-%d'))
+    today = timezone.localdate()
+    first_day_of_month = today.replace(day=1)
+    last_day_of_month = today.replace(day=calendar.monthrange(today.year, today.month)[1])
 
+    earnings = Order.daily_earnings(first_day_of_month, last_day_of_month)
     return JsonResponse({
-        'labels': labels,
-        'values': total_earnings,
+        'labels': [day.strftime('%Y-%m-%d') for day in earnings],
+        # Como antes, los días sin ventas salen como 0 y no 0.0
+        'values': [float(total) if total else 0 for total in earnings.values()],
     })
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
-@verify_admin
+@endpoint('GET', auth='admin')
 def earnings_summary(request):
     """
     Obtiene un resumen de ganancias (diario, semanal, mensual).
@@ -362,10 +278,7 @@ def earnings_summary(request):
         'monthly_earnings': float(summary['monthly']),
     })
 
-@csrf_exempt
-@required_method('POST')
-@verify_token
-@verify_admin
+@endpoint('POST', auth='admin')
 def delete_order(request, order_pk: int):
     """
     Elimina un evento existente.
@@ -388,13 +301,13 @@ def delete_order(request, order_pk: int):
     order.delete()
     return JsonResponse({'msg': 'Order has been deleted'})
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@verify_token
-@verify_order
-@verify_user
-@validate_status  # Solo permite agregar a órdenes PENDING
+@endpoint(
+    'POST',
+    auth='token',
+    body=AddProductSchema,
+    load=(check_order,),
+    checks=(check_order_owner, check_status),
+)
 def add_product_to_order(request, order_pk: int):
     """
     Agrega un producto a una orden existente.
@@ -403,20 +316,17 @@ def add_product_to_order(request, order_pk: int):
     validando stock y actualizando el precio total de la orden.
 
     Decoradores aplicados:
-        - csrf_exempt: Exime de la verificación CSRF.
-        - required_method('POST'): Restringe el método HTTP a POST.
-        - load_json_body: Carga el cuerpo de la solicitud como JSON.
-        - verify_token: Verifica que el token de autenticación sea válido.
-        - verify_order: Carga la orden si existe.
-        - verify_user: Verifica que el usuario sea el dueño de la orden.
-        - validate_status: Verifica que la orden esté en estado 'PENDING'.
+        - endpoint('POST', auth='token', body=AddProductSchema): Restringe el método a
+          POST, valida el cuerpo JSON y verifica el token.
+        - check_order: Carga la orden si existe.
+        - check_order_owner: Verifica que el usuario sea el dueño de la orden.
+        - check_status: Verifica que la orden esté en estado 'PENDING'.
 
     :param request: Objeto de solicitud HTTP con los datos del producto.
     :param order_pk: ID de la orden a la que agregar el producto.
     :return: JsonResponse con confirmación o mensaje de error.
     """
     from .models import OrderItem
-    from decimal import Decimal
     
     product_data = request.json_body
     product_id = product_data['product_id']
@@ -427,33 +337,34 @@ def add_product_to_order(request, order_pk: int):
     except Product.DoesNotExist:
         return JsonResponse({'error': f'Product with id {product_id} not found'}, status=404)
     
-    if product.stock < quantity:
-        return JsonResponse({'error': f'Insufficient stock for {product.name}'}, status=400)
-    
-    # Verificar si el producto ya existe en la orden
-    existing_item = OrderItem.objects.filter(order=request.order, product=product).first()
-    
-    if existing_item:
-        # Si ya existe, actualizar la cantidad
-        existing_item.quantity += quantity
-        existing_item.save()
-    else:
-        # Si no existe, crear nuevo OrderItem
-        OrderItem.objects.create(
-            order=request.order,
-            product=product,
-            quantity=quantity
-        )
-    
-    # Actualizar stock del producto
-    product.stock -= quantity
-    product.save()
-    
-    # Recalcular precio total de la orden
-    total_price = sum(item.subtotal for item in request.order.items.all())
-    request.order.price = total_price
-    request.order.save()
-    
+    with transaction.atomic():
+        # Descontar stock con el mismo UPDATE condicional que `add_order`
+        if not Product.adjust_stock(
+            {product.pk: -quantity}, StockMovement.Reason.SALE, request.order.pk
+        ):
+            return JsonResponse({'error': f'Insufficient stock for {product.name}'}, status=400)
+
+        # Verificar si el producto ya existe en la orden (items precargados por check_order)
+        items = list(request.order.items.all())
+        existing_item = next((item for item in items if item.product_id == product.pk), None)
+
+        if existing_item:
+            # Si ya existe, actualizar la cantidad
+            existing_item.quantity += quantity
+            existing_item.save()
+        else:
+            # Si no existe, crear nuevo OrderItem
+            items.append(OrderItem.objects.create(
+                order=request.order,
+                product=product,
+                quantity=quantity
+            ))
+
+        # Recalcular precio total de la orden
+        total_price = sum(item.subtotal for item in items)
+        request.order.price = total_price
+        request.order.save()
+
     return JsonResponse({
         'msg': f'Product {product.name} added to order {order_pk}',
         'new_total': float(total_price)
@@ -1,8 +1,18 @@
-from django.http import JsonResponse
+from shared.decorators import as_decorator
+from shared.loaders import load_object
+from shared.responses import JsonResponse
 
 from .models import Product
 
 
+def check_product(request, kwargs):
+    """Comprobación de `verify_product`."""
+    try:
+        request.product = load_object(request, Product.objects.all(), pk=kwargs['product_pk'])
+    except Product.DoesNotExist:
+        return JsonResponse({'error': 'Product not found'}, status=404)
+
+
 def verify_product(func):
     """
     Decorador que verifica la existencia de un producto por su ID.
@@ -16,12 +26,4 @@ def verify_product(func):
     :return: Función decorada que incluye la verificación del producto.
     """
 
-    def wrapper(request, *args, **kwargs):
-        try:
-            product = Product.objects.get(id=kwargs['product_pk'])
-            request.product = product
-        except Product.DoesNotExist:
-            return JsonResponse({'error': 'Product not found'}, status=404)
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_product)(func)
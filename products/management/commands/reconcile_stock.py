@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from products.models import Product, StockMovement
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula Product.stock a partir del libro de movimientos en una pasada por bloques '
+        'y corrige los productos descuadrados (o solo los lista con --dry-run)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.STOCK_SNAPSHOT_CHUNK,
+            help='Productos por bloque',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Suma el libro entero en lugar de partir de las instantáneas',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true', help='Lista los descuadres sin corregirlos'
+        )
+
+    def handle(self, *args, **options):
+        checked = mismatched = fixed = 0
+        last_pk = 0
+        while True:
+            stock = dict(
+                Product.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'stock')[: options['chunk_size']]
+            )
+            if not stock:
+                break
+            levels = StockMovement.levels(stock, snapshots=not options['full'])
+            wrong = {pk: levels[pk] for pk in stock if levels[pk] != stock[pk]}
+            for pk, level in wrong.items():
+                self.stdout.write(f'Producto {pk}: stock {stock[pk]}, libro {level}')
+            checked += len(stock)
+            mismatched += len(wrong)
+            if wrong and not options['dry_run']:
+                fixed += self.fix(stock, wrong)
+            last_pk = max(stock)
+
+        summary = f'Productos revisados: {checked}, descuadrados: {mismatched}'
+        if not options['dry_run']:
+            summary += f', corregidos: {fixed}'
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def fix(self, stock, wrong):
+        """
+        Escribe el saldo del libro en los productos descuadrados con un solo UPDATE.
+
+        La condición `stock = valor leído` deja fuera los productos que han
+        cambiado durante la pasada: su venta o reposición ya tiene apunte, así
+        que se revisarán bien en la siguiente. Tampoco se corrigen los saldos
+        negativos, que indican apuntes perdidos.
+        """
+        wrong = {pk: level for pk, level in wrong.items() if level >= 0}
+        if not wrong:
+            return 0
+        read = Case(
+            *(When(pk=pk, then=Value(stock[pk])) for pk in wrong), output_field=IntegerField()
+        )
+        level = Case(
+            *(When(pk=pk, then=Value(level)) for pk, level in wrong.items()),
+            output_field=IntegerField(),
+        )
+        now = timezone.now()
+        fixed = Product.objects.filter(pk__in=wrong, stock=read).update(
+            stock=level, updated_at=now
+        )
+        if fixed:
+            Product.stock_changed(wrong, now)
+        return fixed
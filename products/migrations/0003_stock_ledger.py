@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def open_ledger(apps, schema_editor):
+    # El stock actual de cada producto es su primer apunte
+    Product = apps.get_model('products', 'Product')
+    StockMovement = apps.get_model('products', 'StockMovement')
+    products = Product.objects.filter(stock__gt=0).values_list('pk', 'stock').iterator(2000)
+    batch = []
+    for pk, stock in products:
+        batch.append(StockMovement(product_id=pk, change=stock, reason='I'))
+        if len(batch) == 2000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_snapshot', serialize=False, to='products.product')),
+                ('stock', models.IntegerField()),
+                ('movement_id', models.PositiveBigIntegerField()),
+                ('taken_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change', models.IntegerField()),
+                ('reason', models.CharField(choices=[('I', 'Initial stock'), ('A', 'Manual adjustment'), ('S', 'Sale'), ('C', 'Order cancelled'), ('E', 'Reservation expired')], max_length=1)),
+                ('order_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'id'], name='stockmovement_product_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,12 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from shared.cache import representation_cache
+from shared.models import TableVersion
 
 
 class Product(models.Model):
@@ -14,14 +22,22 @@ class Product(models.Model):
     price : DecimalField
         Precio del producto, con hasta 8 dígitos y 2 decimales.
     stock : PositiveIntegerField
-        Cantidad disponible en inventario.
+        Cantidad disponible en inventario. Es el saldo del libro de
+        movimientos (`StockMovement`), guardado en la fila para leerlo sin
+        recorrer el libro.
     image : ImageField
         Imagen del producto. Puede ser personalizada o usar una imagen por defecto.
+    updated_at : DateTimeField
+        Fecha y hora de la última modificación.
 
     Métodos
     -------
     __str__ : str
         Devuelve el nombre del producto como representación legible.
+    adjust_stock : bool
+        Aplica cambios de stock a varios productos con una sola consulta.
+    apply_movements : bool
+        Aplica y registra movimientos de stock con una sola consulta.
     """
 
     name = models.CharField(max_length=100)
@@ -34,6 +50,7 @@ class Product(models.Model):
         blank=True,
         null=True,
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """
@@ -45,3 +62,253 @@ class Product(models.Model):
             Nombre del producto.
         """
         return self.name
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda el producto y registra en el libro el cambio de stock, si lo hay.
+
+        El alta de un producto registra su stock inicial y una edición (vista
+        `edit_product`, admin) la diferencia con el stock de la fila, que se
+        relee bloqueada en la misma transacción: una venta aplicada con
+        `apply_movements` después de cargar la instancia no descuadra el libro
+        (el stock guardado es el de la edición y el ajuste lo compensa). Las
+        ventas, cancelaciones y caducidades no pasan por aquí sino por
+        `apply_movements`.
+        """
+        update_fields = kwargs.get('update_fields')
+        tracked = 'stock' not in self.get_deferred_fields() and (
+            update_fields is None or 'stock' in update_fields
+        )
+        with transaction.atomic():
+            saved_stock = None
+            if tracked and not self._state.adding:
+                saved_stock = (
+                    type(self)
+                    ._base_manager.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('stock', flat=True)
+                    .first()
+                )
+            change = self.stock - (saved_stock or 0) if tracked else 0
+            super().save(*args, **kwargs)
+            if change:
+                StockMovement.objects.create(
+                    product=self,
+                    change=change,
+                    reason=(
+                        StockMovement.Reason.INITIAL
+                        if saved_stock is None
+                        else StockMovement.Reason.ADJUSTMENT
+                    ),
+                )
+
+    @classmethod
+    def adjust_stock(cls, changes: dict, reason, order_pk=None) -> bool:
+        """
+        Suma a cada producto su cambio de stock y lo registra en el libro.
+
+        Atajo de `apply_movements` para un único motivo y orden.
+
+        Parameters
+        ----------
+        changes : dict
+            `{pk: cambio}`; negativo para retirar unidades, positivo para reponerlas.
+        reason : StockMovement.Reason
+            Motivo de los movimientos.
+        order_pk : int, opcional
+            Orden que los origina.
+
+        Returns
+        -------
+        bool
+            True si se han aplicado todos los cambios.
+        """
+        return cls.apply_movements(
+            StockMovement(product_id=pk, change=change, reason=reason, order_id=order_pk)
+            for pk, change in changes.items()
+        )
+
+    @classmethod
+    def apply_movements(cls, movements) -> bool:
+        """
+        Aplica movimientos de stock con un único UPDATE condicional y los registra.
+
+        El stock se calcula en la base de datos (`stock + cambio`) y solo se
+        actualiza si no queda negativo, así que dos compras simultáneas no
+        pueden vender las mismas unidades: la segunda vuelve a evaluar la
+        condición sobre el stock ya descontado. Si algún producto no existe o
+        no tiene stock suficiente, no se aplica ningún cambio. Los
+        movimientos se insertan con un solo `bulk_create` en la misma
+        transacción, así que el libro y `stock` nunca divergen.
+
+        Como `QuerySet.update()` no emite señales, invalida aquí las
+        representaciones cacheadas y la versión de la tabla.
+
+        Parameters
+        ----------
+        movements : iterable of StockMovement
+            Movimientos sin guardar (varios pueden ser del mismo producto).
+
+        Returns
+        -------
+        bool
+            True si se han aplicado todos los movimientos.
+        """
+        movements = [movement for movement in movements if movement.change]
+        changes = defaultdict(int)
+        for movement in movements:
+            changes[movement.product_id] += movement.change
+        if not changes:
+            return True
+        delta = Case(
+            *(When(pk=pk, then=Value(change)) for pk, change in changes.items()),
+            output_field=IntegerField(),
+        )
+        needed = Case(
+            *(When(pk=pk, then=Value(-change)) for pk, change in changes.items()),
+            output_field=IntegerField(),
+        )
+        now = timezone.now()
+        with transaction.atomic():
+            updated = cls.objects.filter(pk__in=changes, stock__gte=needed).update(
+                stock=F('stock') + delta, updated_at=now
+            )
+            if updated != len(changes):
+                transaction.set_rollback(True)
+                return False
+            for movement in movements:
+                movement.created_at = now
+            StockMovement.objects.bulk_create(movements)
+            cls.stock_changed(changes, now)
+        return True
+
+    @classmethod
+    def stock_changed(cls, pks, changed_at=None) -> None:
+        """
+        Invalida las representaciones y la versión de la tabla tras un UPDATE de stock.
+
+        Parameters
+        ----------
+        pks : iterable
+            Productos modificados.
+        changed_at : datetime, opcional
+            Momento de la escritura. Por defecto, ahora.
+        """
+        for pk in pks:
+            representation_cache.invalidate(cls, pk)
+        TableVersion.bump(cls, changed_at)
+
+
+class StockMovement(models.Model):
+    """
+    Apunte del libro de movimientos de stock.
+
+    El libro solo crece: cada cambio de `Product.stock` añade un apunte con
+    la cantidad, el motivo y, si la hay, la orden que lo origina. La suma de
+    los apuntes de un producto es su stock (ver `levels` y el comando
+    `reconcile_stock`).
+
+    Attributes
+    ----------
+    product : ForeignKey
+        Producto afectado.
+    change : IntegerField
+        Unidades que entran (positivo) o salen (negativo).
+    reason : CharField
+        Motivo del movimiento.
+    order_id : PositiveBigIntegerField
+        ID de la orden que lo origina, si la hay. No es una clave ajena para
+        que el apunte sobreviva al borrado de la orden.
+    created_at : DateTimeField
+        Fecha y hora del movimiento.
+    """
+
+    class Meta:
+        # Saldo de un producto a partir de su instantánea (ver `levels`)
+        indexes = [models.Index(fields=['product', 'id'], name='stockmovement_product_idx')]
+
+    class Reason(models.TextChoices):
+        """Motivos de un movimiento de stock."""
+
+        INITIAL = 'I', 'Initial stock'
+        ADJUSTMENT = 'A', 'Manual adjustment'
+        SALE = 'S', 'Sale'
+        CANCELLATION = 'C', 'Order cancelled'
+        EXPIRY = 'E', 'Reservation expired'
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    change = models.IntegerField()
+    reason = models.CharField(max_length=1, choices=Reason.choices)
+    order_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.product_id} {self.change:+d} ({self.get_reason_display()})'
+
+    @classmethod
+    def levels(cls, product_pks, up_to=None, snapshots=True) -> dict:
+        """
+        Calcula el stock de varios productos según el libro, con una sola consulta.
+
+        Se parte de la última instantánea de cada producto (ver
+        `StockSnapshot`) y se suman solo los apuntes posteriores, así que el
+        coste no depende de la longitud del historial sino de lo ocurrido
+        desde la última instantánea.
+
+        Parameters
+        ----------
+        product_pks : iterable
+            Productos a calcular.
+        up_to : int, opcional
+            Último apunte a incluir. Por defecto, todos.
+        snapshots : bool
+            Si se parte de las instantáneas. Con False se recorre el libro
+            entero.
+
+        Returns
+        -------
+        dict
+            `{pk: stock}`.
+        """
+        tail = cls.objects.filter(product=OuterRef('pk'))
+        if snapshots:
+            tail = tail.filter(pk__gt=Coalesce(OuterRef('stock_snapshot__movement_id'), 0))
+        if up_to is not None:
+            tail = tail.filter(pk__lte=up_to)
+        tail = tail.order_by().values('product').annotate(total=Sum('change')).values('total')
+        rows = Product.objects.filter(pk__in=product_pks).annotate(
+            base=Coalesce('stock_snapshot__stock', 0) if snapshots else Value(0),
+            tail=Coalesce(Subquery(tail), 0),
+        )
+        return {pk: base + tail for pk, base, tail in rows.values_list('pk', 'base', 'tail')}
+
+
+class StockSnapshot(models.Model):
+    """
+    Saldo de un producto en el libro hasta un apunte dado.
+
+    Lo actualiza periódicamente `products.tasks.snapshot_stock` para que
+    calcular el saldo (ver `StockMovement.levels`) solo tenga que sumar los
+    apuntes recientes.
+
+    Attributes
+    ----------
+    product : OneToOneField
+        Producto.
+    stock : IntegerField
+        Suma de los apuntes del producto hasta `movement_id` incluido.
+    movement_id : PositiveBigIntegerField
+        Último apunte incluido.
+    taken_at : DateTimeField
+        Fecha y hora de la instantánea.
+    """
+
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name='stock_snapshot'
+    )
+    stock = models.IntegerField()
+    movement_id = models.PositiveBigIntegerField()
+    taken_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.product_id}: {self.stock} (#{self.movement_id})'
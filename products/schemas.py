@@ -0,0 +1,9 @@
+from shared.schemas import Decimal, Integer, Schema, String
+
+ProductSchema = Schema(
+    name=String(),
+    description=String(null=True),
+    price=Decimal(),
+    stock=Integer(min_value=0),
+    image=String(required=False, null=True),
+)
@@ -1,5 +1,8 @@
+from shared.cache import representation_cache
 from shared.serializers import BaseSerializer
 
+from .models import Product
+
 
 class ProductSerializer(BaseSerializer):
     """
@@ -11,6 +14,23 @@ class ProductSerializer(BaseSerializer):
         Serializa una instancia de Product en un diccionario con sus atributos principales.
     """
 
+    cache = representation_cache
+    model = Product
+
+    values_plan = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('description', 'description'),
+        ('price', 'price'),
+        ('stock', 'stock'),
+        ('image', 'image', 'image_url'),
+    )
+
+    def image_url(self, name: str) -> str:
+        """URL de la imagen a partir del nombre guardado en la columna `image`."""
+        field = Product._meta.get_field('image')
+        return f'http://localhost:8000{self.build_url(field.attr_class(None, field, name).url)}'
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia de producto.
@@ -37,5 +57,9 @@ class ProductSerializer(BaseSerializer):
             'description': instance.description,
             'price': instance.price,
             'stock': instance.stock,
-            'image': f'http://localhost:8000{self.build_url(instance.image.url)}',
+            'image': (
+                f'http://localhost:8000{self.build_url(instance.image.url)}'
+                if self.wants('image')
+                else None
+            ),
         }
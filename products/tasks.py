@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from shared.jobs import chunked, periodic
+
+from .models import Product, StockMovement, StockSnapshot
+
+
+def take_stock_snapshots(chunk_size=1000):
+    """
+    Actualiza las instantáneas de stock de todos los productos.
+
+    Todas se toman hasta el mismo apunte: el último con más de
+    `settings.STOCK_SNAPSHOT_LAG` segundos, para no dejar fuera apuntes de
+    transacciones que aún no han confirmado. Los productos se recorren por
+    bloques de `chunk_size` y cada bloque cuesta una consulta para calcular
+    los saldos (ver `StockMovement.levels`) y otra para guardarlos.
+
+    Parameters
+    ----------
+    chunk_size : int
+        Productos por bloque.
+
+    Returns
+    -------
+    int
+        Número de instantáneas guardadas.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.STOCK_SNAPSHOT_LAG)
+    # Se recorre el índice de la clave primaria hacia atrás: solo se leen los apuntes recientes
+    watermark = (
+        StockMovement.objects.filter(created_at__lt=cutoff)
+        .order_by('-pk')
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if watermark is None:
+        return 0
+    taken_at = timezone.now()
+    total = 0
+    for pks in chunked(Product.objects.all(), chunk_size):
+        levels = StockMovement.levels(pks, up_to=watermark)
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(
+                    product_id=pk, stock=stock, movement_id=watermark, taken_at=taken_at
+                )
+                for pk, stock in levels.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['stock', 'movement_id', 'taken_at'],
+        )
+        total += len(levels)
+    return total
+
+
+@periodic('STOCK_SNAPSHOT_INTERVAL')
+def snapshot_stock():
+    """
+    Tarea periódica que actualiza las instantáneas del libro de stock.
+
+    Se ejecuta cada `settings.STOCK_SNAPSHOT_INTERVAL` segundos (ver
+    `shared.jobs.periodic`).
+
+    Returns
+    -------
+    int
+        Número de instantáneas guardadas.
+    """
+    return take_stock_snapshots(settings.STOCK_SNAPSHOT_CHUNK)
@@ -1,3 +1,119 @@
-from django.test import TestCase
+import gzip
+import json
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from shared.cache import compressed_body_cache, representation_cache
+from shared.tests import ConstantQueriesMixin
+
+from .models import Product, StockMovement
+from .serializers import ProductSerializer
+
+
+class ProductQueryCountTests(TestCase):
+    """Número de consultas del detalle de un producto."""
+
+    def setUp(self):
+        representation_cache.clear()
+        self.product = Product.objects.create(name='Cera', price=Decimal('9.95'), stock=10)
+
+    def test_product_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/products/{self.product.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Cera')
+
+    def test_product_detail_cached(self):
+        self.client.get(f'/api/products/{self.product.pk}/')
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/products/{self.product.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_product(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/999/')
+        self.assertEqual(response.status_code, 404)
+
+
+class StockLedgerTests(TestCase):
+    """El libro de movimientos cuadra con la columna `stock`."""
+
+    def ledger(self, product):
+        return sum(product.stock_movements.values_list('change', flat=True))
+
+    def test_edit_after_concurrent_sale(self):
+        product = Product.objects.create(name='Cera', price=Decimal('9.95'), stock=10)
+        stale = Product.objects.get(pk=product.pk)
+        Product.adjust_stock({product.pk: -3}, StockMovement.Reason.SALE)
+        stale.stock = 20
+        stale.save()
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 20)
+        self.assertEqual(self.ledger(product), 20)
+        self.assertEqual(product.stock_movements.latest('id').change, 13)
+
+
+class ProductListQueryCountTests(ConstantQueriesMixin, TestCase):
+    """El listado de productos no hace una consulta por fila."""
+
+    def add_rows(self, count):
+        Product.objects.bulk_create(
+            Product(name=f'P{i}', price=Decimal('9.95'), stock=10) for i in range(count)
+        )
+
+    def test_product_list(self):
+        self.assertConstantQueries('/api/products/')
+
+
+class ProductListStreamErrorTests(TestCase):
+    """Errores al serializar el listado de productos, que se envía en streaming."""
+
+    def setUp(self):
+        Product.objects.bulk_create(
+            Product(name=f'P{i}', price=Decimal('9.95'), stock=10, image=f'products/p{i}.png')
+            for i in range(2)
+        )
+        self.client.raise_request_exception = False
+
+    def test_error_in_first_chunk(self):
+        with mock.patch.object(ProductSerializer, 'image_url', side_effect=ValueError):
+            response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 500)
+
+    @override_settings(STREAM_CHUNK_SIZE=1)
+    def test_error_after_first_chunk(self):
+        image_url = mock.Mock(side_effect=['http://localhost:8000/p0.png', ValueError])
+        with mock.patch.object(ProductSerializer, 'image_url', image_url):
+            response = self.client.get('/api/products/')
+            self.assertEqual(response.status_code, 200)
+            with self.assertLogs('shared.serializers', 'ERROR'), self.assertRaises(ValueError):
+                response.getvalue()
+
+
+class ProductListCompressionTests(TestCase):
+    """Compresión del listado en streaming y su caché de cuerpos comprimidos."""
+
+    def setUp(self):
+        compressed_body_cache.clear()
+        Product.objects.bulk_create(
+            Product(name=f'P{i}', price=Decimal('9.95'), stock=10) for i in range(50)
+        )
+
+    def get(self):
+        response = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        return json.loads(gzip.decompress(response.getvalue()))
+
+    def test_small_list_is_cached(self):
+        products = self.get()
+        self.assertEqual(len(products), 50)
+        self.assertEqual(compressed_body_cache.stats()['size'], 1)
+        self.assertEqual(self.get(), products)
+        self.assertEqual(compressed_body_cache.hits, 1)
+
+    @override_settings(COMPRESSION_CACHE_MAX_STREAM=100)
+    def test_large_list_is_not_cached(self):
+        self.assertEqual(len(self.get()), 50)
+        self.assertEqual(compressed_body_cache.stats()['size'], 0)
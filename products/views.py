@@ -2,29 +2,36 @@ import base64
 import uuid
 
 from django.core.files.base import ContentFile
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-
-from shared.decorators import (
-    load_json_body,
-    required_fields,
-    required_method,
-    verify_admin,
-    verify_token,
-)
 
-from .decorators import verify_product
+from shared.conditional import conditional_get, set_validators
+from shared.endpoints import endpoint
+from shared.pagination import cursor_pagination, paginate
+from shared.responses import JsonResponse
+from shared.serializers import check_fields, requested_fields
+
+from .decorators import check_product
 from .models import Product
+from .schemas import ProductSchema
 from .serializers import ProductSerializer
 
 
-@required_method('GET')
+@endpoint(
+    'GET',
+    csrf_exempt=False,
+    checks=(
+        check_fields(ProductSerializer),
+        cursor_pagination(Product, 'id'),
+        conditional_get(Product),
+    ),
+)
 def product_list(request):
     """
     Devuelve una lista de todos los productos en formato JSON.
 
     Este endpoint permite obtener todos los productos registrados en la base de datos.
-    Los productos se serializan y se devuelven en una respuesta JSON.
+    Los productos se serializan y se envían en streaming, por bloques.
+    Admite peticiones condicionales: si `If-None-Match` o `If-Modified-Since`
+    siguen vigentes responde 304 sin generar el cuerpo (ver `conditional_get`).
 
     Parameters
     ----------
@@ -33,16 +40,15 @@ def product_list(request):
 
     Returns
     -------
-    JsonResponse
+    StreamingHttpResponse
         Respuesta JSON con la lista de productos.
     """
-    products = ProductSerializer(Product.objects.all())
-    return products.json_response()
+    page = paginate(request, Product.objects.all())
+    products = ProductSerializer(page.items, fields=requested_fields(request))
+    return set_validators(request, page.link(products.stream_response()))
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_product
+@endpoint('GET', checks=(check_fields(ProductSerializer),))
 def product_detail(request, product_pk):
     """
     Devuelve los detalles de un producto específico.
@@ -62,16 +68,14 @@ def product_detail(request, product_pk):
     JsonResponse
         Respuesta JSON con los detalles del producto.
     """
-    serializer = ProductSerializer(request.product, request=request)
-    return serializer.json_response()
+    serializer = ProductSerializer(request=request, fields=requested_fields(request))
+    try:
+        return JsonResponse(serializer.serialize_pk(product_pk))
+    except Product.DoesNotExist:
+        return JsonResponse({'error': 'Product not found'}, status=404)
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('name', 'description', 'price', 'stock', model=Product)
-@verify_token
-@verify_admin
+@endpoint('POST', auth='admin', body=ProductSchema)
 def add_product(request):
     """
     Agrega un nuevo producto.
@@ -115,13 +119,7 @@ def add_product(request):
     return JsonResponse({'id': product.pk})
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('name', 'description', 'price', 'stock', model=Product)
-@verify_token
-@verify_admin
-@verify_product
+@endpoint('POST', auth='admin', body=ProductSchema, load=(check_product,))
 def edit_product(request, product_pk: int):
     """
     Edita un producto existente.
@@ -164,11 +162,7 @@ def edit_product(request, product_pk: int):
     return JsonResponse({'msg': 'El producto ha sido editado'})
 
 
-@csrf_exempt
-@required_method('POST')
-@verify_token
-@verify_admin
-@verify_product
+@endpoint('POST', auth='admin', load=(check_product,))
 def delete_product(request, product_pk: int):
     """
     Elimina un producto existente.
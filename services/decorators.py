@@ -1,8 +1,18 @@
-from django.http import JsonResponse
+from shared.decorators import as_decorator
+from shared.loaders import load_object
+from shared.responses import JsonResponse
 
 from .models import Service
 
 
+def check_service(request, kwargs):
+    """Comprobación de `verify_service`."""
+    try:
+        request.service = load_object(request, Service.objects.all(), pk=kwargs['service_pk'])
+    except Service.DoesNotExist:
+        return JsonResponse({'error': 'Servicio no encontrado'}, status=404)
+
+
 def verify_service(func):
     """
     Verifica que el servicio especificado exista.
@@ -23,12 +33,4 @@ def verify_service(func):
         Función envuelta que verifica la existencia del servicio.
     """
 
-    def wrapper(request, *args, **kwargs):
-        try:
-            service = Service.objects.get(id=kwargs['service_pk'])
-            request.service = service
-            return func(request, *args, **kwargs)
-        except Service.DoesNotExist:
-            return JsonResponse({'error': 'Servicio no encontrado'}, status=404)
-
-    return wrapper
+    return as_decorator(check_service)(func)
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_alter_service_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -22,6 +22,8 @@ class Service(models.Model):
         Duración del servicio como objeto timedelta.
     created_at : DateTimeField
         Fecha y hora en que el servicio fue creado.
+    updated_at : DateTimeField
+        Fecha y hora de la última modificación.
 
     Métodos
     -------
@@ -43,6 +45,7 @@ class Service(models.Model):
     )
     duration = models.DurationField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """
@@ -0,0 +1,11 @@
+from shared.schemas import Decimal, Parsed, Schema, String
+
+from .models import Service
+
+ServiceSchema = Schema(
+    name=String(),
+    description=String(),
+    price=Decimal(),
+    duration=Parsed(Service.convert_duration_string),
+    image=String(required=False, null=True),
+)
@@ -1,5 +1,8 @@
+from shared.cache import representation_cache
 from shared.serializers import BaseSerializer
 
+from .models import Service
+
 
 class ServiceSerializer(BaseSerializer):
     """
@@ -11,6 +14,24 @@ class ServiceSerializer(BaseSerializer):
         Serializa una instancia de Service en un diccionario con sus atributos principales.
     """
 
+    cache = representation_cache
+    model = Service
+
+    values_plan = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('description', 'description'),
+        ('duration', 'duration'),
+        ('price', 'price', str),
+        ('created_at', 'created_at'),
+        ('image', 'image', 'image_url'),
+    )
+
+    def image_url(self, name: str) -> str:
+        """URL de la imagen a partir del nombre guardado en la columna `image`."""
+        field = Service._meta.get_field('image')
+        return self.build_url(field.attr_class(None, field, name).url)
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia de servicio.
@@ -39,5 +60,5 @@ class ServiceSerializer(BaseSerializer):
             'duration': instance.duration,
             'price': str(instance.price),
             'created_at': instance.created_at,
-            'image': f'{self.build_url(instance.image.url)}',
+            'image': f'{self.build_url(instance.image.url)}' if self.wants('image') else None,
         }
@@ -1,3 +1,44 @@
+import datetime
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from shared.cache import representation_cache
+from shared.tests import ConstantQueriesMixin
+
+from .models import Service
+
+
+class ServiceQueryCountTests(TestCase):
+    """Número de consultas del detalle de un servicio."""
+
+    def setUp(self):
+        representation_cache.clear()
+        self.service = Service.objects.create(
+            name='Corte', price=Decimal('15'), duration=datetime.timedelta(minutes=30)
+        )
+
+    def test_service_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/services/{self.service.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Corte')
+
+    def test_service_detail_cached(self):
+        self.client.get(f'/api/services/{self.service.pk}/')
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/services/{self.service.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ServiceListQueryCountTests(ConstantQueriesMixin, TestCase):
+    """El listado de servicios no hace una consulta por fila."""
+
+    def add_rows(self, count):
+        Service.objects.bulk_create(
+            Service(name=f'S{i}', price=Decimal('15'), duration=datetime.timedelta(minutes=30))
+            for i in range(count)
+        )
+
+    def test_service_list(self):
+        self.assertConstantQueries('/api/services/')
@@ -2,30 +2,35 @@ import base64
 import uuid
 
 from django.core.files.base import ContentFile
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-
-from shared.decorators import (
-    load_json_body,
-    required_fields,
-    required_method,
-    verify_admin,
-    verify_token,
-)
 
-from .decorators import verify_service
+from shared.conditional import conditional_get, set_validators
+from shared.endpoints import endpoint
+from shared.pagination import cursor_pagination, paginate
+from shared.responses import JsonResponse
+from shared.serializers import check_fields, requested_fields
+
+from .decorators import check_service
 from .models import Service
+from .schemas import ServiceSchema
 from .serializers import ServiceSerializer
 
 
-@csrf_exempt
-@required_method('GET')
+@endpoint(
+    'GET',
+    checks=(
+        check_fields(ServiceSerializer),
+        cursor_pagination(Service, 'id'),
+        conditional_get(Service),
+    ),
+)
 def service_list(request):
     """
     Devuelve una lista de todos los servicios en formato JSON.
 
     Este endpoint permite obtener todos los servicios registrados en la base de datos.
     Los servicios se serializan y se devuelven en una respuesta JSON.
+    Admite peticiones condicionales: si `If-None-Match` o `If-Modified-Since`
+    siguen vigentes responde 304 sin generar el cuerpo (ver `conditional_get`).
 
     Parameters
     ----------
@@ -37,14 +42,12 @@ def service_list(request):
     JsonResponse
         Respuesta JSON con la lista de servicios.
     """
-    services = Service.objects.all()
-    serializer = ServiceSerializer(services, request=request)
-    return serializer.json_response()
+    page = paginate(request, Service.objects.all())
+    serializer = ServiceSerializer(page.items, request=request, fields=requested_fields(request))
+    return set_validators(request, page.link(serializer.json_response()))
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_service
+@endpoint('GET', checks=(check_fields(ServiceSerializer),))
 def service_detail(request, service_pk):
     """
     Devuelve los detalles de un servicio específico.
@@ -64,15 +67,14 @@ def service_detail(request, service_pk):
     JsonResponse
         Respuesta JSON con los detalles del servicio.
     """
-    serializer = ServiceSerializer(request.service, request=request)
-    return serializer.json_response()
+    serializer = ServiceSerializer(request=request, fields=requested_fields(request))
+    try:
+        return JsonResponse(serializer.serialize_pk(service_pk))
+    except Service.DoesNotExist:
+        return JsonResponse({'error': 'Servicio no encontrado'}, status=404)
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@verify_token
-@verify_admin
+@endpoint('POST', auth='admin', body=ServiceSchema)
 def add_service(request):
     """
     Agrega un nuevo servicio usando JSON con imágenes en base64.
@@ -90,8 +92,6 @@ def add_service(request):
                 status=400,
             )
 
-        duration = Service.convert_duration_string(duration)
-
         image_file = None
         if image_base64:
             try:
@@ -116,13 +116,7 @@ def add_service(request):
         return JsonResponse({'error': f'Error al crear el servicio: {str(e)}'}, status=500)
 
 
-@csrf_exempt
-@required_method('POST')
-@load_json_body
-@required_fields('name', 'description', 'price', 'duration', model=Service)
-@verify_token
-@verify_admin
-@verify_service
+@endpoint('POST', auth='admin', body=ServiceSchema, load=(check_service,))
 def edit_service(request, service_pk: int):
     """
     Edita un servicio existente.
@@ -146,8 +140,7 @@ def edit_service(request, service_pk: int):
     service.name = request.json_body['name']
     service.description = request.json_body['description']
     service.price = request.json_body['price']
-    duration = request.json_body['duration']
-    service.duration = Service.convert_duration_string(duration)
+    service.duration = request.json_body['duration']
     image_base64 = request.json_body.get('image')
     if image_base64:
         try:
@@ -166,11 +159,7 @@ def edit_service(request, service_pk: int):
     return JsonResponse({'msg': 'El servicio ha sido editado'})
 
 
-@csrf_exempt
-@required_method('POST')
-@verify_token
-@verify_admin
-@verify_service
+@endpoint('POST', auth='admin', load=(check_service,))
 def delete_service(request, service_pk: int):
     """
     Elimina un servicio existente.
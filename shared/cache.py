@@ -0,0 +1,308 @@
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RepresentationCache:
+    """
+    Caché LRU con caducidad (TTL) de representaciones serializadas de objetos.
+
+    Cada entrada es el diccionario que devuelve un serializador para un
+    objeto y se identifica por el modelo, el pk, una versión y una variante
+    (la URL base de la petición, porque las URLs absolutas dependen de ella).
+    La versión de cada objeto se incrementa al guardarlo o eliminarlo (ver
+    `invalidate`), de modo que las entradas anteriores dejan de usarse sin
+    tener que localizarlas; una entrada calculada a partir de una lectura
+    anterior a la invalidación se guarda con la versión vieja y nunca se
+    sirve.
+
+    Como `users.auth.TokenCache`, el primer nivel vive en la memoria del
+    proceso y, opcionalmente, Redis actúa de segundo nivel compartido entre
+    los workers, con las versiones en contadores de Redis. Los demás workers
+    dejan de servir una entrada invalidada como tarde al expirar su TTL local:
+    `ttl` segundos solo en memoria y `shared_ttl` (mucho menor) con Redis,
+    donde la versión ya está incrementada. Si Redis falla, la caché sigue
+    funcionando solo en memoria y el error se registra en el log.
+
+    Las escrituras que no emiten señales (`QuerySet.update()`,
+    `bulk_update()`) deben llamar a `invalidate` por su cuenta.
+
+    Parameters
+    ----------
+    max_size : int
+        Número máximo de entradas en memoria.
+    ttl : float
+        Segundos de vida de cada entrada en memoria si no se usa Redis.
+    redis_url : str or None
+        URL de Redis para el segundo nivel. Si es None solo se usa memoria.
+    redis_ttl : int
+        Segundos de vida de cada entrada en Redis.
+    shared_ttl : float
+        Segundos de vida de cada entrada en memoria si se usa Redis.
+    """
+
+    REDIS_PREFIX = 'repr:'
+    REDIS_VERSION_PREFIX = 'repr:version:'
+
+    def __init__(self, max_size=10000, ttl=60, redis_url=None, redis_ttl=3600, shared_ttl=5):
+        self.max_size = max_size
+        self.ttl = shared_ttl if redis_url else ttl
+        self.redis_url = redis_url
+        self.redis_ttl = redis_ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def get_many(
+        self,
+        model,
+        pks: Iterable,
+        variant: str,
+        load: Callable[[list], dict],
+    ) -> dict:
+        """
+        Devuelve las representaciones de varios objetos, cargando las que falten.
+
+        Las que no están en memoria se buscan en Redis y las restantes se
+        obtienen con una sola llamada a `load`.
+
+        Parameters
+        ----------
+        model : Model
+            Modelo de los objetos.
+        pks : iterable
+            Claves primarias (ya convertidas al tipo del campo).
+        variant : str
+            Variante de la representación (p.ej. la URL base de la petición).
+        load : callable
+            Recibe la lista de pks que faltan y devuelve un diccionario
+            `{pk: representación}` (sin los objetos que no existen).
+
+        Returns
+        -------
+        dict
+            Representaciones por pk. Los objetos que no existen no aparecen.
+        """
+        label = model._meta.label_lower
+        found, missing = {}, {}
+        for pk in dict.fromkeys(pks):
+            version, data = self._get_local((label, pk, variant))
+            if data is None:
+                missing[pk] = version
+            else:
+                found[pk] = data
+        if not missing:
+            return found
+
+        remote = self._get_redis(label, list(missing), variant)
+        to_load = [pk for pk in missing if pk not in remote[0]]
+        loaded = load(to_load) if to_load else {}
+        self._set_redis(label, loaded, remote[1], variant)
+        for pk, data in (*remote[0].items(), *loaded.items()):
+            self._set_local((label, pk, variant), missing[pk], data)
+            found[pk] = data
+        return found
+
+    def invalidate(self, model, pk) -> None:
+        """
+        Invalida las representaciones de un objeto modificado o eliminado.
+
+        La versión se incrementa en el momento y otra vez al confirmarse la
+        transacción en curso, para descartar también lo que otras peticiones
+        hayan cacheado leyendo los datos anteriores mientras tanto.
+        """
+        self.bump(model, pk)
+        transaction.on_commit(lambda: self.bump(model, pk))
+
+    def bump(self, model, pk) -> None:
+        """Incrementa la versión de un objeto en memoria y, si se usa, en Redis."""
+        label = model._meta.label_lower
+        with self._lock:
+            self._versions[label, pk] = self._versions.get((label, pk), 0) + 1
+            self.invalidations += 1
+        if self.redis is not None:
+            try:
+                self.redis.incr(f'{self.REDIS_VERSION_PREFIX}{label}:{pk}')
+            except Exception:
+                logger.warning('No se ha podido invalidar %s %s en Redis', label, pk, exc_info=True)
+
+    def clear(self) -> None:
+        """Vacía el nivel en memoria y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché en memoria.
+
+        Returns
+        -------
+        dict
+            Diccionario con las claves `hits`, `misses`, `invalidations` y `size`.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+            }
+
+    def _get_local(self, key):
+        # Devuelve la versión actual del objeto y la entrada, si es de esa versión
+        with self._lock:
+            version = self._versions.get(key[:2], 0)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, data = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return version, data
+                del self._entries[key]
+            self.misses += 1
+            return version, None
+
+    def _set_local(self, key, version, data):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self, label, pks, variant):
+        # Devuelve las entradas encontradas y la versión en Redis de cada pk
+        if self.redis is None:
+            return {}, {}
+        try:
+            versions = self.redis.mget([f'{self.REDIS_VERSION_PREFIX}{label}:{pk}' for pk in pks])
+            versions = {pk: int(v or 0) for pk, v in zip(pks, versions)}
+            keys = [self._redis_key(label, pk, versions[pk], variant) for pk in pks]
+            found = {
+                pk: pickle.loads(data) for pk, data in zip(pks, self.redis.mget(keys)) if data
+            }
+        except Exception:
+            logger.warning('No se han podido leer representaciones de Redis', exc_info=True)
+            return {}, {}
+        return found, versions
+
+    def _set_redis(self, label, loaded, versions, variant):
+        if self.redis is None or not versions:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for pk, data in loaded.items():
+                key = self._redis_key(label, pk, versions[pk], variant)
+                pipe.set(key, pickle.dumps(data), ex=self.redis_ttl)
+            pipe.execute()
+        except Exception:
+            logger.warning('No se han podido guardar representaciones en Redis', exc_info=True)
+
+    def _redis_key(self, label, pk, version, variant):
+        return f'{self.REDIS_PREFIX}{label}:{pk}:{version}:{variant}'
+
+
+representation_cache = RepresentationCache(
+    max_size=settings.REPRESENTATION_CACHE_SIZE,
+    ttl=settings.REPRESENTATION_CACHE_TTL,
+    redis_url=settings.REPRESENTATION_CACHE_REDIS_URL,
+    shared_ttl=settings.REPRESENTATION_CACHE_SHARED_TTL,
+)
+
+
+class CompressedBodyCache:
+    """
+    Caché LRU de cuerpos de respuesta comprimidos, limitada por tamaño en bytes.
+
+    La usa `shared.compression.CompressionMiddleware` para las respuestas
+    con ETag de `shared.conditional`. La clave es el ETag (que ya cambia con
+    la versión de las tablas y con la URL) más la codificación, así que cada
+    versión de un listado se comprime una vez y no hace falta invalidar nada:
+    las versiones antiguas salen por el extremo LRU.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Tamaño máximo en bytes de todos los cuerpos guardados.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> bytes | None:
+        """Devuelve el cuerpo comprimido guardado con esa clave, o None."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key, body: bytes) -> None:
+        """Guarda un cuerpo comprimido (salvo que por sí solo supere `max_bytes`)."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old)
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché.
+
+        Returns
+        -------
+        dict
+            Diccionario con las claves `hits`, `misses`, `size` y `bytes`.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'bytes': self._size,
+            }
+
+
+compressed_body_cache = CompressedBodyCache(max_bytes=settings.COMPRESSION_CACHE_BYTES)
@@ -0,0 +1,267 @@
+import gzip
+import zlib
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .cache import compressed_body_cache
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin `brotli` no se ofrece 'br'
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Opcional: sin `zstandard` no se ofrece 'zstd'
+    zstandard = None
+
+
+class Codec(NamedTuple):
+    """
+    Una codificación de `Content-Encoding`.
+
+    Attributes
+    ----------
+    compress : callable
+        `compress(data, level)`: comprime un cuerpo completo.
+    compressobj : callable
+        `compressobj(level)`: compresor incremental con `compress(chunk)` y
+        `flush()`, para las respuestas en streaming.
+    level : int
+        Nivel para las respuestas que se comprimen en cada petición.
+    cached_level : int
+        Nivel para los cuerpos que se guardan en `compressed_body_cache`: se
+        comprimen una vez por versión, así que compensa un nivel más alto.
+    """
+
+    compress: Callable[[bytes, int], bytes]
+    compressobj: Callable[[int], object]
+    level: int
+    cached_level: int
+
+
+class _BrotliCompressor:
+    # Adapta `brotli.Compressor` a la interfaz de `zlib.compressobj`
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+CODECS = {
+    'gzip': Codec(
+        compress=lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+        compressobj=lambda level: zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS),
+        level=6,
+        cached_level=9,
+    ),
+}
+if brotli is not None:
+    CODECS['br'] = Codec(
+        compress=lambda data, level: brotli.compress(data, quality=level),
+        compressobj=_BrotliCompressor,
+        level=5,
+        cached_level=9,
+    )
+if zstandard is not None:
+    CODECS['zstd'] = Codec(
+        compress=lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+        compressobj=lambda level: zstandard.ZstdCompressor(level=level).compressobj(),
+        level=3,
+        cached_level=12,
+    )
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Elige la codificación para una cabecera `Accept-Encoding`.
+
+    Se toma la de mayor `q` entre las disponibles (ver `CODECS`) y, a
+    igualdad, la que va antes en `settings.COMPRESSION_ENCODINGS`.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        Valor de la cabecera, p.ej. `'gzip, deflate, br;q=0.9'`.
+
+    Returns
+    -------
+    str or None
+        Nombre de la codificación, o None si el cliente no acepta ninguna.
+    """
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+
+    best, best_quality = None, 0.0
+    for name in settings.COMPRESSION_ENCODINGS:
+        quality = accepted.get(name, accepted.get('*', 0.0))
+        if name in CODECS and quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Comprime las respuestas con gzip o, si están instalados, brotli o zstd.
+
+    Como `django.middleware.gzip.GZipMiddleware`: añade `Vary:
+    Accept-Encoding`, no toca respuestas que ya tienen `Content-Encoding`
+    ni las menores de `settings.COMPRESSION_MIN_SIZE`, comprime las
+    respuestas en streaming por fragmentos y debilita el ETag.
+
+    Las respuestas con los validadores de `shared.conditional` (listados de
+    catálogo, fechas disponibles) quedan determinadas por su ETag, así que su
+    cuerpo comprimido se guarda en `compressed_body_cache` y se reutiliza
+    mientras no cambie la versión. En los listados en streaming, además,
+    un acierto evita generar el cuerpo; en un fallo se comprimen igualmente
+    por fragmentos (la memoria no crece con el listado) y solo se guardan si
+    comprimidos no pasan de `settings.COMPRESSION_CACHE_MAX_STREAM`.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        codec = CODECS[encoding]
+        validators = getattr(request, 'validators', None)
+        if validators is not None and response.get('ETag') == validators.etag:
+            compressed = self.compress_cached(response, codec, (validators.etag, encoding))
+        else:
+            compressed = self.compress(response, codec)
+        if not compressed:
+            return response
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def compress(self, response, codec) -> bool:
+        """Comprime la respuesta en el momento. Devuelve False si no compensa."""
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_stream(response.streaming_content, codec)
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, codec)
+            del response.headers['Content-Length']
+            return True
+        compressed = codec.compress(response.content, codec.level)
+        if len(compressed) >= len(response.content):
+            return False
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        return True
+
+    def compress_cached(self, response, codec, key) -> bool:
+        """Usa (o guarda) el cuerpo comprimido de `compressed_body_cache`."""
+        body = compressed_body_cache.get(key)
+        if response.streaming:
+            if body is None:
+                if response.is_async:
+                    content = _acompress_and_store(response.streaming_content, codec, key)
+                else:
+                    content = _compress_and_store(response.streaming_content, codec, key)
+                del response.headers['Content-Length']
+            else:
+                content = _aiter(body) if response.is_async else [body]
+                response.headers['Content-Length'] = str(len(body))
+            response.streaming_content = content
+            return True
+        if body is None:
+            body = codec.compress(response.content, codec.cached_level)
+            compressed_body_cache.set(key, body)
+        if len(body) >= len(response.content):
+            return False
+        response.content = body
+        response.headers['Content-Length'] = str(len(body))
+        return True
+
+
+def _compress_stream(chunks, codec):
+    compressor = codec.compressobj(codec.level)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+async def _acompress_stream(chunks, codec):
+    compressor = codec.compressobj(codec.level)
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def _compress_and_store(chunks, codec, key):
+    # Como `_compress_stream`, pero guarda el cuerpo comprimido si termina
+    # sin pasar del límite
+    store = _BodyStore(key)
+    compressor = codec.compressobj(codec.cached_level)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield store.add(data)
+    yield store.add(compressor.flush())
+    store.save()
+
+
+async def _acompress_and_store(chunks, codec, key):
+    store = _BodyStore(key)
+    compressor = codec.compressobj(codec.cached_level)
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield store.add(data)
+    yield store.add(compressor.flush())
+    store.save()
+
+
+class _BodyStore:
+    # Fragmentos comprimidos de un listado en streaming, mientras no pasen de
+    # `settings.COMPRESSION_CACHE_MAX_STREAM` bytes
+    def __init__(self, key):
+        self.key = key
+        self.parts = []
+        self.size = 0
+
+    def add(self, data):
+        if self.parts is not None:
+            self.size += len(data)
+            if self.size > settings.COMPRESSION_CACHE_MAX_STREAM:
+                self.parts = None
+            else:
+                self.parts.append(data)
+        return data
+
+    def save(self):
+        if self.parts is not None:
+            compressed_body_cache.set(self.key, b''.join(self.parts))
+
+
+async def _aiter(body):
+    yield body
@@ -0,0 +1,107 @@
+import datetime
+from typing import NamedTuple
+
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import md5
+from django.utils.http import http_date, quote_etag
+
+from .models import TableVersion
+
+
+class Validators(NamedTuple):
+    """Validadores de una respuesta: `ETag` y, si se conoce, `Last-Modified`."""
+
+    etag: str
+    last_modified: datetime.datetime | None
+
+    def apply(self, response):
+        """Añade las cabeceras `ETag` y `Last-Modified` a la respuesta."""
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        return response
+
+
+def conditional_get(*models, state=None):
+    """
+    Comprobación para `endpoint(checks=...)` que atiende las peticiones condicionales.
+
+    Los validadores se calculan sin generar el cuerpo. Se usan las versiones
+    de las tablas de las que depende la respuesta (ver
+    `shared.models.TableVersion`), que se leen con una sola consulta, y la URL
+    completa, porque `?fields=`, `limit` o `cursor` cambian el cuerpo. Si
+    `If-None-Match` o `If-Modified-Since` coinciden, se responde 304.
+    Si no, los validadores quedan en `request.validators` y la vista los
+    añade a su respuesta con `set_validators`.
+
+    Parameters
+    ----------
+    *models : Model
+        Modelos de los que depende la respuesta.
+    state : callable, opcional
+        Para respuestas que dependen de algo más que esas tablas (p.ej. la
+        hora actual). Recibe `(request, kwargs)` y devuelve una tupla
+        `(partes, last_modified)`: valores que se añaden al ETag y un
+        datetime mínimo para `Last-Modified` (o None).
+
+    Returns
+    -------
+    callable
+        Comprobación `check(request, kwargs)`.
+    """
+    labels = [model._meta.label_lower for model in models]
+
+    def check_conditional_get(request, kwargs):
+        request.validators = None
+        versions = table_versions(request)
+        parts = [request.get_host(), request.get_full_path()]
+        parts.extend(f'{label}:{versions.get(label, (0,))[0]}' for label in labels)
+        changes = [versions[label][1] for label in labels if label in versions]
+        if state is not None:
+            extra_parts, changed_at = state(request, kwargs)
+            parts.extend(str(part) for part in extra_parts)
+            if changed_at is not None:
+                changes.append(changed_at)
+
+        etag = quote_etag(md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest())
+        last_modified = max(changes) if changes else None
+        validators = Validators(etag, last_modified)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is not None:
+            return validators.apply(response)
+        request.validators = validators
+        return None
+
+    return check_conditional_get
+
+
+def table_versions(request) -> dict:
+    """
+    Versiones de todas las tablas, leídas como mucho una vez por petición.
+
+    La tabla tiene una fila por modelo, así que se lee entera: las
+    subpeticiones de `/api/batch/` comparten el resultado (ver
+    `shared.views.SubRequest`).
+
+    Returns
+    -------
+    dict
+        `{label: (version, changed_at)}`.
+    """
+    cache = request.__dict__.setdefault('_table_versions', {})
+    if 'versions' not in cache:
+        rows = TableVersion.objects.values_list('label', 'version', 'changed_at')
+        cache['versions'] = {label: (version, changed_at) for label, version, changed_at in rows}
+    return cache['versions']
+
+
+def set_validators(request, response):
+    """Añade a `response` los validadores que calculó `conditional_get`, si los hay."""
+    validators = getattr(request, 'validators', None)
+    if validators is not None and response.status_code == 200:
+        validators.apply(response)
+    return response
@@ -1,9 +1,153 @@
 import json
 import re
 
-from django.http import JsonResponse
+from users.auth import Principal, token_cache
+from users.models import Profile
+from users.tokens import SIGNED_TOKEN_PATTERN, verify_signed_token
 
-from users.models import Token
+from .responses import JsonResponse
+from .schemas import SchemaError
+
+UUID_PATTERN = re.compile(
+    r'Bearer (?P<token>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})'
+)
+
+
+def as_decorator(check):
+    """
+    Convierte una comprobación en un decorador de vista.
+
+    Una comprobación es una función `check(request, kwargs)` que devuelve una
+    respuesta de error para cortar la petición o None para continuar. Las
+    mismas comprobaciones se reutilizan en `shared.endpoints.endpoint`, que
+    las encadena en un único envoltorio.
+
+    Parameters
+    ----------
+    check : callable
+        Comprobación a aplicar antes de la vista.
+
+    Returns
+    -------
+    callable
+        Decorador que ejecuta la comprobación.
+    """
+
+    def decorator(func):
+        def wrapper(request, *args, **kwargs):
+            response = check(request, kwargs)
+            if response is not None:
+                return response
+            return func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def check_token(request, kwargs):
+    """Comprobación de `verify_token`."""
+    if getattr(request, 'principal', None) is not None:
+        return None  # Ya autenticada: subpeticiones de `/api/batch/`
+    bearer_auth = request.headers.get('Authorization', '')
+    if m := UUID_PATTERN.fullmatch(bearer_auth):
+        principal = token_cache.get(m['token'])
+    elif m := SIGNED_TOKEN_PATTERN.fullmatch(bearer_auth):
+        principal = verify_signed_token(m['token'])
+    else:
+        return JsonResponse({'error': 'Token de autenticación inválido'}, status=400)
+    if principal is None:
+        return JsonResponse({'error': 'Token de autenticación no registrado'}, status=401)
+    request.principal = principal
+    request.user = principal.to_user()
+
+
+def check_method(method_type):
+    """Construye la comprobación de `required_method`."""
+
+    def check(request, kwargs):
+        if request.method != method_type:
+            return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    check.__name__ = f'check_method_{method_type.lower()}'
+    return check
+
+
+def check_json_body(request, kwargs):
+    """Comprobación de `load_json_body`."""
+    try:
+        if not request.body:
+            return JsonResponse({'error': 'Cuerpo de la solicitud faltante'}, status=400)
+
+        request.json_body = json.loads(request.body)
+    except json.decoder.JSONDecodeError:
+        return JsonResponse({'error': 'Cuerpo JSON inválido'}, status=400)
+
+
+def check_body(schema):
+    """Construye la comprobación de `validate_body`."""
+
+    def check(request, kwargs):
+        if not request.body:
+            return JsonResponse({'error': 'Cuerpo de la solicitud faltante'}, status=400)
+        try:
+            request.json_body = schema.validate(json.loads(request.body))
+        except json.decoder.JSONDecodeError:
+            return JsonResponse({'error': 'Cuerpo JSON inválido'}, status=400)
+        except SchemaError as err:
+            return JsonResponse({'error': err.message}, status=400)
+
+    check.__name__ = 'check_body'
+    return check
+
+
+ROLE_ERRORS = {
+    (Profile.Role.ADMIN,): 'El usuario debe ser un administrador',
+    (Profile.Role.WORKER,): 'El usuario debe ser un trabajador',
+    (Profile.Role.CLIENT,): 'El usuario debe ser un cliente',
+}
+
+
+def get_principal(request) -> Principal | None:
+    """
+    Devuelve el `Principal` de la petición.
+
+    Las peticiones autenticadas por token ya lo traen en `request.principal`
+    (con el rol incluido), así que no se consulta la base de datos. Para las
+    autenticadas por sesión se construye a partir de `request.user`.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        La petición.
+
+    Returns
+    -------
+    Principal or None
+        Registro del usuario o None si no está autenticado.
+    """
+    principal = getattr(request, 'principal', None)
+    if principal is None and request.user.is_authenticated:
+        principal = request.principal = Principal.from_user(request.user)
+    return principal
+
+
+def check_role(*roles):
+    """Construye la comprobación de `verify_role`."""
+    message = ROLE_ERRORS.get(roles, 'El usuario no tiene permisos para esta acción')
+
+    def check(request, kwargs):
+        principal = get_principal(request)
+        if principal is None or not principal.has_role(*roles):
+            return JsonResponse({'error': message}, status=403)
+
+    check.__name__ = f'check_role_{"".join(roles).lower()}'
+    return check
+
+
+check_admin = check_role(Profile.Role.ADMIN)
+check_worker = check_role(Profile.Role.WORKER)
+check_client = check_role(Profile.Role.CLIENT)
 
 
 def verify_token(func):
@@ -15,6 +159,11 @@ def verify_token(func):
     asigna el usuario correspondiente a la solicitud. Si el token no es
     válido o no está registrado, se devuelve un error.
 
+    Los tokens UUID se resuelven a través de `users.auth.token_cache`, de modo
+    que las peticiones con un token ya visto no consultan la base de datos.
+    También se aceptan tokens firmados (`users.tokens`), que se validan sin
+    ninguna consulta.
+
     Parameters
     ----------
     func : callable
@@ -25,24 +174,7 @@ def verify_token(func):
     callable
         Función envuelta que verifica el token.
     """
-
-    def wrapper(request, *args, **kwargs):
-        UUID_PATTERN = re.compile(
-            r'Bearer (?P<token>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})'
-        )
-        bearer_auth = request.headers.get('Authorization')
-        if m := re.fullmatch(UUID_PATTERN, bearer_auth):
-            token_reg = m['token']
-            try:
-                token = Token.objects.get(key=token_reg)
-                request.user = token.user
-            except Token.DoesNotExist:
-                return JsonResponse({'error': 'Token de autenticación no registrado'}, status=401)
-        else:
-            return JsonResponse({'error': 'Token de autenticación inválido'}, status=400)
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_token)(func)
 
 
 def required_method(method_type):
@@ -63,16 +195,7 @@ def required_method(method_type):
     callable
         Función envuelta que verifica el método.
     """
-
-    def decorator(func):
-        def wrapper(request, *args, **kwargs):
-            if request.method != method_type:
-                return JsonResponse({'error': 'Método no permitido'}, status=405)
-            return func(request, *args, **kwargs)
-
-        return wrapper
-
-    return decorator
+    return as_decorator(check_method(method_type))
 
 
 def load_json_body(func):
@@ -93,19 +216,7 @@ def load_json_body(func):
     callable
         Función envuelta que carga el cuerpo JSON.
     """
-
-    def wrapper(request, *args, **kwargs):
-        try:
-            if not request.body:
-                return JsonResponse({'error': 'Cuerpo de la solicitud faltante'}, status=400)
-
-            request.json_body = json.loads(request.body)
-        except json.decoder.JSONDecodeError:
-            return JsonResponse({'error': 'Cuerpo JSON inválido'}, status=400)
-
-        return func(request, *args, **kwargs)
-
-    return wrapper
+    return as_decorator(check_json_body)(func)
 
 
 def required_fields(*fields, model):
@@ -129,17 +240,38 @@ def required_fields(*fields, model):
         Función envuelta que verifica los campos requeridos.
     """
 
-    def decorator(func):
-        def wrapper(request, *args, **kwargs):
+    def check(request, kwargs):
+        json_body = getattr(request, 'json_body', None)
+        if json_body is None:
             json_body = json.loads(request.body)
-            for field in fields:
-                if field not in json_body:
-                    return JsonResponse({'error': 'Faltan campos requeridos'}, status=400)
-            return func(request, *args, **kwargs)
+        for field in fields:
+            if field not in json_body:
+                return JsonResponse({'error': 'Faltan campos requeridos'}, status=400)
 
-        return wrapper
+    return as_decorator(check)
 
-    return decorator
+
+def validate_body(schema):
+    """
+    Carga y valida el cuerpo JSON de la solicitud con un esquema.
+
+    Sustituye a la pareja `load_json_body` + `required_fields`: el cuerpo se
+    decodifica una sola vez, se comprueban los campos requeridos y se
+    convierten los tipos (decimales, fechas, duraciones...) antes de llegar
+    a la vista. El resultado convertido queda en `request.json_body`.
+
+    Parameters
+    ----------
+    schema : Schema
+        Esquema del cuerpo (ver `shared.schemas`), construido al importar el
+        módulo de vistas.
+
+    Returns
+    -------
+    callable
+        Función envuelta que valida el cuerpo.
+    """
+    return as_decorator(check_body(schema))
 
 
 def verify_admin(func):
@@ -160,11 +292,25 @@ def verify_admin(func):
     callable
         Función envuelta que verifica el rol de administrador.
     """
+    return as_decorator(check_admin)(func)
+
+
+def verify_role(*roles):
+    """
+    Verifica que el usuario autenticado tenga alguno de los roles indicados.
+
+    El rol se lee del `Principal` de la petición, que `verify_token` obtiene
+    en la misma consulta que el token (o del propio token firmado), por lo
+    que la comprobación no accede a la base de datos.
 
-    def wrapper(request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if request.user.profile.role == 'A':
-                return func(request, *args, **kwargs)
-        return JsonResponse({'error': 'El usuario debe ser un administrador'}, status=403)
+    Parameters
+    ----------
+    *roles : str
+        Roles admitidos (`Profile.Role.ADMIN`, `WORKER` o `CLIENT`).
 
-    return wrapper
+    Returns
+    -------
+    callable
+        Función envuelta que verifica el rol.
+    """
+    return as_decorator(check_role(*roles))
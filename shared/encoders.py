@@ -0,0 +1,123 @@
+import datetime
+import decimal
+import json
+import uuid
+from functools import cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.duration import duration_iso_string
+from django.utils.module_loading import import_string
+from django.utils.timezone import is_aware
+
+try:
+    from _json import make_encoder as c_make_encoder
+except ImportError:  # Intérprete sin la extensión C de json
+    c_make_encoder = None
+
+
+def _datetime(o):
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:23] + r[26:]
+    if r.endswith('+00:00'):
+        r = r[:-6] + 'Z'
+    return r
+
+
+def _time(o):
+    if is_aware(o):
+        raise ValueError("JSON can't represent timezone-aware times.")
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:12]
+    return r
+
+
+class FastJSONEncoder(DjangoJSONEncoder):
+    """
+    `DjangoJSONEncoder` con un manejador precalculado por tipo.
+
+    `DjangoJSONEncoder.default` prueba los tipos uno a uno con `isinstance`
+    para cada valor; aquí se busca `type(o)` en un diccionario y se llama
+    directamente al manejador. Las cadenas resultantes son las mismas (el
+    formato de fechas y duraciones se copia de Django); las subclases de
+    esos tipos y los tipos no incluidos pasan por `DjangoJSONEncoder`.
+    """
+
+    handlers = {
+        decimal.Decimal: str,
+        datetime.datetime: _datetime,
+        datetime.date: datetime.date.isoformat,
+        datetime.time: _time,
+        datetime.timedelta: duration_iso_string,
+        uuid.UUID: str,
+    }
+
+    def default(self, o):
+        handler = self.handlers.get(type(o))
+        if handler is not None:
+            return handler(o)
+        return super().default(o)
+
+
+@cache
+def _iterencoder(encoder_class):
+    # Codificador C reutilizable entre llamadas, con los mismos parámetros
+    # que `json.dumps` por defecto salvo la detección de referencias
+    # circulares, que no pueden darse en la salida de un serializador. El C
+    # llama a `default` por cada valor especial, así que se le pasa una
+    # función con el diccionario y el respaldo ya resueltos.
+    if c_make_encoder is None or not issubclass(encoder_class, FastJSONEncoder):
+        return None
+    get_handler = encoder_class.handlers.get
+    fallback = encoder_class().default
+
+    def default(o):
+        handler = get_handler(type(o))
+        if handler is not None:
+            return handler(o)
+        return fallback(o)
+
+    return c_make_encoder(
+        None,
+        default,
+        json.encoder.encode_basestring_ascii,
+        None,
+        ': ',
+        ', ',
+        False,
+        False,
+        True,
+    )
+
+def get_encoder():
+    """Devuelve la clase de `settings.JSON_ENCODER`."""
+    return import_string(settings.JSON_ENCODER)
+
+
+def dumps(data, encoder=None) -> bytes:
+    """
+    Codifica `data` como JSON y devuelve los bytes de la respuesta.
+
+    La salida es idéntica byte a byte a `json.dumps(data, cls=encoder)`.
+    Con un `FastJSONEncoder` (o subclase) se reutiliza un codificador C
+    construido una sola vez por clase en lugar de crear uno por llamada.
+
+    Parameters
+    ----------
+    data : object
+        Datos a codificar.
+    encoder : type, opcional
+        Clase del codificador. Por defecto, `settings.JSON_ENCODER`.
+
+    Returns
+    -------
+    bytes
+        JSON en ASCII.
+    """
+    encoder = encoder or get_encoder()
+    iterencode = _iterencoder(encoder)
+    if iterencode is None:
+        return json.dumps(data, cls=encoder).encode()
+    return ''.join(iterencode(data, 0)).encode()
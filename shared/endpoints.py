@@ -0,0 +1,138 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+
+from .decorators import (
+    check_admin,
+    check_body,
+    check_client,
+    check_json_body,
+    check_method,
+    check_role,
+    check_token,
+    check_worker,
+)
+from .idempotency import check_idempotency_key, with_idempotency
+
+ROLE_CHECKS = {'admin': check_admin, 'worker': check_worker, 'client': check_client}
+
+
+def endpoint(
+    method,
+    *,
+    auth=None,
+    roles=(),
+    body=None,
+    load=(),
+    checks=(),
+    csrf_exempt=True,
+    timings=None,
+    idempotent=False,
+):
+    """
+    Declara un endpoint y construye un único envoltorio plano para la vista.
+
+    En lugar de anidar un decorador por comprobación, la especificación se
+    convierte (al importar el URLconf) en una lista de comprobaciones que se
+    recorren en orden dentro de una sola función. Cada comprobación tiene la
+    forma `check(request, kwargs)` y devuelve una respuesta de error o None.
+    El orden es siempre: método, cuerpo, autenticación, cargadores y
+    comprobaciones adicionales, que es el mismo que seguían las pilas de
+    decoradores, de modo que las respuestas de error no cambian.
+
+    Parameters
+    ----------
+    method : str
+        Método HTTP permitido ('GET', 'POST', ...).
+    auth : str, opcional
+        Nivel de autenticación: None, 'token', o 'admin', 'worker' o 'client'
+        (token + rol). El rol se lee del `Principal` de la petición, sin
+        consultar el perfil.
+    roles : iterable of str, opcional
+        Roles admitidos cuando valen varios (p.ej. `(Profile.Role.ADMIN,
+        Profile.Role.WORKER)`). Implica autenticación por token.
+    body : Schema or bool, opcional
+        Esquema del cuerpo JSON (ver `shared.schemas`), o True para cargar el
+        JSON sin validar (equivalente a `load_json_body`).
+    load : iterable of callable
+        Comprobaciones que cargan objetos en la petición (p.ej. `check_order`).
+    checks : iterable of callable
+        Comprobaciones adicionales, incluidas las reglas de propiedad.
+    csrf_exempt : bool
+        Si la vista queda exenta de la verificación CSRF.
+    timings : bool, opcional
+        Si se mide cada etapa y se añade la cabecera `Server-Timing`. Por
+        defecto `settings.ENDPOINT_TIMINGS`.
+    idempotent : bool
+        Si se admite la cabecera `Idempotency-Key` (ver
+        `shared.idempotency`): los reintentos reciben la respuesta guardada
+        sin volver a ejecutar la vista. Requiere autenticación.
+
+    Returns
+    -------
+    callable
+        Decorador que aplica la especificación a la vista.
+    """
+    if auth not in (None, 'token', *ROLE_CHECKS):
+        raise ValueError(f'Nivel de autenticación desconocido: {auth!r}')
+    if idempotent and auth is None and not roles:
+        raise ValueError('Los endpoints idempotentes requieren autenticación')
+    stages = [check_method(method)]
+    if body is True:
+        stages.append(check_json_body)
+    elif body is not None:
+        stages.append(check_body(body))
+    if auth is not None or roles:
+        stages.append(check_token)
+    if auth in ROLE_CHECKS:
+        stages.append(ROLE_CHECKS[auth])
+    if roles:
+        stages.append(check_role(*roles))
+    if idempotent:
+        stages.append(check_idempotency_key)
+    stages.extend(load)
+    stages.extend(checks)
+    stages = tuple(stages)
+    if timings is None:
+        timings = settings.ENDPOINT_TIMINGS
+
+    def decorator(view):
+        if timings:
+
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                server_timing = []
+                response = None
+                for stage in stages:
+                    start = time.perf_counter()
+                    response = stage(request, kwargs)
+                    server_timing.append((stage.__name__, time.perf_counter() - start))
+                    if response is not None:
+                        break
+                else:
+                    start = time.perf_counter()
+                    response = view(request, *args, **kwargs)
+                    server_timing.append(('view', time.perf_counter() - start))
+                response['Server-Timing'] = ', '.join(
+                    f'{name};dur={seconds * 1000:.3f}' for name, seconds in server_timing
+                )
+                return response
+
+        else:
+
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                for stage in stages:
+                    response = stage(request, kwargs)
+                    if response is not None:
+                        return response
+                return view(request, *args, **kwargs)
+
+        if idempotent:
+            wrapper = with_idempotency(wrapper)
+        wrapper.csrf_exempt = csrf_exempt
+        wrapper.stages = stages
+        return wrapper
+
+    return decorator
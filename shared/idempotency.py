@@ -0,0 +1,108 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .models import IdempotencyKey
+from .responses import JsonResponse
+
+# Cabecera que marca las respuestas repetidas
+REPLAYED_HEADER = 'Idempotent-Replayed'
+# Espera máxima entre comprobaciones de una petición en curso (segundos)
+MAX_POLL = 1.0
+
+
+def check_idempotency_key(request, kwargs):
+    """
+    Comprobación de `endpoint(idempotent=True)`: atiende la cabecera `Idempotency-Key`.
+
+    Va justo después de la autenticación y antes de cargadores y
+    comprobaciones, porque un reintento no debe volver a validarse contra el
+    estado que dejó la primera petición (p.ej. un pedido ya pagado).
+
+    - Sin cabecera, la petición sigue como siempre.
+    - Si la clave es nueva, se reserva y queda en `request.idempotency_key`;
+      `with_idempotency` guarda la respuesta al terminar.
+    - Si ya tiene respuesta, se devuelve esa respuesta sin ejecutar la vista.
+    - Si la primera petición sigue en curso, se espera a que termine (como
+      mucho `settings.IDEMPOTENCY_WAIT` segundos; después, 409). Se vuelve a
+      comprobar con esperas que empiezan en `settings.IDEMPOTENCY_POLL` y se
+      duplican hasta un segundo. Si la reserva lleva más de
+      `settings.IDEMPOTENCY_LEASE` segundos en curso, el proceso que la hizo
+      se da por caído y la petición la reclama (ver `IdempotencyKey.claim`).
+    - Si se reutiliza para otra petición (otra ruta o cuerpo), 422.
+    """
+    request.idempotency_key = None
+    key = request.headers.get('Idempotency-Key')
+    if key is None:
+        return None
+    if not key or len(key) > 255:
+        return JsonResponse({'error': 'Idempotency-Key inválida'}, status=400)
+
+    digest = hashlib.sha256(f'{request.method} {request.get_full_path()}\n'.encode())
+    digest.update(request.body)
+    fingerprint = digest.hexdigest()
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    poll = settings.IDEMPOTENCY_POLL
+    while True:
+        record, created = IdempotencyKey.claim(request.user, key, fingerprint)
+        if created:
+            request.idempotency_key = record
+            return None
+        if record.fingerprint != fingerprint:
+            return JsonResponse(
+                {'error': 'Idempotency-Key ya usada con otra petición'}, status=422
+            )
+        if record.status_code is not None:
+            response = HttpResponse(
+                bytes(record.content), status=record.status_code, content_type=record.content_type
+            )
+            response[REPLAYED_HEADER] = 'true'
+            return response
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return JsonResponse(
+                {'error': 'Hay una petición con esta Idempotency-Key en curso'}, status=409
+            )
+        time.sleep(min(poll, remaining))
+        poll = min(poll * 2, MAX_POLL)
+
+
+def finish_idempotency_key(request, response) -> None:
+    """
+    Guarda la respuesta de la petición que reservó la clave.
+
+    Los errores del servidor (5xx) no se guardan: se libera la clave para que
+    el reintento vuelva a ejecutar la vista. Si la reserva ha vencido y otra
+    petición la ha reclamado, la respuesta no se guarda.
+    """
+    record = getattr(request, 'idempotency_key', None)
+    if record is None:
+        return
+    request.idempotency_key = None
+    if response is None or response.status_code >= 500 or response.streaming:
+        record.delete()
+        return
+    IdempotencyKey.objects.filter(pk=record.pk, status_code=None).update(
+        status_code=response.status_code,
+        content_type=response.get('Content-Type', ''),
+        content=response.content,
+    )
+
+
+def with_idempotency(wrapper):
+    """Envuelve el pipeline de un endpoint para guardar su respuesta (ver `endpoint`)."""
+
+    @wraps(wrapper)
+    def idempotent_wrapper(request, *args, **kwargs):
+        response = None
+        try:
+            response = wrapper(request, *args, **kwargs)
+        finally:
+            finish_idempotency_key(request, response)
+        return response
+
+    return idempotent_wrapper
+
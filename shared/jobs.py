@@ -0,0 +1,141 @@
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import autodiscover_modules
+from django_rq import job
+from rq import cron
+
+# Tareas periódicas: {ruta de la función: (función, cola, setting del intervalo)}
+PERIODIC_JOBS = {}
+
+
+def periodic(interval_setting, queue='default'):
+    """
+    Declara una tarea de RQ que se ejecuta cada `settings.<interval_setting>` segundos.
+
+    La función queda decorada con `django_rq.job` (se puede encolar a mano
+    con `.delay()`) y anotada en `PERIODIC_JOBS`. No se reprograma a sí
+    misma: la lanza el planificador de RQ (`manage.py rqcron main.cron`, ver
+    `register_periodic_jobs`), así que un fallo en una ejecución no detiene
+    las siguientes y encolarla a mano no crea otra cadena.
+
+    Parameters
+    ----------
+    interval_setting : str
+        Nombre del setting con el intervalo en segundos. Con 0 la tarea no se
+        programa.
+    queue : str
+        Cola de RQ.
+    """
+
+    def decorator(func):
+        func = job(queue)(func)
+        PERIODIC_JOBS[f'{func.__module__}.{func.__name__}'] = (func, queue, interval_setting)
+        return func
+
+    return decorator
+
+
+def register_periodic_jobs():
+    """
+    Registra en el planificador de RQ todas las tareas declaradas con `periodic`.
+
+    Importa el módulo `tasks` de cada aplicación instalada para que se
+    declaren. Se llama desde la configuración de `rqcron` (`main/cron.py`).
+
+    Returns
+    -------
+    list
+        Rutas de las tareas registradas.
+    """
+    autodiscover_modules('tasks')
+    registered = []
+    for name, (func, queue, interval_setting) in PERIODIC_JOBS.items():
+        interval = getattr(settings, interval_setting)
+        if interval:
+            cron.register(func, queue, interval=interval)
+            registered.append(name)
+    return registered
+
+
+def process_in_chunks(queryset, process, chunk_size=1000, pause=0.0, atomic=False):
+    """
+    Procesa en bloques de tamaño acotado las filas de `queryset`.
+
+    Cada vuelta lee como mucho `chunk_size` claves primarias y se las pasa
+    a `process`, que debe sacar esas filas de `queryset` (borrarlas o
+    cambiarlas de estado); se termina con un bloque incompleto. Cada bloque
+    es una sentencia (o, con `atomic`, una transacción) independiente, así
+    que el bloqueo de escritura se libera entre bloques y las peticiones
+    concurrentes no esperan a que termine toda la pasada.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Filas pendientes de procesar.
+    process : callable
+        Recibe la lista de claves del bloque y devuelve cuántas filas ha procesado.
+    chunk_size : int
+        Número máximo de filas por bloque.
+    pause : float
+        Segundos de espera entre bloques.
+    atomic : bool
+        Si cada bloque (lectura incluida) va en una transacción.
+
+    Returns
+    -------
+    int
+        Número total de filas procesadas.
+    """
+    total = 0
+    while True:
+        with transaction.atomic() if atomic else nullcontext():
+            pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return total
+            total += process(pks)
+        if len(pks) < chunk_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def delete_in_chunks(queryset, chunk_size=1000, pause=0.0):
+    """
+    Borra las filas de `queryset` en bloques (ver `process_in_chunks`).
+
+    Returns
+    -------
+    int
+        Número total de filas borradas.
+    """
+    manager = queryset.model._base_manager
+
+    def delete(pks):
+        deleted, _ = manager.filter(pk__in=pks).delete()
+        return deleted
+
+    return process_in_chunks(queryset, delete, chunk_size, pause)
+
+
+def chunked(queryset, chunk_size=1000):
+    """
+    Recorre las claves primarias de `queryset` en bloques, en orden de clave.
+
+    Cada bloque es una consulta que continúa tras la última clave del
+    anterior, así que el coste no crece con el número de bloques ya leídos.
+
+    Yields
+    ------
+    list
+        Claves primarias del bloque.
+    """
+    queryset = queryset.order_by('pk')
+    pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+    while pks:
+        yield pks
+        if len(pks) < chunk_size:
+            return
+        pks = list(queryset.filter(pk__gt=pks[-1]).values_list('pk', flat=True)[:chunk_size])
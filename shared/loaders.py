@@ -0,0 +1,43 @@
+def load_object(request, queryset, **lookup):
+    """
+    Obtiene un objeto como mucho una vez por petición.
+
+    Los objetos cargados se guardan en un mapa de identidad asociado a la
+    petición (`request._identity_map`), de modo que los distintos decoradores
+    y la vista que necesitan la misma fila comparten una única consulta. La
+    primera llamada decide qué relaciones se cargan, así que cada recurso
+    debe pasar siempre el mismo `queryset` con sus `select_related` y
+    `prefetch_related`.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Petición en curso.
+    queryset : QuerySet
+        Consulta base (con las relaciones que se quieran cargar).
+    **lookup
+        Filtros que identifican el objeto (p.ej. `pk=...`).
+
+    Returns
+    -------
+    Model
+        Instancia encontrada.
+
+    Raises
+    ------
+    Model.DoesNotExist
+        Si el objeto no existe (también se recuerda durante la petición).
+    """
+    identity_map = request.__dict__.setdefault('_identity_map', {})
+    key = (queryset.model._meta.label, tuple(sorted((k, str(v)) for k, v in lookup.items())))
+    if key not in identity_map:
+        try:
+            identity_map[key] = queryset.get(**lookup)
+        except queryset.model.DoesNotExist:
+            identity_map[key] = None
+    obj = identity_map[key]
+    if obj is None:
+        raise queryset.model.DoesNotExist(
+            f'{queryset.model._meta.object_name} matching query does not exist.'
+        )
+    return obj
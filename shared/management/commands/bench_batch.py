@@ -0,0 +1,126 @@
+import datetime
+import json
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from bookings.models import Booking, TimeSlot
+from events.models import Event
+from orders.models import Order, OrderItem
+from products.models import Product
+from services.models import Service
+from users.models import Profile
+
+User = get_user_model()
+
+# Peticiones de la pantalla de inicio de la app
+HOME_SCREEN = (
+    ('services', '/api/services/'),
+    ('products', '/api/products/'),
+    ('events', '/api/events/'),
+    ('barbers', '/api/barbers/'),
+    ('bookings', '/api/bookings/'),
+    ('orders', '/api/orders/'),
+)
+
+
+def seed(client, rows):
+    """Crea `rows` filas de cada listado de la pantalla de inicio."""
+    products = Product.objects.bulk_create(
+        Product(name=f'Producto {i}', description='Gel fijador', price=Decimal('9.95'), stock=9)
+        for i in range(rows)
+    )
+    services = Service.objects.bulk_create(
+        Service(name=f'Servicio {i}', price=Decimal('15'), duration=datetime.timedelta(minutes=30))
+        for i in range(rows)
+    )
+    Event.objects.bulk_create(
+        Event(name=f'Evento {i}', date=datetime.date.today(), time=datetime.time(10), location='L')
+        for i in range(rows)
+    )
+    barbers = [User.objects.create(username=f'barber{i}', first_name='B') for i in range(5)]
+    Profile.objects.filter(user__in=barbers).update(role=Profile.Role.WORKER)
+    slot = TimeSlot.objects.create(start_time=datetime.time(10), end_time=datetime.time(11))
+    Booking.objects.bulk_create(
+        Booking(
+            user=client,
+            barber=barbers[i % len(barbers)],
+            service=service,
+            time_slot=slot,
+            date=datetime.date.today() + datetime.timedelta(days=i),
+        )
+        for i, service in enumerate(services)
+    )
+    orders = Order.objects.bulk_create(Order(user=client) for _ in range(rows))
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, product=product, quantity=1, unit_price=product.price)
+        for order, product in zip(orders, products)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la pantalla de inicio pedida endpoint a endpoint con una sola petición a '
+        '/api/batch/. Trabaja sobre una base de datos de pruebas temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50, help='Filas de cada listado')
+        parser.add_argument('-n', '--number', type=int, default=20, help='Repeticiones')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.compare(options['rows'], options['number'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def compare(self, rows, number):
+        user = User.objects.create(username='client')
+        seed(user, rows)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {user.token.key}'}
+        http = Client()
+        batch_body = json.dumps({'requests': [{'id': i, 'path': p} for i, p in HOME_SCREEN]})
+
+        def separate():
+            return {
+                name: json.loads(http.get(path, **headers).getvalue())
+                for name, path in HOME_SCREEN
+            }
+
+        def batch():
+            response = http.post(
+                '/api/batch/', batch_body, content_type='application/json', **headers
+            )
+            return {
+                name: sub['body'] for name, sub in json.loads(response.content)['responses'].items()
+            }
+
+        if separate() != batch():
+            raise CommandError('Las respuestas del lote no coinciden con las individuales')
+
+        for name, run, requests in (
+            ('Por separado', separate, len(HOME_SCREEN)),
+            ('/api/batch/', batch, 1),
+        ):
+            best = float('inf')
+            for _ in range(number):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    run()
+                    best = min(best, time.perf_counter() - start)
+            self.stdout.write(
+                f'{name}: {requests} peticiones HTTP, {len(queries)} consultas, '
+                f'{best * 1e3:.1f} ms'
+            )
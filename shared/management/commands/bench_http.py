@@ -0,0 +1,77 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga local: peticiones/s y latencia p99 con conexiones concurrentes. '
+        'Para comparar WSGI y ASGI, lanza cada servidor (p.ej. `gunicorn main.wsgi` y '
+        '`uvicorn main.asgi:application`) y pasa sus URLs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='+', help='URLs a medir (p.ej. http://localhost:8000/api/products/)'
+        )
+        parser.add_argument(
+            '-c', '--concurrency', type=int, default=50, help='Conexiones concurrentes'
+        )
+        parser.add_argument('-n', '--requests', type=int, default=2000, help='Peticiones por URL')
+        parser.add_argument('-t', '--token', help='Token para la cabecera Authorization')
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Bearer {options["token"]}'
+        for url in options['urls']:
+            self.bench(url, options['concurrency'], options['requests'], headers)
+
+    def bench(self, url, concurrency, total, headers):
+        parts = urlsplit(url)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        local = threading.local()
+        errors = 0
+
+        def fetch(_):
+            nonlocal errors
+            # Una conexión keep-alive por hilo, como un cliente real.
+            if not hasattr(local, 'connection'):
+                local.connection = connection_class(parts.netloc, timeout=30)
+            start = time.perf_counter()
+            try:
+                local.connection.request('GET', path, headers=headers)
+                response = local.connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                local.connection.close()
+                del local.connection
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            started = time.perf_counter()
+            latencies = list(executor.map(fetch, range(total)))
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{url}\n'
+            f'  {total / elapsed:.1f} peticiones/s, {errors} errores, concurrencia {concurrency}\n'
+            f'  latencia: p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'p99 {percentile(latencies, 0.99) * 1000:.1f} ms'
+        )
@@ -0,0 +1,101 @@
+import datetime
+import timeit
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import JsonResponse as DjangoJsonResponse
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from bookings.models import Booking, TimeSlot
+from bookings.serializers import BookingSerializer
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+from products.models import Product
+from services.models import Service
+from shared.encoders import get_encoder
+from shared.responses import JsonResponse
+
+User = get_user_model()
+
+
+def seed(rows):
+    """Crea `rows` pedidos (con dos líneas cada uno) y `rows` reservas."""
+    client = User.objects.create(username='client')
+    barber = User.objects.create(username='barber', first_name='Barbero', last_name='Ñúñez')
+    products = Product.objects.bulk_create(
+        Product(name=f'Producto {i}', price=Decimal('9.95'), stock=100) for i in range(2)
+    )
+    service = Service.objects.create(
+        name='Corte', price=Decimal('15.50'), duration=datetime.timedelta(minutes=30)
+    )
+    slot = TimeSlot.objects.create(start_time=datetime.time(10), end_time=datetime.time(10, 30))
+    orders = Order.objects.bulk_create(
+        Order(user=client, price=Decimal('39.80')) for _ in range(rows)
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, product=product, quantity=2, unit_price=product.price)
+        for order in orders
+        for product in products
+    )
+    today = datetime.date.today()
+    Booking.objects.bulk_create(
+        Booking(
+            user=client,
+            barber=barber,
+            service=service,
+            time_slot=slot,
+            date=today + datetime.timedelta(days=i),
+        )
+        for i in range(rows)
+    )
+
+
+def timed(response_class, data):
+    return timeit.timeit(lambda: response_class(data, safe=False), number=1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara JsonResponse de Django con shared.responses.JsonResponse sobre pedidos y '
+        'reservas serializados. Trabaja sobre una base de datos de pruebas temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Pedidos y reservas')
+        parser.add_argument('-n', '--number', type=int, default=5, help='Repeticiones')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seed(options['rows'])
+            payloads = (
+                ('pedidos', OrderSerializer(Order.objects.all()).serialize()),
+                ('reservas', BookingSerializer(Booking.objects.all()).serialize()),
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        number = options['number']
+        encoder = get_encoder()
+        self.stdout.write(f'Codificador: {encoder.__module__}.{encoder.__qualname__}')
+        for name, data in payloads:
+            baseline = DjangoJsonResponse(data, safe=False)
+            fast = JsonResponse(data, safe=False)
+            if baseline.content != fast.content:
+                raise CommandError(f'La salida de {name} no coincide con la de Django')
+            # Se alternan ambas versiones y se toma el mínimo de cada una, para
+            # que el ruido del sistema no favorezca a ninguna
+            django_s = fast_s = float('inf')
+            for _ in range(number):
+                django_s = min(django_s, timed(DjangoJsonResponse, data))
+                fast_s = min(fast_s, timed(JsonResponse, data))
+            self.stdout.write(
+                f'{len(data)} {name} ({len(fast.content) / 1e6:.1f} MB): '
+                f'Django {django_s * 1e3:.1f} ms, '
+                f'shared {fast_s * 1e3:.1f} ms '
+                f'(x{django_s / fast_s:.2f})'
+            )
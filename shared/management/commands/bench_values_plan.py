@@ -0,0 +1,108 @@
+import datetime
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from bookings.models import TimeSlot
+from bookings.serializers import TimeSlotSerializer
+from events.models import Event
+from events.serializers import EventSerializer
+from products.models import Product
+from products.serializers import ProductSerializer
+from services.models import Service
+from services.serializers import ServiceSerializer
+from shared.encoders import dumps
+
+
+def make_product(i):
+    return Product(name=f'Producto {i}', description='Gel fijador', price=Decimal('9.95'), stock=i)
+
+
+def make_service(i):
+    return Service(
+        name=f'Servicio {i}',
+        description='Corte y lavado',
+        price=Decimal('15.50'),
+        duration=datetime.timedelta(minutes=30),
+    )
+
+
+def make_event(i):
+    return Event(
+        name=f'Evento {i}',
+        description='Taller',
+        date=datetime.date.today(),
+        time=datetime.time(10, 30),
+        location='Local',
+    )
+
+
+def make_slot(i):
+    return TimeSlot(start_time=datetime.time(i % 24), end_time=datetime.time(i % 24, 30))
+
+
+CATALOG = (
+    (Product, ProductSerializer, make_product),
+    (Service, ServiceSerializer, make_service),
+    (Event, EventSerializer, make_event),
+    (TimeSlot, TimeSlotSerializer, make_slot),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la serialización con values_plan (values_list) con la de instancias de modelo '
+        'en los listados de catálogo. Trabaja sobre una base de datos de pruebas temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 100000], help='Tamaños'
+        )
+        parser.add_argument('-n', '--number', type=int, default=3, help='Repeticiones')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.compare(sorted(options['rows']), options['number'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def compare(self, sizes, number):
+        request = RequestFactory().get('/')
+        existing = 0
+        for size in sizes:
+            for model, serializer_class, make in CATALOG:
+                model.objects.bulk_create(
+                    (make(i) for i in range(existing, size)), batch_size=1000
+                )
+            existing = size
+
+            for model, serializer_class, _ in CATALOG:
+                # El mismo serializador sin plan: recorre instancias del modelo
+                instances_class = type(
+                    f'Instance{serializer_class.__name__}', (serializer_class,), {'values_plan': ()}
+                )
+
+                def by_plan():
+                    return serializer_class(model.objects.all(), request=request).serialize()
+
+                def by_instances():
+                    return instances_class(model.objects.all(), request=request).serialize()
+
+                if dumps(by_plan()) != dumps(by_instances()):
+                    raise CommandError(f'{serializer_class.__name__}: la salida no coincide')
+                instances_s = min(timeit.repeat(by_instances, number=1, repeat=number))
+                plan_s = min(timeit.repeat(by_plan, number=1, repeat=number))
+                self.stdout.write(
+                    f'{serializer_class.__name__} {size} filas: '
+                    f'instancias {instances_s * 1e3:.1f} ms, '
+                    f'values_plan {plan_s * 1e3:.1f} ms '
+                    f'(x{instances_s / plan_s:.2f})'
+                )
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from shared.tasks import delete_expired_idempotency_keys, purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra las claves de idempotencia caducadas en bloques '
+        '(o encola una purga en RQ con --enqueue)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.IDEMPOTENCY_PURGE_CHUNK,
+            help='Claves borradas por sentencia',
+        )
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Encola una ejecución de purge_idempotency_keys en RQ en lugar de purgar ahora',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = purge_idempotency_keys.delay()
+            self.stdout.write(self.style.SUCCESS(f'Tarea encolada: {job.id}'))
+            return
+        total = delete_expired_idempotency_keys(
+            options['chunk_size'], settings.IDEMPOTENCY_PURGE_PAUSE
+        )
+        self.stdout.write(self.style.SUCCESS(f'Claves borradas: {total}'))
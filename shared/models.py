@@ -1,3 +1,157 @@
-from django.db import models
+from datetime import timedelta
 
-# Create your models here.
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class TableVersion(models.Model):
+    """
+    Contador de versión de una tabla, para las peticiones condicionales.
+
+    Las señales de los modelos cacheables lo incrementan en la misma
+    transacción que la escritura, así que la versión cambia exactamente cuando
+    cambian los datos (también al borrar filas, que `max(updated_at)` no
+    detectaría). `shared.conditional` construye con él los validadores de
+    los listados sin tener que serializarlos.
+
+    Attributes
+    ----------
+    label : CharField
+        Etiqueta del modelo (`app_label.model_name`).
+    version : PositiveBigIntegerField
+        Número de escrituras registradas.
+    changed_at : DateTimeField
+        Fecha y hora de la última escritura.
+    """
+
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.label} v{self.version}'
+
+    @classmethod
+    def bump(cls, model, changed_at=None) -> None:
+        """
+        Registra una escritura en la tabla de `model`.
+
+        Las escrituras que no emiten señales (`QuerySet.update()`,
+        `bulk_create()`) deben llamarlo por su cuenta.
+
+        Parameters
+        ----------
+        model : Model
+            Modelo modificado.
+        changed_at : datetime, opcional
+            Momento de la escritura. Por defecto, ahora.
+        """
+        label = model._meta.label_lower
+        changed_at = changed_at or timezone.now()
+        rows = cls.objects.filter(label=label)
+        if rows.update(version=F('version') + 1, changed_at=changed_at):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(label=label, version=1, changed_at=changed_at)
+        except IntegrityError:
+            # Otra petición ha creado la fila a la vez
+            rows.update(version=F('version') + 1, changed_at=changed_at)
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada de una petición con cabecera `Idempotency-Key`.
+
+    La fila se crea al empezar a atender la petición (`status_code` nulo:
+    en curso) y se completa con la respuesta al terminar, de modo que los
+    reintentos del mismo usuario con la misma clave reciben esa respuesta sin
+    volver a ejecutar la vista (ver `shared.idempotency`). Caduca a las
+    `settings.IDEMPOTENCY_KEY_TTL` segundos y se purga en bloques con
+    `shared.tasks.purge_idempotency_keys`. Una fila que sigue en curso pasados
+    `settings.IDEMPOTENCY_LEASE` segundos (el proceso que la reservó se cayó
+    sin liberarla) la puede reclamar un reintento.
+
+    Attributes
+    ----------
+    user : ForeignKey
+        Usuario que hizo la petición.
+    key : CharField
+        Valor de la cabecera `Idempotency-Key`.
+    fingerprint : CharField
+        Hash del método, la ruta y el cuerpo: la clave no se puede reutilizar
+        para otra petición.
+    status_code : PositiveSmallIntegerField
+        Código de la respuesta, o None mientras la petición está en curso.
+    content_type : CharField
+        Cabecera `Content-Type` de la respuesta.
+    content : BinaryField
+        Cuerpo de la respuesta.
+    created_at : DateTimeField
+        Fecha y hora de la primera petición.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_unique'),
+        ]
+        # Purga de las claves caducadas
+        indexes = [models.Index(fields=['created_at'], name='idempotency_created_idx')]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    content = models.BinaryField(default=b'')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.user_id}:{self.key}'
+
+    @classmethod
+    def claim(cls, user, key, fingerprint):
+        """
+        Reserva la clave para una petición nueva o devuelve la ya registrada.
+
+        La restricción única sobre `(user, key)` decide qué petición gana
+        cuando llegan varias a la vez. Una clave caducada que aún no se ha
+        purgado, o una reserva en curso cuyo plazo (`IDEMPOTENCY_LEASE`) ha
+        vencido, se borra y se vuelve a reservar.
+
+        Parameters
+        ----------
+        user : User
+            Usuario autenticado.
+        key : str
+            Valor de la cabecera `Idempotency-Key`.
+        fingerprint : str
+            Hash de la petición.
+
+        Returns
+        -------
+        tuple
+            `(registro, creado)`: `creado` es True si la petición debe ejecutarse.
+        """
+        now = timezone.now()
+        expired_before = now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        abandoned_before = now - timedelta(seconds=settings.IDEMPOTENCY_LEASE)
+        while True:
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(user=user, key=key, fingerprint=fingerprint), True
+            except IntegrityError:
+                pass
+            record = cls.objects.filter(user=user, key=key).first()
+            if record is None:
+                continue  # Purgada entre el INSERT y la lectura
+            if record.created_at < expired_before:
+                cls.objects.filter(pk=record.pk, created_at=record.created_at).delete()
+            elif record.status_code is None and record.created_at < abandoned_before:
+                # La condición sobre `status_code` evita borrar una respuesta
+                # que se haya guardado entre la lectura y el DELETE
+                cls.objects.filter(pk=record.pk, status_code=None).delete()
+            else:
+                return record, False
@@ -0,0 +1,173 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+from .responses import JsonResponse
+
+
+class PageRequest(NamedTuple):
+    """Parámetros de paginación de una petición, ya validados."""
+
+    ordering: tuple[str, ...]
+    limit: int
+    after: list | None
+
+
+class Page(NamedTuple):
+    """Resultado de `paginate`: los elementos a serializar y la URL siguiente."""
+
+    items: QuerySet
+    next_url: str | None
+
+    def link(self, response):
+        """Añade la cabecera `Link: <...>; rel="next"` si hay más páginas."""
+        if self.next_url:
+            response['Link'] = f'<{self.next_url}>; rel="next"'
+        return response
+
+
+def encode_cursor(values) -> str:
+    """Codifica los valores de la clave de la última fila como un cursor opaco."""
+    values = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, fields) -> list:
+    """
+    Decodifica un cursor de `encode_cursor`.
+
+    Raises
+    ------
+    ValueError
+        Si el cursor no es válido para los campos de la ordenación.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as err:
+        raise ValueError('Cursor inválido') from err
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError('Cursor inválido')
+    try:
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValidationError, TypeError) as err:
+        raise ValueError('Cursor inválido') from err
+
+
+def cursor_pagination(model, *ordering):
+    """
+    Comprobación para `endpoint(checks=...)` que activa la paginación por cursor.
+
+    La paginación es opcional: solo se aplica si la petición trae `limit` o
+    `cursor`, y en ese caso deja en `request.page` un `PageRequest` que usa
+    `paginate`. Sin esos parámetros el listado se devuelve completo, como
+    hasta ahora.
+
+    Cada página se pide con `WHERE clave > cursor ORDER BY clave LIMIT n`
+    (ver `_keyset`) en lugar de OFFSET, así que una página profunda cuesta lo mismo que la
+    primera siempre que la ordenación esté respaldada por un índice.
+
+    Parameters
+    ----------
+    model : Model
+        Modelo del listado.
+    *ordering : str
+        Campos de la clave, únicos en conjunto (terminar en 'id'), con '-'
+        para orden descendente. P.ej. `('-created_at', '-id')`.
+
+    Returns
+    -------
+    callable
+        Comprobación `check(request, kwargs)`.
+    """
+    fields = [model._meta.get_field(name.lstrip('-')) for name in ordering]
+
+    def check_cursor_pagination(request, kwargs):
+        request.page = None
+        if 'limit' not in request.GET and 'cursor' not in request.GET:
+            return None
+        try:
+            limit = int(request.GET.get('limit', settings.PAGE_SIZE))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return JsonResponse(
+                {'error': 'El parámetro limit debe ser un entero positivo'}, status=400
+            )
+        after = None
+        if cursor := request.GET.get('cursor'):
+            try:
+                after = decode_cursor(cursor, fields)
+            except ValueError as err:
+                return JsonResponse({'error': str(err)}, status=400)
+        request.page = PageRequest(ordering, min(limit, settings.PAGE_MAX_SIZE), after)
+        return None
+
+    return check_cursor_pagination
+
+
+def paginate(request, queryset: QuerySet) -> Page:
+    """
+    Aplica a `queryset` la página pedida (ver `cursor_pagination`).
+
+    Se hacen dos consultas sobre el índice: una que lee solo la clave de
+    `limit + 1` filas, para saber si hay página siguiente y calcular su
+    cursor, y la de la página en sí, que queda sin evaluar para que el
+    serializador aplique sus proyecciones, precargas o `values_plan`.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Petición con `request.page` (None si no se ha pedido paginación).
+    queryset : QuerySet
+        Listado completo.
+
+    Returns
+    -------
+    Page
+        Página a serializar (el queryset original si no se pagina) y URL de
+        la siguiente, o None.
+    """
+    page = getattr(request, 'page', None)
+    if page is None:
+        return Page(queryset, None)
+    queryset, keys = _keyset(page, queryset)
+    return _page(request, page, queryset, list(keys))
+
+
+def _keyset(page, queryset):
+    # Devuelve el listado ordenado a partir del cursor y la consulta de las
+    # claves de `limit + 1` filas
+    names = [name.lstrip('-') for name in page.ordering]
+    queryset = queryset.order_by(*page.ordering)
+    if page.after is not None:
+        # (a, b) > (x, y) se escribe como `a >= x AND (a > x OR b > y)`, no
+        # como `a > x OR (a = x AND b > y)`: con el OR en la raíz el planificador
+        # no usa el rango del índice y recorre todas las filas anteriores.
+        condition = None
+        for name, key, value in reversed(list(zip(names, page.ordering, page.after))):
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            strict = Q(**{f'{name}__{lookup}': value})
+            if condition is None:
+                condition = strict
+            else:
+                condition = Q(**{f'{name}__{lookup}e': value}) & (strict | condition)
+        queryset = queryset.filter(condition)
+    return queryset, queryset.values_list(*names)[: page.limit + 1]
+
+
+def _page(request, page, queryset, keys):
+    next_url = None
+    if len(keys) > page.limit:
+        query = request.GET.copy()
+        query['limit'] = page.limit
+        query['cursor'] = encode_cursor(keys[page.limit - 1])
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    return Page(queryset[: page.limit], next_url)
@@ -0,0 +1,28 @@
+import json
+
+from django.http import HttpResponse
+
+from .encoders import dumps, get_encoder
+
+
+class JsonResponse(HttpResponse):
+    """
+    Igual que `django.http.JsonResponse`, pero codifica con `shared.encoders.dumps`.
+
+    Por defecto usa el codificador de `settings.JSON_ENCODER` y escribe los
+    bytes directamente en el cuerpo. Si se pasan `json_dumps_params` se usa
+    `json.dumps` con esos parámetros, como en Django.
+    """
+
+    def __init__(self, data, encoder=None, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the '
+                'safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        if json_dumps_params:
+            content = json.dumps(data, cls=encoder or get_encoder(), **json_dumps_params)
+        else:
+            content = dumps(data, encoder)
+        super().__init__(content=content, **kwargs)
@@ -0,0 +1,225 @@
+import datetime
+import decimal
+
+
+class SchemaError(Exception):
+    """
+    Error de validación del cuerpo de una petición.
+
+    Attributes
+    ----------
+    message : str
+        Mensaje de error que se devuelve al cliente.
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class Field:
+    """
+    Campo base de un esquema.
+
+    Parameters
+    ----------
+    required : bool
+        Si el campo debe estar presente en el cuerpo.
+    null : bool
+        Si se admite `null` como valor.
+    """
+
+    def __init__(self, *, required=True, null=False):
+        self.required = required
+        self.null = null
+
+    def coerce(self, value):
+        """
+        Convierte el valor recibido al tipo del campo.
+
+        Parameters
+        ----------
+        value : object
+            Valor tal y como viene en el JSON.
+
+        Returns
+        -------
+        object
+            Valor convertido.
+
+        Raises
+        ------
+        ValueError, TypeError
+            Si el valor no es válido para el campo.
+        """
+        return value
+
+    def compile(self):
+        """Devuelve la función que valida y convierte un valor de este campo."""
+        coerce = self.coerce
+        if not self.null:
+            return coerce
+
+        def coerce_nullable(value):
+            return None if value is None else coerce(value)
+
+        return coerce_nullable
+
+
+class String(Field):
+    def coerce(self, value):
+        if not isinstance(value, str):
+            raise TypeError('Se esperaba una cadena')
+        return value
+
+
+class Integer(Field):
+    def __init__(self, *, min_value=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+
+    def coerce(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise TypeError('Se esperaba un entero')
+        value = int(value)
+        if self.min_value is not None and value < self.min_value:
+            raise ValueError(f'El valor mínimo es {self.min_value}')
+        return value
+
+
+class Decimal(Field):
+    def coerce(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise TypeError('Se esperaba un número')
+        try:
+            value = decimal.Decimal(str(value))
+        except decimal.InvalidOperation:
+            raise ValueError('Número no válido')
+        if not value.is_finite():
+            raise ValueError('Número no válido')
+        return value
+
+
+class Date(Field):
+    def coerce(self, value):
+        return datetime.date.fromisoformat(value)
+
+
+class Time(Field):
+    def coerce(self, value):
+        return datetime.time.fromisoformat(value)
+
+
+class Parsed(Field):
+    """
+    Campo de texto que se convierte con una función propia.
+
+    Parameters
+    ----------
+    parser : callable
+        Función que recibe la cadena y devuelve el valor convertido, o lanza
+        `ValueError` si no es válida (p.ej. `Service.convert_duration_string`).
+    """
+
+    def __init__(self, parser, **kwargs):
+        super().__init__(**kwargs)
+        self.parser = parser
+
+    def coerce(self, value):
+        if not isinstance(value, str):
+            raise TypeError('Se esperaba una cadena')
+        return self.parser(value)
+
+
+class List(Field):
+    """
+    Lista de objetos que cumplen un esquema.
+
+    Parameters
+    ----------
+    schema : Schema
+        Esquema de cada elemento.
+    """
+
+    def __init__(self, schema, **kwargs):
+        super().__init__(**kwargs)
+        self.schema = schema
+
+    def coerce(self, value):
+        if not isinstance(value, list):
+            raise TypeError('Se esperaba una lista')
+        return [self.schema.validate(item) for item in value]
+
+
+class Schema:
+    """
+    Esquema declarativo del cuerpo JSON de un endpoint.
+
+    Los campos se compilan una sola vez, al construir el esquema, en una
+    tupla de `(nombre, requerido, conversor)` que `validate` recorre sin
+    volver a inspeccionar los campos.
+
+    Parameters
+    ----------
+    **fields : Field
+        Campos del esquema por nombre.
+
+    Examples
+    --------
+    >>> schema = Schema(name=String(), price=Decimal(), stock=Integer(min_value=0))
+    >>> schema.validate({'name': 'Gel', 'price': '9.95', 'stock': 3})
+    {'name': 'Gel', 'price': Decimal('9.95'), 'stock': 3}
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self._compiled = tuple(
+            (name, field.required, field.compile()) for name, field in fields.items()
+        )
+
+    def validate(self, data) -> dict:
+        """
+        Valida y convierte un objeto JSON ya decodificado.
+
+        Las claves que no forman parte del esquema se conservan sin cambios.
+
+        Parameters
+        ----------
+        data : object
+            Cuerpo decodificado.
+
+        Returns
+        -------
+        dict
+            Copia del cuerpo con los campos del esquema convertidos.
+
+        Raises
+        ------
+        SchemaError
+            Si falta un campo requerido o algún valor no es válido.
+        """
+        if not isinstance(data, dict):
+            raise SchemaError('Cuerpo JSON inválido')
+        cleaned = dict(data)
+        for name, required, coerce in self._compiled:
+            if name not in data:
+                if required:
+                    raise SchemaError('Faltan campos requeridos')
+                continue
+            try:
+                cleaned[name] = coerce(data[name])
+            except SchemaError:
+                raise
+            except (TypeError, ValueError):
+                raise SchemaError(f'Valor inválido para el campo {name}')
+        return cleaned
+
+
+BatchRequestSchema = Schema(
+    id=String(),
+    path=String(),
+)
+
+BatchSchema = Schema(
+    requests=List(BatchRequestSchema),
+)
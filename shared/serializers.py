@@ -1,25 +1,255 @@
-import json
+import logging
 from abc import ABC
-from typing import Iterable
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Iterable, Iterator
 
-from django.http import HttpRequest, JsonResponse
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+
+from .cache import RepresentationCache
+from .encoders import dumps
+from .responses import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+def requested_fields(request: HttpRequest) -> list[str]:
+    """Campos pedidos en `?fields=id,name,price` (lista vacía si no se restringen)."""
+    return [f for f in (f.strip() for f in request.GET.get('fields', '').split(',')) if f]
+
+
+def check_fields(serializer_class):
+    """
+    Construye la comprobación de `?fields=` para un endpoint.
+
+    Responde con un 400 si se pide algún campo que `serializer_class` no
+    devuelve (ver `BaseSerializer.field_names`), en lugar de omitirlo.
+    """
+    known = serializer_class.field_names()
+
+    def check(request, kwargs):
+        if unknown := [f for f in requested_fields(request) if f not in known]:
+            error = f'Campos desconocidos: {", ".join(unknown)}'
+            return JsonResponse({'error': error}, status=400)
+
+    check.__name__ = 'check_fields'
+    return check
 
 
 class BaseSerializer(ABC):
+    # Relaciones que recorre `serialize_instance`, por campo de salida. Cuando
+    # se serializa un queryset se aplican con select_related/prefetch_related
+    # para que el número de consultas no dependa del número de filas.
+    select_related: dict[str, tuple[str, ...]] = {}
+    prefetch_related: dict[str, tuple[str, ...]] = {}
+    # Columnas que lee cada campo de salida, para `only()`, cuando no son el
+    # campo del modelo del mismo nombre.
+    columns: dict[str, tuple[str, ...]] = {}
+    # Plan para serializar querysets sin instanciar modelos (ver
+    # `compile_plan`): una entrada `(campo de salida, columna)` o
+    # `(campo de salida, columna, conversión)` por campo, en el orden de
+    # `serialize_instance`. La conversión es una función o el nombre de un
+    # método del serializador que recibe el valor de la columna; debe ser
+    # pura, porque sus resultados se memorizan (muchas filas comparten, p.ej.,
+    # la imagen por defecto).
+    values_plan: tuple[tuple, ...] = ()
+    # Caché de representaciones por objeto (ver `shared.cache`) que usan
+    # `serialize_pk` y `serialize_pks`, y modelo de los objetos que se cachean.
+    cache: RepresentationCache | None = None
+    model: type[Model] | None = None
+    # Campos que devuelve `serialize_instance`, para validar `fields`. Si se
+    # omite, las claves de `values_plan`.
+    output_fields: tuple[str, ...] = ()
+
     def __init__(
         self,
-        to_serialize: object | Iterable[object],
+        to_serialize: object | Iterable[object] = None,
         *,
         fields: Iterable[str] = [],
         request: HttpRequest = None,
     ):
-        self.to_serialize = to_serialize
         self.fields = fields
         self.request = request
+        self._to_dict = self.__serialize_instance
+        # Un queryset ya evaluado (p.ej. `order.items.all()` precargado) se deja
+        # tal cual: clonarlo con select_related descartaría la precarga.
+        if isinstance(to_serialize, QuerySet) and to_serialize._result_cache is None:
+            if self.values_plan:
+                columns, self._to_dict = self.compile_plan()
+                to_serialize = to_serialize.values_list(*columns)
+            else:
+                to_serialize = self.optimize(to_serialize)
+        self.to_serialize = to_serialize
+
+    @classmethod
+    def field_names(cls) -> tuple[str, ...]:
+        """Campos que devuelve el serializador (los que admite `fields`)."""
+        return cls.output_fields or tuple(key for key, *_ in cls.values_plan)
 
     def build_url(self, path: str) -> str:
         return self.request.build_absolute_uri(path) if self.request else path
 
+    def optimize(self, queryset: QuerySet) -> QuerySet:
+        """
+        Aplica al queryset las relaciones declaradas por el serializador.
+
+        Solo se incluyen las relaciones de los campos que se van a devolver
+        (todos si no se ha restringido `fields`). Si se ha restringido, además
+        se cargan solo las columnas de esos campos (ver `columns`), así que
+        `serialize_instance` debe leer cada columna solo si `wants` su campo.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            Queryset a serializar.
+
+        Returns
+        -------
+        QuerySet
+            Queryset con los joins y precargas necesarios.
+        """
+        select = self._related_paths(self.select_related)
+        prefetch = self._related_paths(self.prefetch_related)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if self.fields:
+            only = self._projected_columns(queryset.model) or [queryset.model._meta.pk.name]
+            queryset = queryset.only(*only)
+        return queryset
+
+    def _related_paths(self, relations: dict) -> list[str]:
+        paths = []
+        for field, field_paths in relations.items():
+            if not self.fields or field in self.fields:
+                paths.extend(p for p in field_paths if p not in paths)
+        return paths
+
+    def _projected_columns(self, model) -> list[str]:
+        columns = []
+        for field in self.fields:
+            if field in self.columns:
+                columns.extend(self.columns[field])
+                continue
+            try:
+                model_field = model._meta.get_field(field)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete:
+                columns.append(field)
+        return columns
+
+    def wants(self, field: str) -> bool:
+        """
+        Indica si `field` forma parte de la salida.
+
+        `serialize_instance` lo usa para no construir los campos costosos
+        (serializadores anidados, URLs) que se van a descartar.
+        """
+        return not self.fields or field in self.fields
+
+    def compile_plan(self) -> tuple[list[str], Callable[[tuple], dict]]:
+        """
+        Compila `values_plan` para los campos que se van a devolver.
+
+        Returns
+        -------
+        tuple
+            Las columnas para `values_list()` y una función que convierte
+            cada fila (tupla) en el mismo diccionario que devolvería
+            `serialize_instance` para esa instancia.
+        """
+        columns, keys, converters = [], [], []
+        for key, column, *convert in self.values_plan:
+            if not self.wants(key):
+                continue
+            if convert:
+                converter = convert[0]
+                if isinstance(converter, str):
+                    converter = getattr(self, converter)
+                converters.append((len(keys), lru_cache(maxsize=1024)(converter)))
+            columns.append(column)
+            keys.append(key)
+        keys = tuple(keys)
+
+        if not converters:
+            return columns or ['pk'], lambda row: dict(zip(keys, row))
+
+        def to_dict(row):
+            row = list(row)
+            for index, convert in converters:
+                row[index] = convert(row[index])
+            return dict(zip(keys, row))
+
+        return columns, to_dict
+
+    def prepare(self, instances: list) -> None:
+        """
+        Se llama con cada bloque de instancias antes de serializarlas.
+
+        Permite a los serializadores resolver de una vez lo que necesitan
+        todas las instancias del bloque (p.ej. calentar la caché de los
+        objetos anidados). Por defecto no hace nada.
+        """
+
+    def serialize_pks(self, pks: Iterable) -> dict:
+        """
+        Serializa los objetos de `model` con esos pks, a través de `cache`.
+
+        En la caché se guarda la representación completa, así que `fields`
+        se aplica a la salida. Los que no están en caché se cargan con una
+        sola consulta.
+
+        Parameters
+        ----------
+        pks : iterable
+            Claves primarias de los objetos.
+
+        Returns
+        -------
+        dict
+            Representación de cada objeto por pk (sin los que no existen).
+        """
+        to_python = self.model._meta.pk.to_python
+        full = type(self)(request=self.request)
+
+        def load(missing):
+            return {
+                obj.pk: full.serialize_instance(obj)
+                for obj in self.model.objects.filter(pk__in=missing)
+            }
+
+        pks = [to_python(pk) for pk in pks]
+        if self.cache is None:
+            serialized = load(pks)
+        else:
+            serialized = self.cache.get_many(self.model, pks, self.build_url('/'), load)
+        if not self.fields:
+            return serialized
+        return {
+            pk: {f: v for f, v in data.items() if f in self.fields}
+            for pk, data in serialized.items()
+        }
+
+    def serialize_pk(self, pk) -> dict:
+        """
+        Serializa el objeto de `model` con ese pk, a través de `cache`.
+
+        Raises
+        ------
+        Model.DoesNotExist
+            Si el objeto no existe.
+        """
+        pk = self.model._meta.pk.to_python(pk)
+        try:
+            return self.serialize_pks([pk])[pk]
+        except KeyError:
+            raise self.model.DoesNotExist from None
+
     # To be implemented by subclasses
     def serialize_instance(self, instance: object) -> dict:
         raise NotImplementedError
@@ -30,11 +260,80 @@ class BaseSerializer(ABC):
 
     def serialize(self) -> dict | list[dict]:
         if not isinstance(self.to_serialize, Iterable):
+            self.prepare([self.to_serialize])
             return self.__serialize_instance(self.to_serialize)
-        return [self.__serialize_instance(instance) for instance in self.to_serialize]
+        instances = list(self.to_serialize)
+        self.prepare(instances)
+        return [self._to_dict(instance) for instance in instances]
+
+    def stream(self, chunk_size: int = None) -> Iterator[bytes]:
+        """
+        Serializa una colección como un array JSON, por fragmentos.
+
+        Los querysets se recorren con `iterator(chunk_size)`, así que nunca
+        hay más de un bloque de instancias (ni de diccionarios) en memoria, y
+        las relaciones de `prefetch_related` se precargan bloque a bloque. La
+        concatenación de los fragmentos es idéntica a `json_response`.
+
+        Parameters
+        ----------
+        chunk_size : int, opcional
+            Instancias por bloque. Por defecto, `settings.STREAM_CHUNK_SIZE`.
+
+        Yields
+        ------
+        bytes
+            Un fragmento del array por bloque, más los corchetes.
+        """
+        chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+        instances = self.to_serialize
+        if isinstance(instances, QuerySet):
+            instances = instances.iterator(chunk_size=chunk_size)
+        else:
+            instances = iter(instances)
+        yield b'['
+        separator = b''
+        while chunk := list(islice(instances, chunk_size)):
+            self.prepare(chunk)
+            # `dumps` de la lista sin sus corchetes: mismos separadores que el
+            # array completo
+            yield separator + dumps([self._to_dict(i) for i in chunk])[1:-1]
+            separator = b', '
+        yield b']'
 
     def to_json(self) -> str:
-        return json.dumps(self.serialize())
+        return dumps(self.serialize()).decode()
 
     def json_response(self) -> str:
         return JsonResponse(self.serialize(), safe=False)
+
+    def stream_response(self, chunk_size: int = None) -> StreamingHttpResponse:
+        """
+        Respuesta que envía el array de `stream` a medida que se genera.
+
+        El primer bloque (con la consulta) se serializa antes de crear la
+        respuesta, así que un error en él llega al cliente como un 500, igual
+        que con `json_response`. Un error en un bloque posterior ocurre con el
+        200 y las cabeceras ya enviados: se registra en el log y se corta la
+        respuesta, de modo que el cliente recibe un cuerpo incompleto (un JSON
+        no válido, sin el final del cuerpo chunked) en lugar de un error.
+
+        Bajo ASGI, Django 4.2 reúne en memoria el cuerpo de las respuestas con
+        un iterador síncrono antes de enviarlo: la memoria solo queda acotada
+        al servir con WSGI.
+        """
+        chunks = self.stream(chunk_size)
+        head = next(chunks) + next(chunks)  # '[' y el primer bloque (o ']')
+        return StreamingHttpResponse(_logged(head, chunks), content_type='application/json')
+
+
+def _logged(head: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    # Cuerpo de `stream_response`: un error tras enviar las cabeceras solo se
+    # puede registrar (el cuerpo queda incompleto)
+    yield head
+    try:
+        yield from chunks
+    except Exception:
+        logger.exception('Respuesta en streaming cortada por un error al serializar')
+        raise
+
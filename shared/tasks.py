@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .jobs import delete_in_chunks, periodic
+from .models import IdempotencyKey
+
+
+def delete_expired_idempotency_keys(chunk_size=1000, pause=0.0):
+    """
+    Borra las claves de idempotencia caducadas en bloques de tamaño acotado.
+
+    Como `accounts.tasks.delete_expired_sessions`: cada bloque es un DELETE
+    independiente sobre el índice de `created_at`, así que las compras y
+    reservas concurrentes no esperan a que termine toda la purga.
+
+    Parameters
+    ----------
+    chunk_size : int
+        Número máximo de claves borradas por sentencia.
+    pause : float
+        Segundos de espera entre bloques.
+
+    Returns
+    -------
+    int
+        Número total de claves borradas.
+    """
+    expired_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    return delete_in_chunks(
+        IdempotencyKey.objects.filter(created_at__lt=expired_before), chunk_size, pause
+    )
+
+
+@periodic('IDEMPOTENCY_PURGE_INTERVAL')
+def purge_idempotency_keys():
+    """
+    Tarea periódica que purga las claves de idempotencia caducadas.
+
+    Se ejecuta cada `settings.IDEMPOTENCY_PURGE_INTERVAL` segundos (ver
+    `shared.jobs.periodic`).
+
+    Returns
+    -------
+    int
+        Número de claves borradas.
+    """
+    return delete_expired_idempotency_keys(
+        settings.IDEMPOTENCY_PURGE_CHUNK, settings.IDEMPOTENCY_PURGE_PAUSE
+    )
@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from shared.cache import representation_cache
+from users.auth import token_cache
+
+
+class ConstantQueriesMixin:
+    """
+    Comprueba que un listado hace las mismas consultas con 1 fila que con muchas.
+
+    Las apps lo mezclan con `TestCase` e implementan `add_rows(count)`. Cada
+    medida parte de la caché de representaciones vacía, así que una
+    consulta por fila no queda oculta por la caché. El token (si lo hay) ya
+    está en caché, como en un cliente que hace varias peticiones.
+    """
+
+    rows = 20
+
+    def add_rows(self, count):
+        raise NotImplementedError
+
+    def count_queries(self, url, token=None):
+        headers = {}
+        if token is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+            token_cache.get(str(token))
+        representation_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+            response.getvalue()  # Los listados en streaming consultan al leerse
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, token=None):
+        self.add_rows(1)
+        single = self.count_queries(url, token)
+        self.add_rows(self.rows)
+        self.assertEqual(self.count_queries(url, token), single)
 
-# Create your tests here.
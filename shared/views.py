@@ -1,3 +1,136 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+
+from .decorators import check_token
+from .encoders import dumps
+from .endpoints import endpoint
+from .responses import JsonResponse
+from .schemas import BatchSchema
+
+# Cabeceras de cada subrespuesta que se devuelven junto a su cuerpo
+BATCH_HEADERS = ('ETag', 'Last-Modified', 'Link')
+
+
+class SubRequest(HttpRequest):
+    """
+    Petición GET interna de `/api/batch/`.
+
+    Hereda de la petición del lote las cabeceras (incluida la autenticación),
+    la sesión, el usuario y las cachés por petición: los objetos ya cargados
+    (`_identity_map`, ver `shared.loaders.load_object`) y las versiones de
+    las tablas (ver `shared.conditional.table_versions`). Así todas las
+    subpeticiones comparten una única autenticación y leen cada fila como
+    mucho una vez.
+
+    Parameters
+    ----------
+    parent : HttpRequest
+        Petición de `/api/batch/`.
+    path : str
+        Ruta de la subpetición, con su query string.
+    """
+
+    def __init__(self, parent, path):
+        super().__init__()
+        path, _, query = path.partition('?')
+        self.parent = parent
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META = {
+            key: value
+            for key, value in parent.META.items()
+            if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE')
+        }
+        self.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query)
+        self.GET = QueryDict(query)
+        self.COOKIES = parent.COOKIES
+        for name in ('session', 'user', 'principal'):
+            if hasattr(parent, name):
+                setattr(self, name, getattr(parent, name))
+        self._identity_map = parent.__dict__.setdefault('_identity_map', {})
+        self._table_versions = parent.__dict__.setdefault('_table_versions', {})
+
+    def _get_scheme(self):
+        return self.parent.scheme
+
+
+@endpoint('POST', body=BatchSchema)
+def batch(request):
+    """
+    Ejecuta varias peticiones GET de la API en una sola.
+
+    Pensado para la pantalla de inicio de la app, que necesita a la vez
+    servicios, productos, eventos, barberos y las reservas y pedidos del
+    usuario. El token se comprueba una vez para todo el lote y cada
+    subpetición se resuelve con el URLconf y se sirve con su vista, con las
+    mismas comprobaciones, sin volver a pasar por los middlewares.
+
+    Cuerpo:
+        {"requests": [{"id": "products", "path": "/api/products/?fields=id,name"}, ...]}
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Objeto de solicitud HTTP con el lote en el cuerpo.
+
+    Returns
+    -------
+    HttpResponse
+        JSON `{"responses": {id: {"status": ..., "headers": {...}, "body": ...}}}`
+        en el orden del lote. `body` es el JSON de la subrespuesta tal cual,
+        o null si no es JSON.
+    """
+    subrequests = request.json_body['requests']
+    if len(subrequests) > settings.BATCH_MAX_REQUESTS:
+        return JsonResponse(
+            {'error': f'Como máximo {settings.BATCH_MAX_REQUESTS} peticiones por lote'},
+            status=400,
+        )
+    ids = [sub['id'] for sub in subrequests]
+    if len(set(ids)) != len(ids):
+        return JsonResponse({'error': 'Los id de las peticiones deben ser únicos'}, status=400)
+    for sub in subrequests:
+        if not sub['path'].startswith('/api/') or sub['path'].startswith('/api/batch/'):
+            return JsonResponse({'error': f'Ruta no permitida: {sub["path"]}'}, status=400)
+
+    if 'Authorization' in request.headers:
+        if error := check_token(request, {}):
+            return error
+
+    parts = []
+    for sub in subrequests:
+        response = _run(SubRequest(request, sub['path']))
+        meta = {
+            'status': response.status_code,
+            'headers': {name: response[name] for name in BATCH_HEADERS if name in response},
+        }
+        body = _content(response)
+        if not body or not response.get('Content-Type', '').startswith('application/json'):
+            body = b'null'
+        # El cuerpo de la subrespuesta ya es JSON: se inserta sin decodificarlo
+        parts.append(dumps(sub['id']) + b': ' + dumps(meta)[:-1] + b', "body": ' + body + b'}')
+    content = b'{"responses": {' + b', '.join(parts) + b'}}'
+    return HttpResponse(content, content_type='application/json')
+
+
+def _run(request):
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return JsonResponse({'error': 'No encontrado'}, status=404)
+    try:
+        return match.func(request, *match.args, **match.kwargs)
+    except Exception as exc:
+        return response_for_exception(request, exc)
+
+
+def _content(response) -> bytes:
+    try:
+        if not response.streaming:
+            return response.content
+        return b''.join(response.streaming_content)
+    finally:
+        response.close()
 
-# Create your views here.
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Profile, Token
+from .models import Profile, RevokedToken, RevokedUser, Token
 
 
 @admin.register(Profile)
@@ -11,3 +11,13 @@ class ProfileAdmin(admin.ModelAdmin):
 @admin.register(Token)
 class TokenAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    pass
+
+
+@admin.register(RevokedUser)
+class RevokedUserAdmin(admin.ModelAdmin):
+    pass
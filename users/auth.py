@@ -0,0 +1,371 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Profile, Token
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Registro mínimo del usuario autenticado que se guarda en la caché de tokens.
+
+    Contiene solo los datos necesarios para reconstruir `request.user` (y su
+    perfil) sin consultar la base de datos. Los atributos a None se
+    consideran desconocidos (p.ej. cuando el registro procede de un token
+    firmado, que solo lleva el id y el rol).
+
+    Attributes
+    ----------
+    user_id : int
+        Identificador del usuario.
+    username : str
+        Nombre de usuario.
+    first_name : str
+        Nombre.
+    last_name : str
+        Apellidos.
+    email : str
+        Correo electrónico.
+    is_active : bool
+        Indica si el usuario está activo.
+    is_staff : bool
+        Indica si el usuario tiene acceso al admin de Django.
+    is_superuser : bool
+        Indica si el usuario es superusuario.
+    profile_id : int or None
+        Identificador del perfil asociado.
+    role : str or None
+        Rol del perfil ('A', 'W' o 'C').
+    """
+
+    user_id: int
+    username: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    email: str | None = None
+    is_active: bool | None = None
+    is_staff: bool | None = None
+    is_superuser: bool | None = None
+    profile_id: int | None = None
+    role: str | None = None
+
+    @classmethod
+    def from_user(cls, user) -> 'Principal':
+        """
+        Construye el registro a partir de un usuario con su perfil ya cargado.
+
+        Parameters
+        ----------
+        user : User
+            Usuario (idealmente obtenido con `select_related('profile')`).
+
+        Returns
+        -------
+        Principal
+            Registro del usuario.
+        """
+        try:
+            profile = user.profile
+        except Profile.DoesNotExist:
+            profile = None
+        return cls(
+            user_id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            email=user.email,
+            is_active=user.is_active,
+            is_staff=user.is_staff,
+            is_superuser=user.is_superuser,
+            profile_id=profile.id if profile else None,
+            role=profile.role if profile else None,
+        )
+
+    def to_user(self):
+        """
+        Reconstruye una instancia de usuario sin acceder a la base de datos.
+
+        Los campos que no forman parte del registro (contraseña, fechas) quedan
+        diferidos: si alguna vista los necesita se cargan bajo demanda y un
+        `save()` sobre la instancia solo actualiza los campos cargados.
+
+        Returns
+        -------
+        User
+            Usuario con el perfil precargado.
+        """
+        User = get_user_model()
+        values = {
+            'id': self.user_id,
+            'username': self.username,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'email': self.email,
+            'is_active': self.is_active,
+            'is_staff': self.is_staff,
+            'is_superuser': self.is_superuser,
+        }
+        # `from_db` espera los valores en el orden de los campos del modelo.
+        field_names = [
+            f.attname
+            for f in User._meta.concrete_fields
+            if values.get(f.attname) is not None
+        ]
+        user = User.from_db(
+            DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+        )
+        if self.profile_id is not None:
+            user.profile = Profile.from_db(
+                DEFAULT_DB_ALIAS,
+                ('id', 'user_id', 'role'),
+                (self.profile_id, self.user_id, self.role),
+            )
+        return user
+
+    def has_role(self, *roles) -> bool:
+        """
+        Indica si el usuario tiene alguno de los roles indicados.
+
+        Parameters
+        ----------
+        *roles : str
+            Roles admitidos (`Profile.Role.ADMIN`, `WORKER` o `CLIENT`).
+
+        Returns
+        -------
+        bool
+            True si el rol del registro está entre los indicados.
+        """
+        return self.role in roles
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == Profile.Role.ADMIN
+
+    @property
+    def is_worker(self) -> bool:
+        """Indica si el usuario es un trabajador (barbero)."""
+        return self.role == Profile.Role.WORKER
+
+    @property
+    def is_client(self) -> bool:
+        return self.role == Profile.Role.CLIENT
+
+
+class TokenCache:
+    """
+    Caché LRU con caducidad (TTL) que asocia claves de token con un `Principal`.
+
+    El primer nivel vive en la memoria del proceso. Opcionalmente se apoya en
+    Redis como segundo nivel compartido entre los workers de gunicorn: una
+    entrada que falta en memoria se busca en Redis antes de ir a la base de
+    datos, y las invalidaciones se propagan a ambos niveles.
+
+    Una invalidación (token borrado, cambio de rol, usuario desactivado) se
+    aplica al momento en el worker que la hace, pero los demás siguen
+    sirviendo su copia en memoria hasta que caduca:
+
+    - Solo en memoria, hasta `ttl` segundos (`AUTH_TOKEN_CACHE_TTL`).
+    - Con Redis, hasta `shared_ttl` segundos (`AUTH_TOKEN_CACHE_SHARED_TTL`),
+      que es mucho menor porque al caducar la entrada se vuelve a leer de
+      Redis, donde la invalidación ya está aplicada, y no de la base de datos.
+
+    Si Redis falla, la caché sigue funcionando solo en memoria y el error se
+    registra en el log.
+
+    Parameters
+    ----------
+    max_size : int
+        Número máximo de entradas en memoria.
+    ttl : float
+        Segundos de vida de cada entrada en memoria si no se usa Redis.
+    redis_url : str or None
+        URL de Redis para el segundo nivel. Si es None solo se usa memoria.
+    redis_ttl : int
+        Segundos de vida de cada entrada en Redis.
+    shared_ttl : float
+        Segundos de vida de cada entrada en memoria si se usa Redis.
+    """
+
+    REDIS_PREFIX = 'auth:token:'
+    REDIS_USER_PREFIX = 'auth:user:'
+
+    def __init__(self, max_size=10000, ttl=60, redis_url=None, redis_ttl=3600, shared_ttl=5):
+        self.max_size = max_size
+        self.ttl = shared_ttl if redis_url else ttl
+        self.redis_url = redis_url
+        self.redis_ttl = redis_ttl
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def get(self, key: str) -> Principal | None:
+        """
+        Devuelve el `Principal` asociado a un token, cargándolo si no está en caché.
+
+        Parameters
+        ----------
+        key : str
+            Clave UUID del token.
+
+        Returns
+        -------
+        Principal or None
+            Registro del usuario o None si el token no está registrado o el
+            usuario está desactivado.
+        """
+        principal = self._get_local(key)
+        if principal is not None:
+            return principal
+
+        principal = self._get_redis(key)
+        if principal is None:
+            principal = self._load(key)
+            if principal is None:
+                return None
+            self._set_redis(key, principal)
+        self._set_local(key, principal)
+        return principal
+
+    def evict_token(self, key) -> None:
+        """Elimina de la caché la entrada de un token concreto."""
+        key = str(key)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._user_keys.get(entry[1].user_id, set()).discard(key)
+                self.evictions += 1
+        if self.redis is not None:
+            try:
+                self.redis.delete(self.REDIS_PREFIX + key)
+            except Exception:
+                logger.warning('No se ha podido invalidar el token en Redis', exc_info=True)
+
+    def evict_user(self, user_id: int) -> None:
+        """Elimina de la caché todas las entradas de un usuario."""
+        with self._lock:
+            keys = self._user_keys.pop(user_id, set())
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.evictions += 1
+        if self.redis is not None:
+            try:
+                user_key = f'{self.REDIS_USER_PREFIX}{user_id}'
+                redis_keys = [self.REDIS_PREFIX + k.decode() for k in self.redis.smembers(user_key)]
+                self.redis.delete(user_key, *redis_keys)
+            except Exception:
+                logger.warning(
+                    'No se han podido invalidar en Redis los tokens del usuario %s',
+                    user_id,
+                    exc_info=True,
+                )
+
+    def clear(self) -> None:
+        """Vacía el nivel en memoria y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché en memoria.
+
+        Returns
+        -------
+        dict
+            Diccionario con las claves `hits`, `misses`, `evictions` y `size`.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+            }
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, principal = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return principal
+                del self._entries[key]
+                self._user_keys.get(principal.user_id, set()).discard(key)
+            self.misses += 1
+            return None
+
+    def _set_local(self, key, principal):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            self._user_keys.setdefault(principal.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, (_, old_principal) = self._entries.popitem(last=False)
+                self._user_keys.get(old_principal.user_id, set()).discard(old_key)
+
+    def _get_redis(self, key):
+        if self.redis is None:
+            return None
+        try:
+            data = self.redis.get(self.REDIS_PREFIX + key)
+        except Exception:
+            logger.warning('No se ha podido leer el token de Redis', exc_info=True)
+            return None
+        return Principal(**json.loads(data)) if data else None
+
+    def _set_redis(self, key, principal):
+        if self.redis is None:
+            return
+        try:
+            user_key = f'{self.REDIS_USER_PREFIX}{principal.user_id}'
+            pipe = self.redis.pipeline()
+            pipe.set(self.REDIS_PREFIX + key, json.dumps(asdict(principal)), ex=self.redis_ttl)
+            pipe.sadd(user_key, key)
+            pipe.expire(user_key, self.redis_ttl)
+            pipe.execute()
+        except Exception:
+            logger.warning('No se ha podido guardar el token en Redis', exc_info=True)
+
+    @staticmethod
+    def _load(key):
+        try:
+            token = Token.objects.select_related('user__profile').get(
+                key=key, user__is_active=True
+            )
+        except Token.DoesNotExist:
+            return None
+        return Principal.from_user(token.user)
+
+
+token_cache = TokenCache(
+    max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_CACHE_TTL,
+    redis_url=settings.AUTH_TOKEN_CACHE_REDIS_URL,
+    shared_ttl=settings.AUTH_TOKEN_CACHE_SHARED_TTL,
+)
@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import connection, transaction
+
+from .models import Profile, Token
+
+User = get_user_model()
+
+USER_FIELDS = ('username', 'first_name', 'last_name', 'email')
+# Campos de texto que admite cada fila
+TEXT_FIELDS = (*USER_FIELDS, 'password', 'password_hash', 'role')
+
+
+def read_rows(stream, format='csv'):
+    """
+    Lee las filas de un fichero de usuarios.
+
+    Parameters
+    ----------
+    stream : file-like
+        Fichero de texto abierto.
+    format : str
+        'csv' (con cabecera) o 'jsonl' (un objeto JSON por línea).
+
+    Yields
+    ------
+    tuple
+        `(línea, fila)` por usuario. La fila es un diccionario con las claves
+        `username`, `password` o `password_hash`, `first_name`, `last_name`,
+        `email` y `role`; si la línea no es JSON válido, es el `ValueError`
+        de `json.loads`, para que `import_users` la informe y siga con las
+        demás.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except ValueError as err:
+                    yield number, err
+    else:
+        raise ValueError(f'Formato desconocido: {format!r}')
+
+
+def read_text(text, format='csv'):
+    """Igual que `read_rows`, pero a partir de una cadena (cuerpo de una petición)."""
+    return read_rows(io.StringIO(text), format)
+
+
+def validate_row(row):
+    """
+    Comprueba una fila de `read_rows` antes de importarla.
+
+    Parameters
+    ----------
+    row : object
+        Fila leída.
+
+    Returns
+    -------
+    str or None
+        Motivo por el que la fila no es válida, o None.
+    """
+    if isinstance(row, ValueError):
+        return f'JSON no válido: {row}'
+    if not isinstance(row, dict):
+        return 'se esperaba un objeto'
+    for field in TEXT_FIELDS:
+        if row.get(field) is not None and not isinstance(row[field], str):
+            return f'el campo {field} debe ser texto'
+    if not (row.get('username') or '').strip():
+        return 'falta el nombre de usuario'
+    role = row.get('role') or Profile.Role.CLIENT
+    if role not in Profile.Role.values:
+        return f'rol no válido {role!r}'
+    if row.get('password_hash'):
+        try:
+            identify_hasher(row['password_hash'])
+        except ValueError:
+            return 'password_hash no es un hash de contraseña reconocido'
+    return None
+
+
+def format_for(path):
+    """Deduce el formato ('csv' o 'jsonl') a partir de la extensión del fichero."""
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson') else 'csv'
+
+
+def import_users(rows, *, batch_size=500, workers=None, progress=None):
+    """
+    Importa usuarios de forma masiva, con su perfil y su token.
+
+    Crear un usuario con `save()` dispara `create_user_related_models`, que
+    hace dos INSERT más (perfil y token), cada uno en su propia transacción.
+    Aquí se usa `bulk_create` para los tres modelos, en una transacción por
+    lote, y no se emiten señales: como los usuarios son nuevos no hay nada
+    que invalidar en la caché de tokens.
+
+    Las contraseñas en claro se hashean antes de insertar, en paralelo en un
+    pool de hilos propio (no el de los logins, para no competir con ellos).
+    Las filas con `password_hash` (un hash de Django ya calculado, p.ej. al
+    migrar desde otro sistema) se insertan tal cual.
+
+    Los nombres de usuario que ya existen, o que se repiten en el fichero, se
+    omiten.
+
+    Las filas no válidas (ver `validate_row`) se informan con su número de
+    línea y no detienen la importación.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        Pares `(línea, fila)` a importar (ver `read_rows`).
+    batch_size : int
+        Usuarios por lote y transacción.
+    workers : int, opcional
+        Hilos para el hashing. Por defecto, el número de CPUs.
+    progress : callable, opcional
+        Se llama tras cada lote con `(creados, omitidos, segundos)`.
+
+    Returns
+    -------
+    dict
+        Diccionario con las claves `created`, `skipped`, `errors` (lista de
+        `{'line': línea, 'error': motivo}`) y `seconds`.
+    """
+    created = skipped = 0
+    errors = []
+    seen = set()
+    start = time.perf_counter()
+    rows = iter(rows)
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as hasher:
+        while batch := list(islice(rows, batch_size)):
+            users, roles, passwords = [], [], []
+            for line, row in batch:
+                if error := validate_row(row):
+                    errors.append({'line': line, 'error': error})
+                    continue
+                username = row['username'].strip()
+                if username in seen:
+                    skipped += 1
+                    continue
+                seen.add(username)
+                users.append(
+                    User(**{field: (row.get(field) or '').strip() for field in USER_FIELDS})
+                )
+                roles.append(row.get('role') or Profile.Role.CLIENT)
+                passwords.append((row.get('password_hash'), row.get('password')))
+
+            existing = set(
+                User.objects.filter(username__in=[u.username for u in users]).values_list(
+                    'username', flat=True
+                )
+            )
+            new_users, new_roles, new_passwords = [], [], []
+            for user, role, password in zip(users, roles, passwords):
+                if user.username in existing:
+                    skipped += 1
+                    continue
+                new_users.append(user)
+                new_roles.append(role)
+                new_passwords.append(password)
+            hashes = hasher.map(
+                lambda pair: pair[0] or make_password(pair[1] or None), new_passwords
+            )
+            for user, password in zip(new_users, hashes):
+                user.password = password
+
+            with transaction.atomic():
+                User.objects.bulk_create(new_users)
+                if not connection.features.can_return_rows_from_bulk_insert:
+                    ids = dict(
+                        User.objects.filter(
+                            username__in=[u.username for u in new_users]
+                        ).values_list('username', 'id')
+                    )
+                    for user in new_users:
+                        user.pk = ids[user.username]
+                Profile.objects.bulk_create(
+                    Profile(user=user, role=role) for user, role in zip(new_users, new_roles)
+                )
+                Token.objects.bulk_create(Token(user=user) for user in new_users)
+
+            created += len(new_users)
+            if progress:
+                progress(created, skipped, time.perf_counter() - start)
+
+    return {
+        'created': created,
+        'skipped': skipped,
+        'errors': errors,
+        'seconds': time.perf_counter() - start,
+    }
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importer import format_for, import_users, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Importa usuarios (con perfil y token) desde un fichero CSV o JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichero .csv (con cabecera) o .jsonl')
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'), help='Por defecto, según la extensión'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Usuarios por lote')
+        parser.add_argument('--workers', type=int, help='Hilos para hashear contraseñas')
+
+    def handle(self, *args, **options):
+        path = options['path']
+
+        def progress(created, skipped, seconds):
+            self.stdout.write(
+                f'{created} creados, {skipped} omitidos ({created / max(seconds, 1e-6):.0f} filas/s)'
+            )
+
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                result = import_users(
+                    read_rows(stream, options['format'] or format_for(path)),
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    progress=progress,
+                )
+        except (OSError, ValueError) as err:
+            raise CommandError(err)
+
+        for error in result['errors']:
+            self.stderr.write(f'Línea {error["line"]}: {error["error"]}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Importados {result["created"]} usuarios en {result["seconds"]:.1f} s '
+                f'({result["created"] / max(result["seconds"], 1e-6):.0f} filas/s), '
+                f'{result["skipped"]} omitidos, {len(result["errors"])} errores'
+            )
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedUser',
+            fields=[
+                ('user_id', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('revoked_before', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
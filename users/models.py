@@ -96,3 +96,73 @@ class Token(models.Model):
             Username asociado al token.
         """
         return f'{self.user}'
+
+
+class RevokedToken(models.Model):
+    """
+    Modelo que registra un token firmado revocado antes de su expiración.
+
+    Los tokens firmados no se guardan en la base de datos, por lo que para
+    invalidarlos (logout, token comprometido) se anota su identificador
+    único hasta la fecha en la que habrían caducado de todos modos.
+
+    Atributos
+    ----------
+    jti : CharField
+        Identificador único del token revocado.
+    user : ForeignKey
+        Usuario al que pertenecía el token.
+    expires_at : DateTimeField
+        Fecha de expiración original del token.
+    created_at : DateTimeField
+        Fecha y hora de la revocación.
+    """
+
+    jti = models.CharField(max_length=32, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='revoked_tokens'
+    )
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        Retorna una representación legible del token revocado.
+
+        Returns
+        -------
+        str
+            Username y jti del token.
+        """
+        return f'{self.user} - {self.jti}'
+
+
+class RevokedUser(models.Model):
+    """
+    Modelo que revoca todos los tokens firmados emitidos a un usuario hasta una fecha.
+
+    Se anota al eliminar o desactivar al usuario (ver `users.signals`). No es
+    una clave ajena para que la revocación sobreviva al borrado del usuario:
+    sus tokens firmados siguen circulando hasta que caducan.
+
+    Atributos
+    ----------
+    user_id : PositiveBigIntegerField
+        ID del usuario.
+    revoked_before : DateTimeField
+        Se rechazan los tokens del usuario emitidos hasta esta fecha.
+    """
+
+    user_id = models.PositiveBigIntegerField(primary_key=True)
+    revoked_before = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        """
+        Retorna una representación legible de la revocación.
+
+        Returns
+        -------
+        str
+            ID del usuario y fecha de la revocación.
+        """
+        return f'{self.user_id} - {self.revoked_before}'
@@ -11,6 +11,8 @@ class TokenSerializer(BaseSerializer):
         Serializa una instancia de Token en un diccionario con su clave única.
     """
 
+    output_fields = ('key',)
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia de token.
@@ -38,6 +40,10 @@ class ProfileSerializer(BaseSerializer):
         Serializa una instancia de Profile en un diccionario con sus atributos principales.
     """
 
+    select_related = {'user': ('user',), 'token': ('user__token',)}
+    columns = {'id': ('user',), 'user': ('user__username',), 'token': ('user__token',)}
+    output_fields = ('id', 'user', 'role', 'token')
+
     def serialize_instance(self, instance) -> dict:
         """
         Serializa una instancia de perfil.
@@ -57,8 +63,12 @@ class ProfileSerializer(BaseSerializer):
                 - token : dict
         """
         return {
-            'id': instance.user.id,
-            'user': instance.user.username,
-            'role': instance.role,
-            'token': TokenSerializer(instance.user.token).serialize_instance(instance.user.token),
+            'id': instance.user_id if self.wants('id') else None,
+            'user': instance.user.username if self.wants('user') else None,
+            'role': instance.role if self.wants('role') else None,
+            'token': (
+                TokenSerializer(instance.user.token).serialize_instance(instance.user.token)
+                if self.wants('token')
+                else None
+            ),
         }
@@ -1,9 +1,13 @@
 # signals.py
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from shared.models import TableVersion
+
+from .auth import token_cache
 from .models import Profile, Token
+from .tokens import revocation_list, revoke_user_tokens
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -28,3 +32,132 @@ def create_user_related_models(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_user_from_token_cache(sender, instance, **kwargs):
+    """
+    Invalida las entradas de la caché de tokens de un usuario modificado o eliminado.
+
+    Las actualizaciones que solo tocan `last_login` (las hace `login()`) se
+    ignoran porque ese campo no forma parte del registro cacheado.
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo de usuario.
+    instance : User
+        La instancia del usuario guardada o eliminada.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    token_cache.evict_user(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_of_removed_user(sender, instance, **kwargs):
+    """
+    Revoca los tokens firmados de un usuario eliminado o desactivado.
+
+    Los tokens UUID se borran con el usuario y los de un usuario inactivo no
+    se cargan (ver `TokenCache`), pero los firmados no se guardan en la base
+    de datos: sin esto seguirían siendo válidos hasta caducar.
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo de usuario.
+    instance : User
+        La instancia del usuario guardada o eliminada.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    if kwargs['signal'] is post_save and (kwargs['created'] or instance.is_active):
+        return
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def evict_profile_from_token_cache(sender, instance, **kwargs):
+    """
+    Invalida las entradas de la caché de tokens cuando cambia el perfil (p.ej. el rol).
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo Profile.
+    instance : Profile
+        El perfil guardado o eliminado.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    token_cache.evict_user(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def update_role_in_revocation_list(sender, instance, **kwargs):
+    """
+    Anota el rol actual del usuario para rechazar los tokens firmados con otro rol.
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo Profile.
+    instance : Profile
+        El perfil guardado.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    revocation_list.set_role(instance.user_id, instance.role)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def evict_token_from_token_cache(sender, instance, **kwargs):
+    """
+    Invalida la entrada de la caché de un token regenerado o eliminado.
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo Token.
+    instance : Token
+        El token guardado o eliminado.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    token_cache.evict_token(instance.key)
+    token_cache.evict_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def bump_user_version(sender, instance, **kwargs):
+    """
+    Incrementa la versión de la tabla de usuarios o de perfiles modificada.
+
+    Las fechas disponibles incluyen el nombre del barbero y dependen de su
+    rol. Como en la caché de tokens, se ignoran las actualizaciones de
+    `last_login`.
+
+    Parameters
+    ----------
+    sender : Model
+        El modelo de usuario o Profile.
+    instance : User or Profile
+        La instancia guardada o eliminada.
+    kwargs : dict
+        Argumentos adicionales de la señal.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    TableVersion.bump(sender)
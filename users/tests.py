@@ -1,3 +1,117 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.test import TestCase
 
-# Create your tests here.
+from shared.tests import ConstantQueriesMixin
+
+from .auth import TokenCache, token_cache
+from .importer import import_users, read_text
+from .models import Profile
+from .tokens import _b64encode, _sign, issue_signed_token, revocation_list, verify_signed_token
+
+User = get_user_model()
+
+
+class BarberListQueryCountTests(ConstantQueriesMixin, TestCase):
+    """El listado de barberos no hace una consulta por fila."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='client')
+        self.added = 0
+
+    def add_rows(self, count):
+        barbers = [
+            User.objects.create(username=f'barber{self.added + i}', first_name='B')
+            for i in range(count)
+        ]
+        self.added += count
+        Profile.objects.filter(user__in=barbers).update(role=Profile.Role.WORKER)
+
+    def test_barber_list(self):
+        self.assertConstantQueries('/api/barbers/', self.user.token.key)
+
+
+class ImportUsersTests(TestCase):
+    """Las filas no válidas se informan con su línea y no detienen la importación."""
+
+    def test_invalid_rows(self):
+        text = '\n'.join(
+            [
+                '{"username": "ana", "password": "secret"}',
+                '{"username": "bea"',
+                '',
+                '["carla"]',
+                '{"username": 42}',
+                '{"username": "dani", "password_hash": "not-a-hash"}',
+                '{"username": "eva", "password_hash": "%s"}' % make_password('secret'),
+            ]
+        )
+        result = import_users(read_text(text, 'jsonl'))
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([error['line'] for error in result['errors']], [2, 4, 5, 6])
+        self.assertTrue(User.objects.get(username='eva').check_password('secret'))
+
+    def test_csv_line_numbers(self):
+        text = 'username,role\nana,C\nbea,X\n'
+        result = import_users(read_text(text, 'csv'))
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(result['errors'], [{'line': 3, 'error': "rol no válido 'X'"}])
+
+
+class RevokeUserTokensTests(TestCase):
+    """Los tokens de un usuario eliminado o desactivado dejan de valer."""
+
+    def setUp(self):
+        token_cache.clear()
+        revocation_list.refresh()
+        self.user = User.objects.create(username='client')
+        self.token = issue_signed_token(self.user, Profile.Role.CLIENT)
+
+    def get_barbers(self, token):
+        return self.client.get('/api/barbers/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_deleted_user(self):
+        self.assertEqual(self.get_barbers(self.token).status_code, 200)
+        self.user.delete()
+        self.assertIsNone(verify_signed_token(self.token))
+        self.assertEqual(self.get_barbers(self.token).status_code, 401)
+
+    def test_deactivated_user(self):
+        uuid_token = self.user.token.key
+        self.assertEqual(self.get_barbers(uuid_token).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_barbers(self.token).status_code, 401)
+        self.assertEqual(self.get_barbers(uuid_token).status_code, 401)
+
+    def test_revocation_reaches_other_workers(self):
+        self.user.delete()
+        revocation_list.refresh()  # Lo que verá otro worker tras su recarga
+        self.assertIsNone(verify_signed_token(self.token))
+
+    def test_tokens_issued_after_revocation(self):
+        # Usuario desactivado hace un rato y reactivado: sus tokens nuevos valen
+        revocation_list.revoke_user(self.user.pk, time.time() - 10)
+        self.assertIsNotNone(verify_signed_token(issue_signed_token(self.user, 'C')))
+
+    def test_token_without_issue_date(self):
+        payload = _b64encode(f'{self.user.pk}:C:{2**31}:{"0" * 32}'.encode())
+        principal = verify_signed_token(f'{payload}.{_sign(payload)}')
+        self.assertEqual(principal.user_id, self.user.pk)
+
+
+class TokenCacheRedisTests(TestCase):
+    """Con Redis caído la caché sigue funcionando en memoria y lo registra."""
+
+    def test_redis_down(self):
+        cache = TokenCache(ttl=60, redis_url='redis://127.0.0.1:1/0', shared_ttl=5)
+        self.assertEqual(cache.ttl, 5)
+        user = User.objects.create(username='client')
+        with self.assertLogs('users.auth', 'WARNING') as logs:
+            principal = cache.get(str(user.token.key))
+            cache.evict_user(user.pk)
+        self.assertEqual(principal.user_id, user.pk)
+        self.assertEqual(len(logs.records), 3)  # Lectura, escritura e invalidación
@@ -0,0 +1,279 @@
+import base64
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .auth import Principal
+from .models import Profile, RevokedToken, RevokedUser
+
+SIGNED_TOKEN_PATTERN = re.compile(r'Bearer (?P<token>[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+)')
+
+KEY_SALT = 'users.tokens.SignedToken'
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(salted_hmac(KEY_SALT, payload, algorithm='sha256').digest())
+
+
+def issue_signed_token(user, role: str, ttl: int | None = None) -> str:
+    """
+    Genera un token firmado con HMAC que no necesita guardarse en la base de datos.
+
+    El token tiene la forma `<payload>.<firma>`, donde el payload (en base64
+    url-safe) contiene `user_id:rol:expiración:jti:emisión`.
+
+    Parameters
+    ----------
+    user : User
+        Usuario para el que se emite el token.
+    role : str
+        Rol del usuario ('A', 'W' o 'C').
+    ttl : int, opcional
+        Segundos de validez. Por defecto `settings.AUTH_SIGNED_TOKEN_TTL`.
+
+    Returns
+    -------
+    str
+        Token firmado.
+    """
+    ttl = settings.AUTH_SIGNED_TOKEN_TTL if ttl is None else ttl
+    issued_at = int(time.time())
+    expires_at = issued_at + ttl
+    payload = _b64encode(
+        f'{user.pk}:{role}:{expires_at}:{secrets.token_hex(16)}:{issued_at}'.encode()
+    )
+    return f'{payload}.{_sign(payload)}'
+
+
+def decode_signed_token(token: str) -> dict | None:
+    """
+    Comprueba la firma y la expiración de un token firmado.
+
+    No consulta la base de datos ni la lista de revocación.
+
+    Parameters
+    ----------
+    token : str
+        Token firmado.
+
+    Returns
+    -------
+    dict or None
+        Diccionario con las claves `user_id`, `role`, `exp`, `jti` e `iat`, o
+        None si el token no es válido o ha caducado.
+    """
+    payload, _, signature = token.partition('.')
+    if not constant_time_compare(signature, _sign(payload)):
+        return None
+    try:
+        fields = _b64decode(payload).decode().split(':')
+        if len(fields) == 4:
+            # Emitido antes de incluir la fecha de emisión: dura el TTL por defecto
+            fields.append(int(fields[2]) - settings.AUTH_SIGNED_TOKEN_TTL)
+        user_id, role, expires_at, jti, issued_at = fields
+        claims = {
+            'user_id': int(user_id),
+            'role': role,
+            'exp': int(expires_at),
+            'jti': jti,
+            'iat': int(issued_at),
+        }
+    except ValueError:
+        return None
+    if claims['exp'] <= time.time():
+        return None
+    return claims
+
+
+class RevocationList:
+    """
+    Conjunto en memoria con los `jti` de los tokens firmados revocados.
+
+    Se recarga desde `RevokedToken` como mucho cada `refresh_interval`
+    segundos, así que comprobar si un token está revocado no consulta la
+    base de datos en el camino habitual. Las revocaciones hechas desde este
+    proceso se aplican inmediatamente; las de otros workers, tras la
+    siguiente recarga.
+
+    Además guarda el rol actual de los perfiles modificados durante la vida
+    de un token (`AUTH_SIGNED_TOKEN_TTL`). Un token cuyo rol no coincide con
+    el actual se rechaza, de modo que un cambio de rol invalida los tokens
+    emitidos con el rol anterior.
+
+    Por último, guarda la fecha de revocación de los usuarios eliminados o
+    desactivados (`RevokedUser`): se rechazan sus tokens emitidos hasta
+    entonces. Como con el resto de revocaciones, los demás workers las
+    aplican tras su siguiente recarga.
+
+    Parameters
+    ----------
+    refresh_interval : float
+        Segundos entre recargas desde la base de datos.
+    """
+
+    def __init__(self, refresh_interval=30):
+        self.refresh_interval = refresh_interval
+        self._jtis = frozenset()
+        self._roles = {}
+        self._users = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def is_revoked(
+        self,
+        jti: str,
+        user_id: int | None = None,
+        role: str | None = None,
+        issued_at: int | None = None,
+    ) -> bool:
+        """
+        Indica si un token está revocado.
+
+        Parameters
+        ----------
+        jti : str
+            Identificador único del token.
+        user_id : int, opcional
+            Usuario del token; junto con `role` permite detectar cambios de rol.
+        role : str, opcional
+            Rol que lleva el token.
+        issued_at : int, opcional
+            Fecha de emisión del token (segundos desde epoch).
+
+        Returns
+        -------
+        bool
+            True si el `jti` está revocado, el rol del usuario ha cambiado o
+            el usuario se ha eliminado o desactivado después de emitirlo.
+        """
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.refresh()
+        if jti in self._jtis:
+            return True
+        revoked_before = self._users.get(user_id)
+        if revoked_before is not None and issued_at is not None and issued_at <= revoked_before:
+            return True
+        current_role = self._roles.get(user_id)
+        return current_role is not None and current_role != role
+
+    def refresh(self) -> None:
+        """Recarga las revocaciones que aún no han caducado y los cambios de rol recientes."""
+        now = datetime.now(timezone.utc)
+        jtis = frozenset(
+            RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True)
+        )
+        changed_since = now - timedelta(seconds=settings.AUTH_SIGNED_TOKEN_TTL)
+        roles = dict(
+            Profile.objects.filter(updated_at__gt=changed_since).values_list('user_id', 'role')
+        )
+        users = {
+            user_id: revoked_before.timestamp()
+            for user_id, revoked_before in RevokedUser.objects.filter(
+                revoked_before__gt=changed_since
+            ).values_list('user_id', 'revoked_before')
+        }
+        with self._lock:
+            self._jtis = jtis
+            self._roles = roles
+            self._users = users
+            self._loaded_at = time.monotonic()
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def set_role(self, user_id: int, role: str) -> None:
+        """Anota el rol actual de un usuario (lo llama la señal de `Profile`)."""
+        with self._lock:
+            self._roles = {**self._roles, user_id: role}
+
+    def revoke_user(self, user_id: int, revoked_before: float) -> None:
+        """Anota la revocación de los tokens de un usuario (ver `revoke_user_tokens`)."""
+        with self._lock:
+            self._users = {**self._users, user_id: revoked_before}
+
+
+revocation_list = RevocationList(refresh_interval=settings.AUTH_REVOCATION_REFRESH)
+
+
+def verify_signed_token(token: str) -> Principal | None:
+    """
+    Valida un token firmado y devuelve el `Principal` que contiene.
+
+    Parameters
+    ----------
+    token : str
+        Token firmado.
+
+    Returns
+    -------
+    Principal or None
+        Registro con el id y el rol del usuario, o None si el token no es
+        válido, ha caducado, ha sido revocado, el rol del usuario ha cambiado
+        o el usuario se ha eliminado o desactivado.
+    """
+    claims = decode_signed_token(token)
+    if claims is None or revocation_list.is_revoked(
+        claims['jti'], claims['user_id'], claims['role'], claims['iat']
+    ):
+        return None
+    return Principal(user_id=claims['user_id'], role=claims['role'])
+
+
+def revoke_signed_token(token: str) -> bool:
+    """
+    Revoca un token firmado hasta su fecha de expiración.
+
+    Parameters
+    ----------
+    token : str
+        Token firmado.
+
+    Returns
+    -------
+    bool
+        True si el token era válido y se ha revocado, False en caso contrario.
+    """
+    claims = decode_signed_token(token)
+    if claims is None:
+        return False
+    RevokedToken.objects.get_or_create(
+        jti=claims['jti'],
+        defaults={
+            'user_id': claims['user_id'],
+            'expires_at': datetime.fromtimestamp(claims['exp'], timezone.utc),
+        },
+    )
+    revocation_list.add(claims['jti'])
+    return True
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """
+    Revoca todos los tokens firmados emitidos hasta ahora a un usuario.
+
+    Lo llaman las señales de usuario al eliminarlo o desactivarlo, de modo
+    que sus tokens reciben un 401 en lugar de llegar a la vista con un
+    usuario que ya no existe.
+
+    Parameters
+    ----------
+    user_id : int
+        ID del usuario.
+    """
+    now = datetime.now(timezone.utc)
+    RevokedUser.objects.update_or_create(user_id=user_id, defaults={'revoked_before': now})
+    revocation_list.revoke_user(user_id, now.timestamp())
@@ -1,17 +1,19 @@
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
 from django.utils import timezone
-from django.views.decorators.csrf import csrf_exempt
 
-from shared.decorators import required_method, verify_admin, verify_token
+from shared.endpoints import endpoint
+from shared.pagination import cursor_pagination, paginate
+from shared.responses import JsonResponse
+from shared.serializers import check_fields, requested_fields
 
+from .importer import import_users as bulk_import_users
+from .importer import read_text
 from .models import Profile
 from .serializers import ProfileSerializer
 
 
 @login_required
-@csrf_exempt
-@required_method('GET')
+@endpoint('GET', checks=(check_fields(ProfileSerializer),))
 def get_user_profile(request):
     """
     Devuelve el perfil del usuario autenticado.
@@ -34,14 +36,11 @@ def get_user_profile(request):
     except Profile.DoesNotExist:
         return JsonResponse({'error': 'Perfil no encontrado'}, status=404)
 
-    serializer = ProfileSerializer(profile, request=request)
+    serializer = ProfileSerializer(profile, request=request, fields=requested_fields(request))
     return serializer.json_response()
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
-@verify_admin
+@endpoint('GET', auth='admin')
 def users_per_mounth(request):
     """
     Obtiene la cantidad de usuarios registrados por día durante el mes actual.
@@ -93,9 +92,11 @@ def users_per_mounth(request):
     )
 
 
-@csrf_exempt
-@required_method('GET')
-@verify_token
+@endpoint(
+    'GET',
+    auth='token',
+    checks=(check_fields(ProfileSerializer), cursor_pagination(Profile, 'id')),
+)
 def get_barbers(request):
     """
     Devuelve una lista de barberos.
@@ -114,5 +115,37 @@ def get_barbers(request):
         Respuesta JSON con la lista de barberos.
     """
     barbers = Profile.objects.filter(role=Profile.Role.WORKER)
-    serializer = ProfileSerializer(barbers, request=request)
-    return serializer.json_response()
+    page = paginate(request, barbers)
+    serializer = ProfileSerializer(page.items, request=request, fields=requested_fields(request))
+    return page.link(serializer.json_response())
+
+
+@endpoint('POST', auth='admin')
+def import_users(request):
+    """
+    Importa usuarios de forma masiva (solo administradores).
+
+    El cuerpo es el fichero tal cual: CSV con cabecera si el Content-Type es
+    `text/csv`, o JSONL (un objeto por línea) en otro caso. Cada fila admite
+    `username`, `password` o `password_hash`, `first_name`, `last_name`,
+    `email` y `role`. Para ficheros muy grandes es preferible el comando
+    `manage.py import_users`.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Objeto de solicitud HTTP con el fichero en el cuerpo.
+
+    Returns
+    -------
+    JsonResponse
+        Respuesta JSON con los usuarios creados, omitidos, los errores por fila
+        y las filas por segundo.
+    """
+    format = 'csv' if request.content_type == 'text/csv' else 'jsonl'
+    try:
+        result = bulk_import_users(read_text(request.body.decode(), format))
+    except (UnicodeDecodeError, ValueError):
+        return JsonResponse({'error': 'Fichero de usuarios inválido'}, status=400)
+    result['rows_per_second'] = round(result['created'] / max(result['seconds'], 1e-6))
+    return JsonResponse(result, status=201 if result['created'] else 200)